@@ -1,26 +1,42 @@
-from flask import Flask, request, jsonify, redirect, url_for
+from startup import StartupReport
+startup_report = StartupReport()
+
+from flask import Flask, Response, request, jsonify, redirect, url_for, send_file
 from flask_cors import CORS
-from model_trainer import load_model, train_model
-from data_loader import load_data
 from models import db, User, Crop, Recommendation
-from path_planner import PathPlanner
-import pandas as pd
+from crop_predictor import FEATURE_COLUMNS, parse_samples, samples_to_array, predict_top_k, format_recommendations, scale_features, quantize_features
+from micro_batcher import MicroBatcher
+from model_registry import ModelRegistry
+from ttl_cache import TTLCache
+from profile_recommender import ProfileRecommender
+from prediction_jobs import PredictionJobs
+from coverage import coverage_report, CoverageGrid
+from spray_path import SprayPath, PathTotals, AVERAGE_SPEED
+from path_encoding import ACCEPT_FORMATS, POLYLINE_PRECISION, polyline_precision, negotiate_format, encode_path, decode_path, query_floats, unpack_request, compress, choose_encoding, STREAM_FORMATS, encode_stream, compress_stream
+from plan_cache import PlanCache, plan_key, etag_matches
+from plan_service import (validate_plan_request, drone_count, planning_options, build_planner, field_key,
+                          path_statistics, plan_path, fleet_plan_body)
+from batch_planner import plan_batch, batch_record
+from sqlalchemy import event
 from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
-import base64
-import cv2
 import numpy as np
 import logging
+import threading
 import traceback
 from werkzeug.security import generate_password_hash, check_password_hash
 import jwt
 from functools import wraps
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
+import hashlib
 import json
 import math
+import time
+
+# Heavy dependencies (scikit-learn, pandas, the Google API client, networkx and
+# scipy) are imported where they are used, so the server starts answering
+# probes before they are loaded.
+startup_report.mark('imports')
 
 # Configure logging
 logging.basicConfig(
@@ -49,45 +65,191 @@ app.config['GOOGLE_REDIRECT_URI'] = os.getenv('GOOGLE_REDIRECT_URI', 'http://loc
 # Initialize extensions
 db.init_app(app)
 
+startup_report.mark('configure_app')
+
 # Create database tables
 with app.app_context():
     db.create_all()
+startup_report.mark('create_database')
 
 # Load model and scaler
 MODEL_FILE = 'models/crop_model.joblib'
 SCALER_FILE = 'models/crop_model_scaler.joblib'
 DATA_FILE = 'data/crop_data.csv'
+MODEL_REGISTRY_DIR = 'models/registry'
+# Serve a compacted forest (see forest_compaction.py) in place of the full model
+COMPACT_MODEL_FILE = os.getenv('COMPACT_MODEL_FILE')
+
+# Serve the compiled, pandas-free forest instead of the pickled estimator
+USE_COMPILED_MODEL = os.getenv('USE_COMPILED_MODEL', '1') == '1'
+# Seconds between checks of the registry's ACTIVE file for a new model version
+MODEL_WATCH_INTERVAL = float(os.getenv('MODEL_WATCH_INTERVAL', 5.0))
+
+model_registry = ModelRegistry(
+    MODEL_REGISTRY_DIR,
+    use_compiled=USE_COMPILED_MODEL,
+    watch_interval=MODEL_WATCH_INTERVAL
+)
+
+# Batch prediction limits
+MAX_BATCH_ROWS = int(os.getenv('MAX_BATCH_ROWS', 10000))
+DEFAULT_TOP_K = 3
+
+# Micro-batching of concurrent single-sample predictions
+PREDICT_BATCHING = os.getenv('PREDICT_BATCHING', '1') == '1'
+PREDICT_BATCH_SIZE = int(os.getenv('PREDICT_BATCH_SIZE', 64))
+PREDICT_BATCH_WINDOW_MS = float(os.getenv('PREDICT_BATCH_WINDOW_MS', 2.0))
+
+# Cache of single-sample predictions keyed by the rounded feature vector
+PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', 4096))
+PREDICTION_CACHE_TTL = float(os.getenv('PREDICTION_CACHE_TTL', 300))
+PREDICTION_CACHE_PRECISION = int(os.getenv('PREDICTION_CACHE_PRECISION', 2))
+prediction_cache = TTLCache(maxsize=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL)
+
+# Prepared field state (obstacle index, occupancy grids, sweep segments) keyed by field content
+FIELD_CACHE_SIZE = int(os.getenv('FIELD_CACHE_SIZE', 256))
+FIELD_CACHE_MB = float(os.getenv('FIELD_CACHE_MB', 256))
+field_cache = TTLCache(maxsize=FIELD_CACHE_SIZE, maxbytes=int(FIELD_CACHE_MB * 2**20),
+                       sizeof=lambda planner: planner.nbytes)
 
-model = None
-scaler = None
+# Encoded /path-plan responses keyed by the canonical request; with
+# PLAN_CACHE_DIR they are shared on disk between worker processes
+PLAN_CACHE_SIZE = int(os.getenv('PLAN_CACHE_SIZE', 512))
+PLAN_CACHE_MB = float(os.getenv('PLAN_CACHE_MB', 128))
+PLAN_CACHE_TTL = float(os.getenv('PLAN_CACHE_TTL', 3600))
+PLAN_CACHE_DIR = os.getenv('PLAN_CACHE_DIR')
+plan_cache = PlanCache(maxsize=PLAN_CACHE_SIZE, ttl=PLAN_CACHE_TTL,
+                       maxbytes=int(PLAN_CACHE_MB * 2**20), directory=PLAN_CACHE_DIR)
+
+# Multi-drone plans (numDrones > 1): one region per drone, planned on a process pool
+MAX_DRONES = int(os.getenv('MAX_DRONES', 32))
+DRONE_PLAN_WORKERS = int(os.getenv('DRONE_PLAN_WORKERS', os.cpu_count() or 1))
+
+# Batch planning of many fields per request, on a process pool
+MAX_BATCH_FIELDS = int(os.getenv('MAX_BATCH_FIELDS', 1000))
+BATCH_PLAN_WORKERS = int(os.getenv('BATCH_PLAN_WORKERS', os.cpu_count() or 1))
+
+# Bulk prediction jobs over uploaded CSV files
+PREDICTION_JOBS_DIR = os.getenv('PREDICTION_JOBS_DIR', os.path.join('data', 'jobs'))
+PREDICTION_JOB_WORKERS = int(os.getenv('PREDICTION_JOB_WORKERS', 2))
+PREDICTION_JOB_CHUNK_ROWS = int(os.getenv('PREDICTION_JOB_CHUNK_ROWS', 10000))
+# Seconds a job waits for a model to be loaded before it fails
+PREDICTION_JOB_MODEL_TIMEOUT = float(os.getenv('PREDICTION_JOB_MODEL_TIMEOUT', 600))
+
+# Nearest-profile recommendations from the crops table, also used while no model is loaded
+PROFILE_FALLBACK = os.getenv('PROFILE_FALLBACK', '1') == '1'
+PROFILE_CHECK_INTERVAL = float(os.getenv('PROFILE_CHECK_INTERVAL', 5.0))
 
 # Google OAuth2 configuration
 SCOPES = ['https://www.googleapis.com/auth/userinfo.email', 'https://www.googleapis.com/auth/userinfo.profile']
 
 def initialize_model():
-    global model, scaler
     try:
         # Create directories if they don't exist
         os.makedirs('models', exist_ok=True)
         os.makedirs('data', exist_ok=True)
         
-        # Train and load model if it doesn't exist
+        # Train model if it doesn't exist
         if not os.path.exists(MODEL_FILE) or not os.path.exists(SCALER_FILE):
+            startup_report.set_state('training')
             logger.info("Training new model...")
-            model, scaler = train_model(DATA_FILE, MODEL_FILE)
-        else:
-            logger.info("Loading existing model...")
-            model = load_model(MODEL_FILE)
-            scaler = load_model(SCALER_FILE)
-            
+            with startup_report.phase('train_model'):
+                from model_trainer import train_model
+                train_model(DATA_FILE, MODEL_FILE)
+
+        startup_report.set_state('loading')
+        with startup_report.phase('publish_model'):
+            # A newly trained model is activated; otherwise keep the version an admin last activated
+            known_versions = model_registry.versions()
+            if COMPACT_MODEL_FILE and os.path.exists(COMPACT_MODEL_FILE):
+                version = model_registry.publish_compiled(COMPACT_MODEL_FILE)
+            else:
+                version = model_registry.publish(MODEL_FILE, SCALER_FILE)
+            if version in known_versions and model_registry.active_version() in known_versions:
+                version = model_registry.active_version()
+
+        logger.info(f"Loading model version {version}...")
+        with startup_report.phase('load_model'):
+            bundle = model_registry.activate(version)
+
+        with startup_report.phase('warmup'):
+            # Touch the model once so the first real request does not pay for page faults
+            bundle.model.predict(scale_features(bundle.scaler, np.zeros((1, len(FEATURE_COLUMNS)))))
+
+        startup_report.set_state('ready')
         logger.info("Model and scaler loaded successfully")
+        logger.info(f"Startup phases: {startup_report.summary()}")
         return True
     except Exception as e:
+        startup_report.set_state('failed', str(e))
         logger.error(f"Error loading model: {e}")
         return False
 
-# Initialize model on startup
-initialize_model()
+def clear_prediction_cache(bundle):
+    # Cached predictions belong to the previous model
+    prediction_cache.clear()
+    logger.info(f"Serving model version {bundle.version}")
+
+model_registry.on_activate(clear_prediction_cache)
+
+# Load (or train) the model in the background so the app can answer probes right away
+model_warmup_thread = threading.Thread(target=initialize_model, name='model-warmup', daemon=True)
+model_warmup_thread.start()
+startup_report.mark('start_model_warmup')
+
+def predict_labels(X):
+    """Predict one (crop label, model version) pair per row with the active model."""
+    bundle = model_registry.active()
+    labels = bundle.model.predict(scale_features(bundle.scaler, X))
+    return [(str(label), bundle.version) for label in labels]
+
+prediction_batcher = MicroBatcher(
+    predict_labels,
+    max_batch_size=PREDICT_BATCH_SIZE,
+    max_wait_ms=PREDICT_BATCH_WINDOW_MS
+)
+
+def job_model_bundle(version):
+    # A resumed job keeps the model version it started with, as long as it is still published
+    if version:
+        try:
+            return model_registry.load(version)
+        except ValueError:
+            logger.warning(f"Model version {version} is gone; resuming the job on the active model")
+    return model_registry.active()
+
+prediction_jobs = PredictionJobs(
+    PREDICTION_JOBS_DIR,
+    job_model_bundle,
+    workers=PREDICTION_JOB_WORKERS,
+    chunk_size=PREDICTION_JOB_CHUNK_ROWS,
+    model_timeout=PREDICTION_JOB_MODEL_TIMEOUT
+)
+# Pick up jobs interrupted by a crash or restart where they left off
+prediction_jobs.resume()
+
+# Crop optimal_* columns, in FEATURE_COLUMNS order
+PROFILE_COLUMNS = [Crop.optimal_n, Crop.optimal_p, Crop.optimal_k, Crop.optimal_temperature,
+                   Crop.optimal_humidity, Crop.optimal_ph, Crop.optimal_rainfall]
+
+def load_crop_profiles():
+    with app.app_context():
+        rows = db.session.query(Crop.name, *PROFILE_COLUMNS).all()
+    # Crops without a complete profile cannot be placed in the index
+    rows = [row for row in rows if None not in tuple(row)[1:]]
+    return [row[0] for row in rows], [list(row[1:]) for row in rows]
+
+def crop_table_signature():
+    # A hash of every crop's id, name and profile, so any insert, delete, rename or profile
+    # edit changes it, also when another process made it; the crops table is small
+    with app.app_context():
+        rows = db.session.query(Crop.id, Crop.name, *PROFILE_COLUMNS).order_by(Crop.id).all()
+    return hashlib.sha1(json.dumps([list(row) for row in rows]).encode('utf-8')).hexdigest()
+
+profile_recommender = ProfileRecommender(load_crop_profiles, crop_table_signature, PROFILE_CHECK_INTERVAL)
+
+for event_name in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(Crop, event_name, lambda mapper, connection, target: profile_recommender.invalidate())
 
 # Token required decorator
 def token_required(f):
@@ -224,6 +386,26 @@ def get_recommendations(current_user):
         logger.error(traceback.format_exc())
         return jsonify({'error': 'An error occurred while fetching recommendations'}), 500
 
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    # Liveness: the process is up and serving requests
+    return jsonify({'status': 'ok'})
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    # Readiness: a model is loaded and predictions can be served
+    active = model_registry.active()
+    status = 200 if active is not None else 503
+    return jsonify({
+        'ready': active is not None,
+        'state': startup_report.state,
+        'modelVersion': active.version if active else None
+    }), status
+
+@app.route('/api/startup-report', methods=['GET'])
+def startup_report_view():
+    return jsonify(startup_report.as_dict())
+
 @app.route('/')
 def index():
     return open('index.html').read()
@@ -231,7 +413,8 @@ def index():
 @app.route('/api/crop-recommendation', methods=['POST'])
 def predict():
     try:
-        if not model or not scaler:
+        bundle = model_registry.active()
+        if bundle is None and not PROFILE_FALLBACK:
             return jsonify({'error': 'Model not loaded. Please try again later.'}), 500
 
         data = request.get_json()
@@ -247,177 +430,512 @@ def predict():
                 return jsonify({'error': f'Invalid value for {field}. Must be a number.'}), 400
 
         # Convert input values to float
-        user_input = pd.DataFrame({
-            'N': [float(data['N'])],
-            'P': [float(data['P'])],
-            'K': [float(data['K'])],
-            'temperature': [float(data['temperature'])],
-            'humidity': [float(data['humidity'])],
-            'ph': [float(data['ph'])],
-            'rainfall': [float(data['rainfall'])],
-        })
+        user_input = [float(data[field]) for field in FEATURE_COLUMNS]
 
-        # Scale the input
-        user_input_scaled = scaler.transform(user_input)
+        if bundle is None:
+            # No model yet: answer from the nearest crop profiles instead
+            crops = profile_recommender.recommend(np.array([user_input]), DEFAULT_TOP_K)
+            if crops is None:
+                return jsonify({'error': 'Model not loaded. Please try again later.'}), 500
+            return jsonify({'recommendations': format_recommendations(crops[0]), 'modelVersion': None,
+                            'source': 'profiles'})
 
-        # Make prediction
-        prediction = model.predict(user_input_scaled)
+        # Dashboards re-query the same plots, so serve repeats from the cache
+        features_key = quantize_features(user_input, PREDICTION_CACHE_PRECISION)
+        served_version = bundle.version
+        recommended_crop_name = prediction_cache.get(features_key + (served_version,))
+        if recommended_crop_name is None:
+            # Scale and predict through the micro-batcher so concurrent requests share one model call
+            if PREDICT_BATCHING:
+                recommended_crop_name, served_version = prediction_batcher.submit(user_input)
+            else:
+                recommended_crop_name, served_version = predict_labels(np.array([user_input]))[0]
+            prediction_cache.put(features_key + (served_version,), recommended_crop_name)
 
         # Modify the response to match the frontend's expected format
         # In a real application, you would get confidence and description from your model or data source
-        recommended_crop_name = prediction[0]
         recommendation_list = [{
             'name': recommended_crop_name,
             'confidence': 0.95, # Placeholder confidence
             'description': f'Based on the provided conditions, {recommended_crop_name} is recommended.' # Placeholder description
         }]
 
-        return jsonify({'recommendations': recommendation_list})
+        return jsonify({'recommendations': recommendation_list, 'modelVersion': served_version})
     except Exception as e:
         logger.error(f"Prediction error: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/crop-recommendation/batch', methods=['POST'])
+def predict_batch():
+    try:
+        # Hold on to one model version for the whole batch, even if a swap happens meanwhile
+        bundle = model_registry.active()
+        if bundle is None and not PROFILE_FALLBACK:
+            return jsonify({'error': 'Model not loaded. Please try again later.'}), 500
+
+        # Accept a JSON array ({"samples": [...]} also works), CSV or NDJSON body
+        try:
+            samples = parse_samples(request.get_data(), request.content_type)
+            X, row_errors = samples_to_array(samples)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if len(X) > MAX_BATCH_ROWS:
+            return jsonify({'error': f'Batch too large. At most {MAX_BATCH_ROWS} rows are allowed.'}), 400
+
+        top_k = request.args.get('top_k', DEFAULT_TOP_K)
+        try:
+            top_k = int(top_k)
+        except ValueError:
+            return jsonify({'error': 'top_k must be an integer'}), 400
+
+        # Score every valid row with a single transform/predict_proba pass
+        valid_rows = np.setdiff1d(np.arange(len(X)), list(row_errors))
+        if bundle is None:
+            # No model yet: answer from the nearest crop profiles instead
+            predictions = profile_recommender.recommend(X[valid_rows], top_k) if len(valid_rows) else []
+            if predictions is None:
+                return jsonify({'error': 'Model not loaded. Please try again later.'}), 500
+        else:
+            predictions = predict_top_k(bundle.model, bundle.scaler, X[valid_rows], top_k) if len(valid_rows) else []
+
+        results = [{'index': i, 'error': message} for i, message in row_errors.items()]
+        for i, crops in zip(valid_rows, predictions):
+            results.append({'index': int(i), 'recommendations': format_recommendations(crops)})
+        results.sort(key=lambda result: result['index'])
+
+        return jsonify({
+            'results': results,
+            'count': len(results),
+            'errors': len(row_errors),
+            'modelVersion': bundle.version if bundle else None,
+            'source': 'model' if bundle else 'profiles'
+        })
+    except Exception as e:
+        logger.error(f"Batch prediction error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/crop-recommendation/nearest', methods=['POST'])
+def nearest_crops():
+    try:
+        # One sample object, or a batch in any format the batch endpoint accepts
+        payload = request.get_json(silent=True)
+        single = isinstance(payload, dict) and 'samples' not in payload
+        try:
+            if single:
+                samples = parse_samples(json.dumps([payload]), 'application/json')
+            else:
+                samples = parse_samples(request.get_data(), request.content_type)
+            X, row_errors = samples_to_array(samples)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if len(X) > MAX_BATCH_ROWS:
+            return jsonify({'error': f'Batch too large. At most {MAX_BATCH_ROWS} rows are allowed.'}), 400
+
+        try:
+            k = int(request.args.get('k', DEFAULT_TOP_K))
+        except ValueError:
+            return jsonify({'error': 'k must be an integer'}), 400
+
+        valid_rows = np.setdiff1d(np.arange(len(X)), list(row_errors))
+        neighbours = profile_recommender.recommend(X[valid_rows], k) if len(valid_rows) else []
+        if neighbours is None:
+            return jsonify({'error': 'No crop profiles available'}), 503
+
+        if single:
+            if row_errors:
+                return jsonify({'error': row_errors[0]}), 400
+            return jsonify({'crops': neighbours[0]})
+
+        results = [{'index': i, 'error': message} for i, message in row_errors.items()]
+        for i, crops in zip(valid_rows, neighbours):
+            results.append({'index': int(i), 'crops': crops})
+        results.sort(key=lambda result: result['index'])
+        return jsonify({'results': results, 'count': len(results), 'errors': len(row_errors)})
+    except Exception as e:
+        logger.error(f"Nearest profile error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/prediction-jobs', methods=['POST'])
+def submit_prediction_job():
+    try:
+        output_format = request.args.get('format', 'ndjson')
+        try:
+            top_k = int(request.args.get('top_k', DEFAULT_TOP_K))
+        except ValueError:
+            return jsonify({'error': 'top_k must be an integer'}), 400
+
+        # A multipart upload (field "file") or a raw text/csv body; both are streamed to disk
+        upload = request.files.get('file')
+        stream = upload.stream if upload is not None else request.stream
+        try:
+            job = prediction_jobs.submit(stream, output_format, top_k)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        return jsonify({
+            'jobId': job['id'],
+            'status': job['status'],
+            'statusUrl': url_for('prediction_job_status', job_id=job['id']),
+            'resultUrl': url_for('prediction_job_result', job_id=job['id'])
+        }), 202
+    except Exception as e:
+        logger.error(f"Prediction job submit error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/prediction-jobs/<job_id>', methods=['GET'])
+def prediction_job_status(job_id):
+    job = prediction_jobs.status(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/api/prediction-jobs/<job_id>/result', methods=['GET'])
+def prediction_job_result(job_id):
+    job = prediction_jobs.status(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job['status'] != 'completed':
+        return jsonify({'error': f"Job is {job['status']}", 'status': job['status']}), 409
+
+    # send_file streams from disk and honours Range requests for large results
+    mimetype = 'application/x-ndjson' if job['format'] == 'ndjson' else 'text/csv'
+    return send_file(os.path.abspath(prediction_jobs.result_path(job_id)), mimetype=mimetype,
+                     as_attachment=True, download_name=f"predictions-{job_id}.{job['format']}")
+
+@app.route('/api/crop-recommendation/stats', methods=['GET'])
+def prediction_stats():
+    active = model_registry.active()
+    return jsonify({
+        'batching': PREDICT_BATCHING,
+        'batcher': prediction_batcher.stats(),
+        'cache': prediction_cache.stats(),
+        'profiles': profile_recommender.stats(),
+        'modelVersion': active.version if active else None
+    })
+
+# Admin decorator, for routes that change what the server is running
+def admin_required(f):
+    @wraps(f)
+    @token_required
+    def decorated(current_user, *args, **kwargs):
+        if current_user.role != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
+        return f(current_user, *args, **kwargs)
+    return decorated
+
+@app.route('/api/admin/models', methods=['GET'])
+@admin_required
+def list_model_versions(current_user):
+    active = model_registry.active()
+    return jsonify({
+        'versions': model_registry.versions(),
+        'active': active.version if active else None
+    })
+
+@app.route('/api/admin/models/activate', methods=['POST'])
+@admin_required
+def activate_model_version(current_user):
+    try:
+        data = request.get_json() or {}
+        if 'version' not in data:
+            return jsonify({'error': 'Missing required field: version'}), 400
+
+        # Requests already holding the old bundle finish on it; other workers follow the ACTIVE file
+        try:
+            bundle = model_registry.activate(str(data['version']))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 404
+
+        logger.info(f"Model version {bundle.version} activated by {current_user.email}")
+        return jsonify({'message': 'Model version activated', 'active': bundle.version})
+    except Exception as e:
+        logger.error(f"Model activation error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+def cached_planner(data):
+    """Return (key, planner) for the request's field, reusing the prepared planner of a known field.
+
+    Cached planners are shared between concurrent requests, so their field
+    (obstacles, boundary) must not be changed; the preprocessing plans add
+    to them is locked and bounded per planner. Call field_cache.put(key,
+    planner) once planning ends, even on failure, so the cache records the
+    state the plan prepared.
+    """
+    key = field_key(data)
+    planner = field_cache.get(key)
+    if planner is None:
+        planner = build_planner(data)
+    return key, planner
+
 @app.route('/path-plan', methods=['POST'])
 def path_plan():
     try:
         data = request.get_json()
         
-        # Validate required fields
-        required_fields = ['fieldWidth', 'fieldHeight', 'coverageRadius', 'startX', 'startY', 'pattern']
-        if not all(field in data for field in required_fields):
-            return jsonify({'error': 'Missing required fields'}), 400
+        # Validate fields, pattern and drones
+        error = validate_plan_request(data, MAX_DRONES)
+        if error:
+            return jsonify({'error': error}), 400
         
-        # Validate field dimensions
-        if data['fieldWidth'] <= 0 or data['fieldHeight'] <= 0 or data['coverageRadius'] <= 0:
-            return jsonify({'error': 'Field dimensions and coverage radius must be positive'}), 400
-        
-        # Validate start point
-        if (data['startX'] < 0 or data['startY'] < 0 or 
-            data['startX'] > data['fieldWidth'] or data['startY'] > data['fieldHeight']):
-            return jsonify({'error': 'Start point must be within field boundaries'}), 400
-        
-        # Validate pattern
-        valid_patterns = ['zigzag', 'spiral', 'custom']
-        if data['pattern'] not in valid_patterns:
-            return jsonify({'error': f'Invalid pattern. Choose from: {valid_patterns}'}), 400
-        
-        # Create path planner instance
-        planner = PathPlanner(field_size=(data['fieldWidth'], data['fieldHeight']))
-        
-        # Generate path with optional parameters
-        path = planner.optimize_spraying_pattern(
-            start_point=(data['startX'], data['startY']),
-            coverage_radius=data['coverageRadius'],
-            pattern=data['pattern'],
-            spraying_rate=data.get('sprayingRate'),
-            smooth_path=data.get('smoothPath', True)
-        )
+        # Response format, from ?format= (or a 'format' field), else the Accept header
+        try:
+            path_format = negotiate_format(request.args.get('format') or data.get('format'),
+                                           request.headers.get('Accept'))
+            precision = polyline_precision(request.args.get('precision', data.get('precision', POLYLINE_PRECISION)))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        # Streaming (?stream=1) sends the path as it is generated, as NDJSON or float32 frames
+        stream = str(request.args.get('stream', data.get('stream', ''))).lower() in ('1', 'true')
+        if stream and path_format not in STREAM_FORMATS:
+            return jsonify({'error': f'Streaming supports the formats: {list(STREAM_FORMATS)}'}), 400
+        num_drones = drone_count(data)
+        if num_drones > 1 and (stream or path_format != 'json'):
+            return jsonify({'error': 'Multi-drone plans are returned as plain JSON'}), 400
         
-        if not path:
-            return jsonify({'error': 'Failed to generate path'}), 500
-        
-        # Calculate statistics
-        total_distance = calculate_total_distance(path)
-        coverage_area = calculate_coverage_area(path, data['coverageRadius'])
-        estimated_time = calculate_estimated_time(path, data.get('sprayingRate', 1.0))
-        
-        statistics = {
-            'totalDistance': total_distance,
-            'coverageArea': coverage_area,
-            'estimatedTime': estimated_time,
-            'numberOfPoints': len(path),
-            'pattern': data['pattern'],
-            'sprayingRate': data.get('sprayingRate', 1.0)
-        }
+        # The response is a pure function of the request, so repeats are served from the cache
+        started = time.perf_counter()
+        cache_key = plan_key(data, path_format, precision)
+        entry = plan_cache.get(cache_key) if not stream else None
+        if entry is not None:
+            return cached_plan_response(cache_key, entry, 'hit', started)
         
-        return jsonify({
-            'path': path,
-            'statistics': statistics
-        })
+        # Create path planner instance, with the optional polygon boundary and obstacles
+        try:
+            key, planner = cached_planner(data)
+        except (TypeError, ValueError, KeyError) as e:
+            return jsonify({'error': f'Invalid field geometry: {e}'}), 400
+        
+        if stream:
+            return stream_plan(key, planner, data, path_format)
+        if num_drones > 1:
+            try:
+                body = fleet_plan_body(planner, data, DRONE_PLAN_WORKERS)
+            finally:
+                field_cache.put(key, planner)
+            entry = plan_cache.put(cache_key, body, 'application/json')
+            return cached_plan_response(cache_key, entry, 'miss', started)
+        
+        # Generate the path and its statistics
+        try:
+            path, statistics = plan_path(planner, data)
+        finally:
+            field_cache.put(key, planner)
+        
+        body, mimetype, headers = encode_path(path, statistics, path_format, precision)
+        entry = plan_cache.put(cache_key, body, mimetype, headers)
+        return cached_plan_response(cache_key, entry, 'miss', started)
         
     except Exception as e:
         logger.error(f"Error in path planning: {str(e)}")
         logger.error(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
+def stream_plan(key, planner, data, path_format):
+    """Stream the path chunk by chunk as it is generated, with the statistics in a trailing record.
+
+    Distance, time, bounds and coverage are tallied as the chunks go by, on
+    a coverage grid over the field, so the server holds one chunk and the
+    grid rather than the whole path.
+    """
+    # Cache the planner now, in case the response is never iterated or setup fails; the
+    # stream puts it again when it ends, sized with the state the plan prepared
+    field_cache.put(key, planner)
+    chunks = planner.stream_spraying_pattern(start_point=(data['startX'], data['startY']),
+                                             coverage_radius=data['coverageRadius'], **planning_options(data))
+    totals = PathTotals()
+    coverage = CoverageGrid.for_field(planner.field_bounds(), data['coverageRadius'])
+    
+    def tallied():
+        try:
+            for chunk in chunks:
+                coverage.add(chunk.x, chunk.y, totals.add(chunk))
+                yield chunk
+        finally:
+            # Also when the client disconnects and the stream is closed early
+            field_cache.put(key, planner)
+    
+    def statistics():
+        return path_statistics(data, totals, coverage.report(planner.valid_mask))
+    
+    # A stream's size is not known up front, so it is compressed whenever the client accepts it
+    content_encoding = choose_encoding(math.inf, request.headers.get('Accept-Encoding'))
+    body = compress_stream(encode_stream(tallied(), statistics, path_format), content_encoding)
+    response = Response(body, mimetype=STREAM_FORMATS[path_format])
+    if content_encoding:
+        response.headers['Content-Encoding'] = content_encoding
+    response.headers['Vary'] = 'Accept, Accept-Encoding'
+    # Ask proxies such as nginx to pass the chunks on as they come
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/path-plan/batch', methods=['POST'])
+def path_plan_batch():
+    """Plan many fields at once: {"fields": [/path-plan request body, ...]}, each with an optional "id".
+
+    Every field gets its own entry with the status /path-plan would answer
+    and either the JSON result or the error, so one bad field does not fail
+    the batch. Results come in request order, or with ?stream=1 as NDJSON
+    lines in the order they finish, ending with the summary line.
+    """
+    try:
+        data = request.get_json(silent=True)
+        fields = data.get('fields') if isinstance(data, dict) else None
+        if not isinstance(fields, list) or not fields:
+            return jsonify({'error': 'Provide a non-empty list of fields'}), 400
+        if len(fields) > MAX_BATCH_FIELDS:
+            return jsonify({'error': f'At most {MAX_BATCH_FIELDS} fields per batch'}), 400
+        stream = str(request.args.get('stream', data.get('stream', ''))).lower() in ('1', 'true')
+        
+        summary = {'fields': len(fields), 'succeeded': 0, 'failed': 0, 'cacheHits': 0}
+        started = time.perf_counter()
+        records = batch_records(fields, summary)
+        
+        def summary_record():
+            summary['seconds'] = time.perf_counter() - started
+            return json.dumps({'summary': summary}, separators=(',', ':')).encode('utf-8')
+        
+        if stream:
+            def lines():
+                for _, record in records:
+                    yield record + b'\n'
+                yield summary_record() + b'\n'
+            
+            content_encoding = choose_encoding(math.inf, request.headers.get('Accept-Encoding'))
+            response = Response(compress_stream(lines(), content_encoding), mimetype='application/x-ndjson')
+            if content_encoding:
+                response.headers['Content-Encoding'] = content_encoding
+            response.headers['Vary'] = 'Accept-Encoding'
+            response.headers['X-Accel-Buffering'] = 'no'
+            return response
+        
+        results = dict(records)
+        body = b'{"results":[' + b','.join(results[index] for index in range(len(fields))) + b'],' + summary_record()[1:]
+        return encoded_response(body, 'application/json')
+        
+    except Exception as e:
+        logger.error(f"Error in batch path planning: {str(e)}")
+        logger.error(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+def batch_records(fields, summary):
+    """Yield (index, record) for every field of a batch: invalid and cached ones first, then the rest as planned."""
+    pending = []
+    for index, field in enumerate(fields):
+        error = validate_plan_request(field, MAX_DRONES)
+        if error:
+            summary['failed'] += 1
+            yield index, batch_record(index, field, 400, error)
+            continue
+        entry = plan_cache.get(plan_key(field))
+        if entry is None:
+            pending.append((index, field))
+            continue
+        summary['succeeded'] += 1
+        summary['cacheHits'] += 1
+        yield index, batch_record(index, field, 200, entry.body)
+    
+    for index, status, result in plan_batch(pending, BATCH_PLAN_WORKERS):
+        if status == 200:
+            plan_cache.put(plan_key(fields[index]), result, 'application/json')
+            summary['succeeded'] += 1
+        else:
+            summary['failed'] += 1
+        yield index, batch_record(index, fields[index], status, result)
+
+@app.route('/path-plan/stats', methods=['GET'])
+def path_plan_stats():
+    return jsonify({'fieldCache': field_cache.stats(), 'planCache': plan_cache.stats()})
+
 @app.route('/path-plan/visualize', methods=['POST'])
 def visualize_path():
     try:
-        data = request.get_json()
+        # The path comes as JSON (point dicts or a polyline), msgpack, or a float32
+        # body with the other fields in the query string
+        required_fields = ['path', 'fieldWidth', 'fieldHeight', 'coverageRadius']
+        if ACCEPT_FORMATS.get(request.mimetype) == 'float32':
+            try:
+                data = query_floats(request.args, required_fields[1:])
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            data['path'] = None
+        else:
+            try:
+                data = unpack_request(request.get_data(), request.mimetype) or request.get_json()
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            if data is not None and 'x' in data and 'y' in data:
+                data['path'] = None
         
         # Validate required fields
-        required_fields = ['path', 'fieldWidth', 'fieldHeight', 'coverageRadius']
-        if not all(field in data for field in required_fields):
+        if not data or not all(field in data for field in required_fields):
             return jsonify({'error': 'Missing required fields'}), 400
         
-        # Create path planner instance
-        planner = PathPlanner(field_size=(data['fieldWidth'], data['fieldHeight']))
+        # Path planner for the field size, shared with earlier requests on the same field
+        key, planner = cached_planner({'fieldWidth': data['fieldWidth'], 'fieldHeight': data['fieldHeight']})
+        field_cache.put(key, planner)
         
         # Generate visualization
-        visualization = planner.visualize_path(data['path'], data['coverageRadius'])
+        try:
+            path = decode_path(data, request.get_data(), request.mimetype)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        visualization = planner.visualize_path(path, data['coverageRadius'])
         
         if not visualization:
             return jsonify({'error': 'Failed to generate visualization'}), 500
         
-        return jsonify({
-            'visualization': visualization
-        })
+        started = time.perf_counter()
+        body = json.dumps({'visualization': visualization}).encode('utf-8')
+        return encoded_response(body, 'application/json', started=started)
         
     except Exception as e:
         logger.error(f"Error in visualization: {str(e)}")
         logger.error(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
+def encoded_response(body, mimetype, headers=None, started=None):
+    """Send an encoded body, compressed as the client's Accept-Encoding allows."""
+    body, content_encoding = compress(body, request.headers.get('Accept-Encoding'))
+    response = Response(body, mimetype=mimetype, headers=headers or {})
+    if content_encoding:
+        response.headers['Content-Encoding'] = content_encoding
+    response.headers['Vary'] = 'Accept, Accept-Encoding'
+    if started is not None:
+        response.headers['Server-Timing'] = f'encode;dur={1000 * (time.perf_counter() - started):.2f}'
+    return response
+
+def cached_plan_response(key, entry, cache_status, started):
+    """Send a cached plan with its ETag, or 304 Not Modified when If-None-Match already names it."""
+    content_encoding = choose_encoding(len(entry.body), request.headers.get('Accept-Encoding'))
+    etag = entry.etag(content_encoding)
+    if etag_matches(request.headers.get('If-None-Match'), etag):
+        response = Response(status=304)
+    else:
+        response = Response(plan_cache.payload(key, entry, content_encoding), mimetype=entry.mimetype,
+                            headers=entry.headers)
+        if content_encoding:
+            response.headers['Content-Encoding'] = content_encoding
+    response.headers['ETag'] = etag
+    response.headers['Vary'] = 'Accept, Accept-Encoding'
+    response.headers['X-Cache'] = cache_status
+    response.headers['Server-Timing'] = f'{cache_status};dur={1000 * (time.perf_counter() - started):.2f}'
+    return response
+
 def calculate_total_distance(path):
     """Calculate the total distance of the path."""
-    total_distance = 0
-    for i in range(len(path) - 1):
-        dx = path[i + 1]['x'] - path[i]['x']
-        dy = path[i + 1]['y'] - path[i]['y']
-        total_distance += np.sqrt(dx * dx + dy * dy)
-    return total_distance
+    return SprayPath.from_points(path).total_distance
 
 def calculate_coverage_area(path, coverage_radius):
     """Calculate the total coverage area."""
-    # Create a grid of points
-    x_min = min(p['x'] for p in path) - coverage_radius
-    x_max = max(p['x'] for p in path) + coverage_radius
-    y_min = min(p['y'] for p in path) - coverage_radius
-    y_max = max(p['y'] for p in path) + coverage_radius
-    
-    # Calculate grid resolution
-    resolution = coverage_radius / 2
-    x_points = np.arange(x_min, x_max + resolution, resolution)
-    y_points = np.arange(y_min, y_max + resolution, resolution)
-    
-    # Count covered points
-    covered_points = 0
-    for x in x_points:
-        for y in y_points:
-            for point in path:
-                dx = x - point['x']
-                dy = y - point['y']
-                if dx * dx + dy * dy <= coverage_radius * coverage_radius:
-                    covered_points += 1
-                    break
-    
-    # Calculate area
-    area = covered_points * resolution * resolution
-    return area
+    path = SprayPath.from_points(path)
+    return coverage_report(path.x, path.y, coverage_radius)['coveredArea']
 
 def calculate_estimated_time(path, spraying_rate=1.0):
     """Calculate estimated time to complete the path."""
-    # Average speed in meters per minute
-    avg_speed = 10.0  # meters per minute
-    
-    # Calculate total distance
-    total_distance = calculate_total_distance(path)
-    
-    # Calculate time based on distance and spraying rate
-    base_time = total_distance / avg_speed
-    adjusted_time = base_time * spraying_rate
-    
-    return adjusted_time
+    # Time at the average speed, scaled by the spraying rate
+    return calculate_total_distance(path) / AVERAGE_SPEED * spraying_rate
 
 @app.route('/api/pesticide-recommendation', methods=['POST'])
 def pesticide_recommendation():
@@ -504,6 +1022,8 @@ def get_pesticide_recommendations(crop, pest, severity):
 @app.route('/api/auth/google')
 def google_login():
     try:
+        from google_auth_oauthlib.flow import Flow
+
         flow = Flow.from_client_config(
             {
                 "web": {
@@ -529,6 +1049,9 @@ def google_login():
 @app.route('/api/auth/google/callback')
 def google_callback():
     try:
+        from google_auth_oauthlib.flow import Flow
+        from googleapiclient.discovery import build
+
         flow = Flow.from_client_config(
             {
                 "web": {
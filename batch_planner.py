@@ -0,0 +1,83 @@
+import json
+import logging
+import os
+from concurrent.futures import as_completed
+from plan_service import build_planner, field_key, drone_count, plan_path, fleet_plan_body
+from path_encoding import encode_path
+from process_pool import submit
+
+logger = logging.getLogger(__name__)
+
+# Fields with the same geometry planned by one task, sharing its prepared planner;
+# larger groups are split so one popular field does not keep a single worker busy
+GROUP_SIZE = 16
+
+def plan_body(planner, data):
+    """The /path-plan JSON body for a request on planner's field; multi-drone plans run in this process."""
+    if drone_count(data) > 1:
+        return fleet_plan_body(planner, data, workers=1)
+    path, statistics = plan_path(planner, data)
+    return encode_path(path, statistics, 'json')[0]
+
+def _plan_group(group):
+    """Plan (index, request) pairs that share a field geometry with one planner.
+
+    Returns (index, status, JSON body or error message) per request, the
+    status being the one /path-plan would answer.
+    """
+    try:
+        planner = build_planner(group[0][1])
+    except (TypeError, ValueError, KeyError) as e:
+        return [(index, 400, f'Invalid field geometry: {e}') for index, _ in group]
+    results = []
+    for index, data in group:
+        try:
+            results.append((index, 200, plan_body(planner, data)))
+        except Exception as e:
+            logger.error(f"Error planning batch field {index}: {e}")
+            results.append((index, 500, str(e)))
+    return results
+
+def group_by_field(items, group_size=GROUP_SIZE):
+    """Split (index, request) pairs into groups of at most group_size with identical field geometry."""
+    groups = {}
+    for index, data in items:
+        groups.setdefault(field_key(data), []).append((index, data))
+    return [members[begin:begin + group_size]
+            for members in groups.values() for begin in range(0, len(members), group_size)]
+
+def plan_batch(items, workers=None, group_size=GROUP_SIZE):
+    """Plan many validated /path-plan requests, yielding (index, status, body or error) as each finishes.
+
+    items are (index, request) pairs. Requests on the same field geometry
+    are planned together so they share its obstacle index, sweep lines
+    and grids; groups run on the shared process pool of workers processes
+    (os.cpu_count() by default; 1 plans in this process).
+    """
+    groups = group_by_field(items, group_size)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(groups) <= 1:
+        for group in groups:
+            yield from _plan_group(group)
+        return
+    futures = {submit(workers, _plan_group, group): group for group in groups}
+    try:
+        for future in as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as e:
+                # A worker killed part way (out of memory, a signal) fails its own group only
+                logger.error(f"Batch group of {len(futures[future])} fields failed: {e}")
+                results = [(index, 500, f'Planning failed: {e}') for index, _ in futures[future]]
+            yield from results
+    finally:
+        # The pool outlives this batch: drop the groups not started when the client goes away
+        for future in futures:
+            future.cancel()
+
+def batch_record(index, data, status, result):
+    """One field's entry in a batch response, as JSON bytes; a successful result is the /path-plan body."""
+    head = {'index': index, 'id': data.get('id') if isinstance(data, dict) else None, 'status': status}
+    if status != 200:
+        return json.dumps(dict(head, error=result), separators=(',', ':')).encode('utf-8')
+    return json.dumps(head, separators=(',', ':')).encode('utf-8')[:-1] + b',"result":' + result + b'}'
@@ -0,0 +1,53 @@
+"""Planning many fields as one batch versus one /path-plan request at a time.
+
+The batch repeats a handful of field geometries with different start points
+and patterns, as a fleet's daily jobs do. Per request, every request builds
+its own planner (no field cache); the batch groups requests by geometry so
+each group shares one prepared planner, planned in this process and on a
+process pool.
+
+Usage: python benchmarks/bench_batch_planner.py [fields] [geometries]   (default 48 6)
+"""
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from batch_planner import plan_batch, plan_body
+from plan_service import build_planner
+
+def batch(n_fields, n_geometries, seed=0):
+    rng = np.random.default_rng(seed)
+    geometries = []
+    for _ in range(n_geometries):
+        size = float(rng.uniform(150, 250))
+        obstacles = [{'x': float(x), 'y': float(y), 'radius': float(rng.uniform(2, 6))}
+                     for x, y in rng.uniform(0.1, 0.9, size=(40, 2)) * size]
+        geometries.append({'fieldWidth': size, 'fieldHeight': size, 'obstacles': obstacles})
+    fields = []
+    for i in range(n_fields):
+        field = dict(geometries[i % n_geometries], coverageRadius=5.0, startX=2.0 + i % 3, startY=2.0,
+                     pattern=('zigzag', 'spiral', 'custom')[i % 3], smoothPath=False)
+        fields.append(field)
+    return list(enumerate(fields))
+
+def main():
+    n_fields = int(sys.argv[1]) if len(sys.argv) > 1 else 48
+    n_geometries = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    items = batch(n_fields, n_geometries)
+    print(f"{n_fields} fields on {n_geometries} geometries, {os.cpu_count()} cores")
+
+    start = time.perf_counter()
+    for _, data in items:
+        plan_body(build_planner(data), data)
+    print(f"per request        {time.perf_counter() - start:7.2f} s")
+
+    for workers in sorted({1, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        statuses = [status for _, status, _ in plan_batch(items, workers=workers)]
+        assert statuses.count(200) == n_fields
+        print(f"batch, {workers:2d} workers  {time.perf_counter() - start:7.2f} s")
+
+if __name__ == '__main__':
+    main()
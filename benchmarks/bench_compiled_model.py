@@ -0,0 +1,67 @@
+"""Compare sklearn and compiled-forest crop prediction latency.
+
+Usage: python benchmarks/bench_compiled_model.py [path/to/crop_data.csv]
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from compiled_forest import CompiledForest
+from crop_predictor import FEATURE_COLUMNS
+
+def synthetic_dataset(n_rows=2200, n_crops=22, seed=0):
+    """Clustered soil/climate samples shaped like the public crop dataset."""
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform([0, 5, 5, 10, 15, 4, 20], [140, 145, 205, 40, 100, 9, 300], size=(n_crops, 7))
+    labels = rng.integers(0, n_crops, n_rows)
+    X = centers[labels] * rng.normal(1.0, 0.08, size=(n_rows, 7))
+    return pd.DataFrame(X, columns=FEATURE_COLUMNS), np.array([f'crop{i}' for i in labels])
+
+def time_call(fn, repeat):
+    """Return p50 and p99 latency of fn in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return np.percentile(samples, 50), np.percentile(samples, 99)
+
+def main():
+    if len(sys.argv) > 1:
+        data = pd.read_csv(sys.argv[1])
+        X, y = data[FEATURE_COLUMNS], data['label'].to_numpy()
+    else:
+        X, y = synthetic_dataset()
+
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=100, random_state=42).fit(scaler.transform(X), y)
+    compiled = CompiledForest.from_sklearn(model, scaler)
+
+    queries = X.sample(n=10000, replace=True, random_state=1).to_numpy()
+    queries = queries * np.random.default_rng(2).normal(1.0, 0.05, size=queries.shape)
+
+    # The compiled path must reproduce the estimator's labels exactly
+    expected = model.predict(scaler.transform(pd.DataFrame(queries, columns=FEATURE_COLUMNS)))
+    mismatches = int((compiled.predict(queries) != expected.astype(str)).sum())
+    print(f"Trees: {compiled.n_trees}  nodes: {len(compiled.feature)}  label mismatches: {mismatches}/{len(queries)}")
+
+    print(f"{'batch':>6} {'sklearn p50':>12} {'p99':>8} {'compiled p50':>13} {'p99':>8} {'speedup':>8}")
+    for batch_size in (1, 16, 64, 256, 1024, 10000):
+        batch = queries[:batch_size]
+        repeat = 200 if batch_size <= 64 else 10
+
+        def run_sklearn():
+            # Mirrors the original request path: DataFrame, scaler, estimator
+            model.predict(scaler.transform(pd.DataFrame(batch, columns=FEATURE_COLUMNS)))
+
+        sk_p50, sk_p99 = time_call(run_sklearn, repeat)
+        c_p50, c_p99 = time_call(lambda: compiled.predict(batch), repeat)
+        print(f"{batch_size:>6} {sk_p50:>10.3f}ms {sk_p99:>6.3f}ms {c_p50:>11.3f}ms {c_p99:>6.3f}ms {sk_p50 / c_p50:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Compare the per-sample loop in calculate_coverage_area with the raster coverage engine.
+
+The loop tests every grid sample against every path point in Python, so it
+is only timed on the smaller fields; the raster engine stamps discs along the
+path onto the grid in NumPy blocks and also reports overlap and missed area.
+
+Usage: python benchmarks/bench_coverage.py [field_size ...]   (default 100 300 1000 3000)
+"""
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from path_planner import PathPlanner
+from coverage import coverage_report
+
+COVERAGE_RADIUS = 5.0
+# Largest path the loop is timed on
+MAX_LOOP_POINTS = 2_000
+
+def loop_coverage_area(path, coverage_radius):
+    x_min = min(p['x'] for p in path) - coverage_radius
+    x_max = max(p['x'] for p in path) + coverage_radius
+    y_min = min(p['y'] for p in path) - coverage_radius
+    y_max = max(p['y'] for p in path) + coverage_radius
+    resolution = coverage_radius / 2
+    covered_points = 0
+    for x in np.arange(x_min, x_max + resolution, resolution):
+        for y in np.arange(y_min, y_max + resolution, resolution):
+            for point in path:
+                dx = x - point['x']
+                dy = y - point['y']
+                if dx * dx + dy * dy <= coverage_radius * coverage_radius:
+                    covered_points += 1
+                    break
+    return covered_points * resolution * resolution
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 300, 1_000, 3_000]
+    print(f"{'field':>6} {'points':>8} {'loop s':>8} {'loop area':>11} {'raster s':>9} {'raster area':>12} "
+          f"{'overlap':>10} {'covered %':>10}")
+    for size in sizes:
+        planner = PathPlanner(field_size=(size, size))
+        path = planner.optimize_spraying_pattern((2, 2), COVERAGE_RADIUS, 'zigzag', smooth_path=False,
+                                                 resample_spacing=COVERAGE_RADIUS / 2)
+
+        loop_seconds, loop_area = float('nan'), float('nan')
+        if len(path) <= MAX_LOOP_POINTS:
+            start = time.perf_counter()
+            loop_area = loop_coverage_area(path.to_dicts(), COVERAGE_RADIUS)
+            loop_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        report = coverage_report(path.x, path.y, COVERAGE_RADIUS, field_mask=planner.valid_mask,
+                                 field_bounds=planner.field_bounds())
+        raster_seconds = time.perf_counter() - start
+        print(f"{size:>6} {len(path):>8} {loop_seconds:>8.2f} {loop_area:>11.0f} {raster_seconds:>9.3f} "
+              f"{report['coveredArea']:>12.0f} {report['overlapArea']:>10.0f} {report['coveragePercent']:>10.2f}")
+
+if __name__ == '__main__':
+    main()
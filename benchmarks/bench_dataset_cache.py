@@ -0,0 +1,67 @@
+"""Compare CSV parsing with the columnar dataset cache.
+
+For each row count a synthetic crop CSV is written, then timed three ways:
+pandas.read_csv, the first load_dataset call (which converts the CSV) and a
+cached load_dataset call that memory-maps the converted columns.
+
+Usage: python benchmarks/bench_dataset_cache.py [rows ...]   (default 10000 1000000)
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from dataset import FEATURE_COLUMNS, load_dataset
+
+def write_csv(path, n_rows, n_crops=22, seed=0, block=1_000_000):
+    """Write a clustered synthetic crop CSV without holding it all in memory."""
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform([0, 5, 5, 10, 15, 4, 20], [140, 145, 205, 40, 100, 9, 300], size=(n_crops, 7))
+    for start in range(0, n_rows, block):
+        count = min(block, n_rows - start)
+        labels = rng.integers(0, n_crops, count)
+        chunk = pd.DataFrame((centers[labels] * rng.normal(1.0, 0.08, size=(count, 7))).round(2),
+                             columns=FEATURE_COLUMNS)
+        chunk['label'] = np.array([f'crop{i}' for i in range(n_crops)])[labels]
+        chunk.to_csv(path, mode='a' if start else 'w', header=not start, index=False)
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 1_000_000]
+    work_dir = tempfile.mkdtemp(prefix='bench-dataset-')
+    try:
+        print(f"{'rows':>10} {'csv MB':>8} {'cache MB':>9} {'read_csv s':>11} {'convert s':>10} "
+              f"{'cached s':>9} {'touch s':>8} {'speedup':>8}")
+        for n_rows in sizes:
+            csv_path = os.path.join(work_dir, f'crop_{n_rows}.csv')
+            cache_dir = os.path.join(work_dir, 'cache')
+            write_csv(csv_path, n_rows)
+
+            _, parse_seconds = timed(lambda: pd.read_csv(csv_path))
+            _, convert_seconds = timed(lambda: load_dataset(csv_path, cache_dir=cache_dir))
+            dataset, cached_seconds = timed(lambda: load_dataset(csv_path, cache_dir=cache_dir))
+            # Reading every value once shows the cost of paging the columns in
+            _, touch_seconds = timed(lambda: float(np.asarray(dataset.X).sum()))
+
+            cache_bytes = sum(os.path.getsize(os.path.join(root, name))
+                              for root, _, names in os.walk(cache_dir) for name in names)
+            print(f"{n_rows:>10} {os.path.getsize(csv_path) / 1e6:>8.1f} {cache_bytes / 1e6:>9.1f} "
+                  f"{parse_seconds:>11.3f} {convert_seconds:>10.3f} {cached_seconds:>9.4f} "
+                  f"{touch_seconds:>8.3f} {parse_seconds / (cached_seconds + touch_seconds):>7.0f}x")
+
+            del dataset
+            os.remove(csv_path)
+            shutil.rmtree(cache_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
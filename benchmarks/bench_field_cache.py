@@ -0,0 +1,55 @@
+"""Cold versus warm planning on a cached field.
+
+A cold plan builds the PathPlanner and all its preprocessing (obstacle
+index, sweep segments, custom-pattern grid, occupancy grid and jump
+tables); a warm plan reuses the planner kept in the field cache, as
+/path-plan does for a field it has seen. Also prints the cache's size
+accounting for the prepared planner.
+
+Usage: python benchmarks/bench_field_cache.py [field_size]   (default 1000)
+"""
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from path_planner import PathPlanner
+from ttl_cache import TTLCache
+
+COVERAGE_RADIUS = 5.0
+
+def build(size, n_obstacles=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    planner = PathPlanner(field_size=(size, size))
+    planner.set_boundary(np.array([(0, 0), (1, 0.05), (0.95, 1), (0.02, 0.97)]) * size)
+    for x, y in rng.uniform(0.05, 0.95, size=(n_obstacles, 2)) * size:
+        planner.add_obstacle(float(x), float(y), float(rng.uniform(1, 4)))
+    return planner
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    start = (size * 0.1, size * 0.1)
+    tasks = {
+        'zigzag': lambda planner: planner.optimize_spraying_pattern(start, COVERAGE_RADIUS, 'zigzag', smooth_path=False),
+        'custom': lambda planner: planner.optimize_spraying_pattern(start, COVERAGE_RADIUS * 4, 'custom', smooth_path=False),
+        'route (jps)': lambda planner: planner.plan_grid_path(start, (size * 0.9, size * 0.9), method='jps')
+    }
+    cache = TTLCache(maxsize=16, maxbytes=512 * 2**20, sizeof=lambda planner: planner.nbytes)
+
+    print(f"{'task':>12} {'cold s':>8} {'warm s':>8} {'speedup':>8}")
+    for name, task in tasks.items():
+        began = time.perf_counter()
+        planner = build(size)
+        task(planner)
+        cold = time.perf_counter() - began
+        cache.put(name, planner)
+
+        began = time.perf_counter()
+        task(cache.get(name))
+        warm = time.perf_counter() - began
+        print(f"{name:>12} {cold:>8.3f} {warm:>8.3f} {cold / warm:>7.1f}x")
+    print(cache.stats())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Compare networkx grid A* with the NumPy occupancy-grid A* and Jump Point Search.
+
+plan_path_with_graph used to build nx.grid_2d_graph, remove obstacle nodes
+one at a time and run nx.astar_path on every query. GridPlanner runs over
+a boolean occupancy array instead. Each field has scattered circular
+obstacles; the query crosses it corner to corner. networkx is only timed
+up to --nx-max cells per side, since its graph needs several GB at 1000x1000.
+
+Usage: python benchmarks/bench_grid_planner.py [size ...] [--nx-max N]   (default 200 1000, nx up to 1000)
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from path_planner import PathPlanner
+from grid_planner import GridPlanner
+
+def make_planner(size, density=0.0006, seed=0):
+    rng = np.random.default_rng(seed)
+    planner = PathPlanner(field_size=(size, size))
+    for x, y in rng.uniform(0.05, 0.95, size=(int(density * size * size), 2)) * size:
+        planner.add_obstacle(float(x), float(y), float(rng.uniform(2, 0.02 * size + 3)))
+    return planner
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('sizes', nargs='*', type=int, default=[200, 1_000])
+    parser.add_argument('--nx-max', type=int, default=1_000)
+    args = parser.parse_args()
+
+    print(f"{'grid':>10} {'engine':>16} {'prepare s':>10} {'query s':>8} {'length':>9} {'cells':>7}")
+    for size in args.sizes:
+        planner = make_planner(size)
+        start, end = (2, 2), (size - 3, size - 3)
+        rows = []
+
+        if size <= args.nx_max:
+            _, build_seconds = timed(planner.grid_to_graph)
+            path, query_seconds = timed(planner.plan_path, start, end)
+            rows.append(('networkx 4-conn', build_seconds, query_seconds, len(path) - 1 if path else None, path))
+            planner.graph = None
+
+        for connectivity, method in ((4, 'astar'), (8, 'astar'), (8, 'jps')):
+            grid, prepare_seconds = timed(GridPlanner.from_planner, planner, 1.0, connectivity)
+            if method == 'jps':
+                _, table_seconds = timed(grid._tables)
+                prepare_seconds += table_seconds
+            path, query_seconds = timed(grid.plan, start, end, method)
+            rows.append((f'{method} {connectivity}-conn', prepare_seconds, query_seconds,
+                         grid.path_length(path) if path else None, path))
+
+        for name, prepare_seconds, query_seconds, length, path in rows:
+            length = f'{length:.2f}' if length is not None else 'none'
+            print(f"{f'{size}x{size}':>10} {name:>16} {prepare_seconds:>10.2f} {query_seconds:>8.3f} "
+                  f"{length:>9} {len(path) if path else 0:>7}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Makespan and planning wall time of a multi-drone plan versus the number of drones.
+
+For each fleet size this plans the regions one after another in this
+process (serial) and on a process pool, and reports the slowest single
+region, the wall time a pool with a core per drone approaches.
+
+Usage: python benchmarks/bench_multi_drone.py [pattern] [field_size]   (default custom 600)
+"""
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from multi_drone import partition_field, plan_fleet, fleet_statistics, region_start
+from path_planner import PathPlanner
+
+COVERAGE_RADIUS = 5.0
+
+def build(size, n_obstacles=200, seed=0):
+    rng = np.random.default_rng(seed)
+    planner = PathPlanner(field_size=(size, size))
+    for x, y in rng.uniform(0.05, 0.95, size=(n_obstacles, 2)) * size:
+        planner.add_obstacle(float(x), float(y), float(rng.uniform(2, 8)))
+    return planner
+
+def main():
+    pattern = sys.argv[1] if len(sys.argv) > 1 else 'custom'
+    size = float(sys.argv[2]) if len(sys.argv) > 2 else 600.0
+    planner = build(size)
+    print(f"{pattern} on a {size:.0f} m field, {os.cpu_count()} cores")
+    for drones in (1, 2, 4, 8):
+        options = {'pattern': pattern, 'smooth_path': False}
+        start = time.perf_counter()
+        _, paths = plan_fleet(planner, (2.0, 2.0), COVERAGE_RADIUS, drones, workers=1, **options)
+        serial = time.perf_counter() - start
+        start = time.perf_counter()
+        plan_fleet(planner, (2.0, 2.0), COVERAGE_RADIUS, drones, workers=drones, **options)
+        pool = time.perf_counter() - start
+
+        slowest = 0.0
+        for region in partition_field(planner, COVERAGE_RADIUS, drones):
+            begin = time.perf_counter()
+            planner.restricted(region).optimize_spraying_pattern(
+                region_start(planner, region, COVERAGE_RADIUS, (2.0, 2.0)), COVERAGE_RADIUS, **options)
+            slowest = max(slowest, time.perf_counter() - begin)
+
+        _, fleet = fleet_statistics((2.0, 2.0), paths)
+        print(f"{drones} drones  makespan {fleet['makespan']:8.1f} min  balance {fleet['balance']:.3f}  "
+              f"serial {serial:6.2f} s  pool {pool:6.2f} s  slowest region {slowest:6.2f} s")
+
+if __name__ == '__main__':
+    main()
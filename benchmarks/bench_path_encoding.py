@@ -0,0 +1,32 @@
+"""Payload size and encoding time of every /path-plan response format.
+
+Plans a smoothed zigzag over square fields and encodes the path with
+each available format (json, polyline, msgpack, float32) under each
+content encoding (identity, gzip and, with the brotli package, br). Sizes
+include the extra headers the float32 format sends.
+
+Usage: python benchmarks/bench_path_encoding.py [field_size ...]   (default 300 1000 3000)
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from path_planner import PathPlanner
+from path_encoding import measure_formats
+
+COVERAGE_RADIUS = 5.0
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [300, 1_000, 3_000]
+    print(f"{'field':>6} {'points':>8} {'format':>9} {'encoding':>9} {'KB':>10} {'bytes/pt':>9} {'encode ms':>10}")
+    for size in sizes:
+        planner = PathPlanner(field_size=(size, size))
+        path = planner.optimize_spraying_pattern((2, 2), COVERAGE_RADIUS, 'zigzag')
+        statistics = {'totalDistance': path.total_distance, 'numberOfPoints': len(path)}
+        for result in measure_formats(path, statistics):
+            print(f"{size:>6} {len(path):>8} {result['format']:>9} {result['encoding']:>9} "
+                  f"{result['bytes'] / 1024:>10.1f} {result['bytesPerPoint']:>9.2f} {result['encodeMs']:>10.1f}")
+
+if __name__ == '__main__':
+    main()
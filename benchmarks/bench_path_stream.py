@@ -0,0 +1,64 @@
+"""Time to first byte and peak memory of a streamed versus a one-shot /path-plan body.
+
+The one-shot body plans the whole path, computes its coverage and encodes
+it as JSON before sending anything; the stream encodes each sweep line,
+spiral turn or lap as it is generated and tallies the statistics on the
+way. Peak memory is the largest traced allocation while the body is made.
+
+Usage: python benchmarks/bench_path_stream.py [field_width field_height]   (default 2500 2000, 5 km2)
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from coverage import coverage_report, CoverageGrid
+from path_encoding import encode_path, encode_stream
+from path_planner import PathPlanner
+from spray_path import PathTotals
+
+COVERAGE_RADIUS = 5.0
+
+def one_shot(planner, **kwargs):
+    path = planner.optimize_spraying_pattern(coverage_radius=COVERAGE_RADIUS, **kwargs)
+    coverage = coverage_report(path.x, path.y, COVERAGE_RADIUS, field_mask=planner.valid_mask,
+                               field_bounds=planner.field_bounds())
+    yield encode_path(path, {'totalDistance': path.total_distance, 'coverage': coverage})[0]
+
+def streamed(planner, **kwargs):
+    totals = PathTotals()
+    grid = CoverageGrid.for_field(planner.field_bounds(), COVERAGE_RADIUS)
+    def tallied():
+        for chunk in planner.stream_spraying_pattern(coverage_radius=COVERAGE_RADIUS, **kwargs):
+            grid.add(chunk.x, chunk.y, totals.add(chunk))
+            yield chunk
+    statistics = lambda: {'totalDistance': totals.total_distance, 'coverage': grid.report(planner.valid_mask)}
+    yield from encode_stream(tallied(), statistics)
+
+def measure(body):
+    tracemalloc.start()
+    start = time.perf_counter()
+    first_byte, size = None, 0
+    for piece in body:
+        first_byte = first_byte or time.perf_counter() - start
+        size += len(piece)
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first_byte, total, peak, size
+
+def main():
+    width, height = (float(v) for v in sys.argv[1:3]) if len(sys.argv) > 2 else (2500.0, 2000.0)
+    for pattern, mode in (('zigzag', 'archimedean'), ('spiral', 'archimedean'), ('spiral', 'rectangular')):
+        kwargs = {'start_point': (width / 2, height / 2) if mode == 'archimedean' and pattern == 'spiral' else (2.0, 2.0),
+                  'pattern': pattern, 'spiral_mode': mode}
+        label = f"spiral/{mode}" if pattern == 'spiral' else pattern
+        for name, body in (('one-shot', one_shot), ('stream', streamed)):
+            planner = PathPlanner(field_size=(width, height))
+            first_byte, total, peak, size = measure(body(planner, **kwargs))
+            print(f"{label:18s} {name:8s} first byte {1e3 * first_byte:8.1f} ms  "
+                  f"total {total:6.2f} s  peak {peak / 2**20:7.1f} MiB  body {size / 2**20:6.1f} MiB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Planning a /path-plan response versus serving it from the plan cache.
+
+A miss plans the path, computes the coverage statistics and encodes the
+body, as /path-plan does for a new request; a hit looks the canonical
+request up and checks If-None-Match, which is all a polling client with
+an unchanged plan costs.
+
+Usage: python benchmarks/bench_plan_cache.py [field_size]   (default 500)
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from coverage import coverage_report
+from path_encoding import encode_path
+from path_planner import PathPlanner
+from plan_cache import PlanCache, plan_key, etag_matches
+
+def plan(data):
+    planner = PathPlanner(field_size=(data['fieldWidth'], data['fieldHeight']))
+    path = planner.optimize_spraying_pattern(start_point=(data['startX'], data['startY']),
+                                             coverage_radius=data['coverageRadius'], pattern=data['pattern'])
+    coverage = coverage_report(path.x, path.y, data['coverageRadius'],
+                               field_mask=planner.valid_mask, field_bounds=planner.field_bounds())
+    return encode_path(path, {'totalDistance': path.total_distance, 'coverage': coverage})
+
+def main():
+    size = float(sys.argv[1]) if len(sys.argv) > 1 else 500.0
+    cache = PlanCache(maxsize=16)
+    for pattern in ('zigzag', 'spiral', 'custom'):
+        data = {'fieldWidth': size, 'fieldHeight': size, 'coverageRadius': 5.0,
+                'startX': 2.0, 'startY': 2.0, 'pattern': pattern}
+        start = time.perf_counter()
+        key = plan_key(data)
+        entry = cache.put(key, *plan(data))
+        miss = time.perf_counter() - start
+
+        repeats = 1000
+        start = time.perf_counter()
+        for _ in range(repeats):
+            hit = cache.get(plan_key(data))
+            assert etag_matches(entry.etag(), hit.etag())
+        hit_time = (time.perf_counter() - start) / repeats
+        print(f"{pattern:8s} {len(entry.body) / 1e3:9.1f} kB  miss {1e3 * miss:8.1f} ms  "
+              f"hit {1e3 * hit_time:7.3f} ms  ({miss / hit_time:,.0f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Compare the fixed-angle-step spiral with the constant-spacing spiral.
+
+The old spiral stepped the angle 0.1 rad at a time in a Python loop and
+checked every point on its own, so points drifted apart as the radius grew
+and consecutive turns were 10 coverage radii apart. The new one samples an
+Archimedean spiral (one coverage radius per turn) every coverage_radius / 2
+of arc length in one NumPy pass, and is clipped with the validity mask.
+
+Usage: python benchmarks/bench_spiral.py [field_size ...]   (default 1000 10000)
+"""
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from path_planner import PathPlanner
+from spray_path import SprayPath
+
+COVERAGE_RADIUS = 5.0
+
+def make_planner(size, n_obstacles=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    planner = PathPlanner(field_size=(size, size))
+    for x, y in rng.uniform(0.1, 0.9, size=(n_obstacles, 2)) * size:
+        planner.add_obstacle(float(x), float(y), float(rng.uniform(1, 4)))
+    return planner
+
+def fixed_angle_spiral(planner, start_point, coverage_radius):
+    x, y = start_point
+    path = []
+    angle = 0
+    radius = coverage_radius
+    max_radius = max(planner.field_width, planner.field_height)
+    while radius < max_radius:
+        x_new = x + radius * np.cos(angle)
+        y_new = y + radius * np.sin(angle)
+        if planner.is_valid_point(x_new, y_new):
+            path.append((x_new, y_new))
+        angle += 0.1
+        radius += coverage_radius / (2 * np.pi)
+    return path
+
+def spacing(path):
+    """Median and 99th percentile distance between consecutive points."""
+    steps = np.diff(SprayPath.from_points(path).distance)
+    return np.median(steps), np.percentile(steps, 99)
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000]
+    print(f"{'field':>7} {'variant':>12} {'points':>9} {'seconds':>8} {'median step':>12} {'p99 step':>9}")
+    for size in sizes:
+        planner = make_planner(size)
+        planner.obstacle_index()
+        center = (size / 2, size / 2)
+        variants = [
+            ('fixed angle', lambda: fixed_angle_spiral(planner, center, COVERAGE_RADIUS)),
+            ('archimedean', lambda: planner._spiral_pattern(center, COVERAGE_RADIUS)),
+            ('rectangular', lambda: planner._spiral_pattern(center, COVERAGE_RADIUS, mode='rectangular'))
+        ]
+        for name, generate in variants:
+            start = time.perf_counter()
+            path = generate()
+            seconds = time.perf_counter() - start
+            median, p99 = spacing(path)
+            print(f"{size:>7} {name:>12} {len(path):>9} {seconds:>8.2f} {median:>12.2f} {p99:>9.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Path statistics on the list of point dicts versus the columnar SprayPath.
+
+Times the distance, estimated-time and bounding-box statistics and the
+text visualization, computed by walking a list of {'x', 'y',
+'spraying_rate'} dicts as /path-plan used to, and on SprayPath columns.
+Also reports the in-memory size of both representations.
+
+Usage: python benchmarks/bench_spray_path.py [field_size ...]   (default 300 1000 3000)
+"""
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from path_planner import PathPlanner
+
+COVERAGE_RADIUS = 5.0
+
+def dict_statistics(path):
+    total_distance = 0
+    for i in range(len(path) - 1):
+        dx = path[i + 1]['x'] - path[i]['x']
+        dy = path[i + 1]['y'] - path[i]['y']
+        total_distance += np.sqrt(dx * dx + dy * dy)
+    bounds = (min(p['x'] for p in path), min(p['y'] for p in path),
+              max(p['x'] for p in path), max(p['y'] for p in path))
+    return total_distance, total_distance / 10.0, bounds
+
+def column_statistics(path):
+    return path.total_distance, path.estimated_time(), path.bounds()
+
+def dict_bytes(path):
+    point = path[0]
+    return len(path) * (sys.getsizeof(point) + sum(sys.getsizeof(value) for value in point.values())) \
+        + sys.getsizeof(path)
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [300, 1_000, 3_000]
+    print(f"{'field':>6} {'points':>8} {'dict stats s':>13} {'column stats s':>15} {'dict viz s':>11} "
+          f"{'column viz s':>13} {'dict MB':>8} {'column MB':>10}")
+    for size in sizes:
+        planner = PathPlanner(field_size=(size, size))
+        path = planner.optimize_spraying_pattern((2, 2), COVERAGE_RADIUS, 'zigzag', smooth_path=False,
+                                                 resample_spacing=COVERAGE_RADIUS / 2)
+        points = path.to_dicts()
+
+        dict_result, dict_seconds = timed(dict_statistics, points)
+        column_result, column_seconds = timed(column_statistics, path)
+        assert np.isclose(dict_result[0], column_result[0]) and dict_result[2] == column_result[2]
+        dict_viz, dict_viz_seconds = timed(planner.visualize_path, points, COVERAGE_RADIUS)
+        column_viz, column_viz_seconds = timed(planner.visualize_path, path, COVERAGE_RADIUS)
+        assert dict_viz == column_viz
+
+        column_mb = (path.x.nbytes + path.y.nbytes + path.rate.nbytes + path.distance.nbytes) / 2**20
+        print(f"{size:>6} {len(path):>8} {dict_seconds:>13.3f} {column_seconds:>15.4f} {dict_viz_seconds:>11.3f} "
+              f"{column_viz_seconds:>13.3f} {dict_bytes(points) / 2**20:>8.1f} {column_mb:>10.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Greedy tour construction and improvement for the custom pattern.
+
+Builds the nearest-neighbour tour over 10k and 100k waypoints (a coverage
+grid with obstacles, and uniformly random points) and reports its length and
+runtime, before and after the time-bounded 2-opt / Or-opt pass.
+
+Usage: python benchmarks/bench_tour.py [n_points ...] [--improve SECONDS]   (default 10000 100000, 5s)
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from path_planner import PathPlanner
+from tour_engine import greedy_tour, improve_tour, tour_length
+
+def grid_points(n_points, seed=0):
+    """The custom pattern's candidate grid on a square field with scattered obstacles."""
+    side = int(np.sqrt(n_points)) * 5.0
+    planner = PathPlanner(field_size=(side, side))
+    rng = np.random.default_rng(seed)
+    for x, y in rng.uniform(0.1, 0.9, size=(n_points // 500, 2)) * side:
+        planner.add_obstacle(float(x), float(y), float(rng.uniform(5, 15)))
+    x_points = np.arange(0, side, 5.0)
+    grid_x, grid_y = np.meshgrid(x_points, x_points, indexing='ij')
+    keep = planner.valid_mask(grid_x, grid_y)
+    return np.column_stack([grid_x[keep], grid_y[keep]])
+
+def random_points(n_points, seed=0):
+    return np.random.default_rng(seed).uniform(0, np.sqrt(n_points) * 5.0, size=(n_points, 2))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('sizes', nargs='*', type=int, default=[10_000, 100_000])
+    parser.add_argument('--improve', type=float, default=5.0, help='Seconds for the improvement pass')
+    args = parser.parse_args()
+
+    print(f"{'points':>8} {'layout':>7} {'greedy s':>9} {'greedy length':>14} {'improve s':>10} "
+          f"{'improved length':>16} {'gain':>6}")
+    for size in args.sizes:
+        for layout, make in (('grid', grid_points), ('random', random_points)):
+            points = make(size)
+            start = time.perf_counter()
+            order = greedy_tour(points, (0, 0))
+            greedy_seconds = time.perf_counter() - start
+            greedy_length = tour_length(points, order, (0, 0))
+
+            start = time.perf_counter()
+            improved = improve_tour(points, order, args.improve)
+            improve_seconds = time.perf_counter() - start
+            improved_length = tour_length(points, improved, (0, 0))
+
+            print(f"{len(points):>8} {layout:>7} {greedy_seconds:>9.2f} {greedy_length:>14.0f} {improve_seconds:>10.2f} "
+                  f"{improved_length:>16.0f} {1 - improved_length / greedy_length:>6.1%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Compare the dense-sampled zigzag with analytic scanline clipping.
+
+The dense version is the previous algorithm: every sweep line is sampled
+every coverage_radius / 2 and the samples are filtered with the (already
+vectorized) validity mask. The analytic version clips each sweep line
+against the field polygon, its holes and the obstacles and keeps only the
+segment endpoints.
+
+Usage: python benchmarks/bench_zigzag.py [field_size ...]   (default 1000 10000)
+"""
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from path_planner import PathPlanner
+
+COVERAGE_RADIUS = 5.0
+
+def make_planner(size, n_obstacles=1000, seed=0):
+    """An irregular hexagonal field with a pond hole, a shed and scattered trees."""
+    rng = np.random.default_rng(seed)
+    planner = PathPlanner(field_size=(size, size))
+    planner.set_boundary(np.array([(0.1, 0), (0.9, 0.05), (1, 0.5), (0.85, 1), (0.1, 0.95), (0, 0.4)]) * size,
+                         holes=[np.array([(0.4, 0.4), (0.55, 0.42), (0.5, 0.6)]) * size])
+    planner.add_polygon_obstacle(np.array([(0.7, 0.2), (0.75, 0.2), (0.75, 0.25), (0.7, 0.25)]) * size)
+    for x, y in rng.uniform(0.1, 0.9, size=(n_obstacles, 2)) * size:
+        planner.add_obstacle(float(x), float(y), float(rng.uniform(1, 4)))
+    return planner
+
+def dense_zigzag(planner, coverage_radius):
+    row_spacing = coverage_radius * 1.2
+    path = []
+    for row in range(int(planner.field_height / row_spacing) + 1):
+        y = row * row_spacing
+        x_points = np.arange(0, planner.field_width + coverage_radius / 2, coverage_radius / 2)
+        keep = planner.valid_mask(x_points, np.full(len(x_points), y))
+        path.extend((x, y) for x in x_points[keep])
+    return path
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000]
+    print(f"{'field':>7} {'dense pts':>10} {'dense s':>8} {'segment pts':>12} {'analytic s':>11} {'speedup':>8}")
+    for size in sizes:
+        planner = make_planner(size)
+        planner.obstacle_index()
+
+        start = time.perf_counter()
+        dense = dense_zigzag(planner, COVERAGE_RADIUS)
+        dense_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        segments = planner._zigzag_pattern((0, 0), COVERAGE_RADIUS)
+        analytic_seconds = time.perf_counter() - start
+
+        print(f"{size:>7} {len(dense):>10} {dense_seconds:>8.2f} {len(segments):>12} {analytic_seconds:>11.3f} "
+              f"{dense_seconds / analytic_seconds:>7.0f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+import joblib
+import numpy as np
+
+# (row, tree) pairs walked per block, which bounds the temporary node arrays
+BLOCK_ROWS = 1 << 20
+# Below this many rows leaf values are summed with one cumsum instead of per tree
+SMALL_BATCH = 16
+
+def _float_to_key(x):
+    """Map float64 values to int64 keys with the same ordering."""
+    bits = np.asarray(x, dtype=np.float64).view(np.int64)
+    return np.where(bits >= 0, bits, np.int64(-2**63) - bits)
+
+def _key_to_float(key):
+    """Inverse of _float_to_key."""
+    bits = np.where(key >= 0, key, np.int64(-2**63) - key)
+    return bits.view(np.float64)
+
+def _fold_thresholds(threshold, mean, scale):
+    """Move split thresholds from scaled space into raw feature space.
+
+    sklearn sends a sample left when float32((x - mean) / scale) <= threshold.
+    That test is monotone in x, so it is equivalent to x <= boundary for the
+    largest float64 boundary that still passes. A rough affine estimate is
+    refined by bisection over the float64 bit patterns, which makes the folded
+    comparison give exactly the same branch as the scaler + tree pair.
+    """
+    def goes_left(x):
+        return ((x - mean) / scale).astype(np.float32) <= threshold
+
+    estimate = threshold * scale + mean
+    delta = (np.abs(threshold) * scale + np.abs(estimate) + scale) * 1e-6
+    lo, hi = estimate - delta, estimate + delta
+    for _ in range(64):
+        lo_bad, hi_bad = ~goes_left(lo), goes_left(hi)
+        if not (lo_bad.any() or hi_bad.any()):
+            break
+        delta = delta * 2
+        lo = np.where(lo_bad, lo - delta, lo)
+        hi = np.where(hi_bad, hi + delta, hi)
+
+    lo_key, hi_key = _float_to_key(lo), _float_to_key(hi)
+    while np.any(hi_key - lo_key > 1):
+        mid_key = lo_key + (hi_key - lo_key) // 2
+        left = goes_left(_key_to_float(mid_key))
+        lo_key = np.where(left, mid_key, lo_key)
+        hi_key = np.where(left, hi_key, mid_key)
+    return _key_to_float(lo_key)
+
+class CompiledForest:
+    """A RandomForestClassifier flattened into contiguous node arrays.
+
+    All trees share one set of arrays (feature, threshold, left, right, value)
+    indexed by global node id, and the fitted StandardScaler is folded into the
+    thresholds, so predictions take raw, unscaled feature matrices. Leaves point
+    back at themselves, which lets every tree be walked in lock step for at
+    most max_depth steps without per-node branching in Python.
+    """
+
+    ARRAYS = ('feature', 'threshold', 'left', 'right', 'value', 'roots', 'classes_')
+
+    def __init__(self, feature, threshold, left, right, value, roots, classes_, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes_
+        self.max_depth = int(max_depth)
+
+        # Interleaved children so one gather picks the branch: 2 * node + goes_right
+        self._children = np.empty(2 * len(left), dtype=np.int32)
+        self._children[0::2] = left
+        self._children[1::2] = right
+        self._is_leaf = left == np.arange(len(left))
+
+    @classmethod
+    def from_sklearn(cls, model, scaler=None):
+        """Compile a fitted RandomForestClassifier and optional StandardScaler."""
+        n_features = model.n_features_in_
+        mean = np.zeros(n_features)
+        scale = np.ones(n_features)
+        if scaler is not None:
+            if getattr(scaler, 'mean_', None) is not None:
+                mean = scaler.mean_
+            if getattr(scaler, 'scale_', None) is not None:
+                scale = scaler.scale_
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(tree.node_count)
+
+            feature = np.where(is_leaf, 0, tree.feature).astype(np.int32)
+            threshold = np.full(tree.node_count, np.inf)
+            split_features = feature[~is_leaf]
+            threshold[~is_leaf] = _fold_thresholds(
+                tree.threshold[~is_leaf], mean[split_features], scale[split_features]
+            )
+
+            # Normalize leaf values the same way DecisionTreeClassifier.predict_proba does
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            value = value / normalizer
+
+            features.append(feature)
+            thresholds.append(threshold)
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            values.append(value)
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts).astype(np.int32),
+            right=np.concatenate(rights).astype(np.int32),
+            value=np.concatenate(values),
+            roots=np.array(roots, dtype=np.int32),
+            classes_=np.asarray(model.classes_).astype(str),
+            max_depth=max_depth
+        )
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def prune(self, trees=None, max_depth=None):
+        """Return a smaller forest keeping only some trees, cut at max_depth.
+
+        trees lists the tree indices to keep, in order. Nodes at max_depth
+        become leaves that predict the class distribution of the training
+        samples that reached them, and nodes below them are dropped.
+        """
+        trees = range(self.n_trees) if trees is None else trees
+        old_to_new = np.full(len(self.left), -1, dtype=np.int64)
+        kept, roots = [], []
+        depth_reached = 0
+        offset = 0
+        for tree in trees:
+            roots.append(offset)
+            level = np.array([self.roots[tree]], dtype=np.int64)
+            depth = 0
+            while len(level):
+                old_to_new[level] = np.arange(offset, offset + len(level))
+                offset += len(level)
+                kept.append((level, depth == max_depth))
+                depth_reached = max(depth_reached, depth)
+                if depth == max_depth:
+                    break
+                inner = level[~self._is_leaf[level]]
+                level = np.column_stack([self.left[inner], self.right[inner]]).ravel()
+                depth += 1
+
+        old_ids = np.concatenate([level for level, _ in kept])
+        new_ids = np.arange(len(old_ids), dtype=np.int32)
+        is_leaf = np.concatenate([self._is_leaf[level] | cut for level, cut in kept])
+        return CompiledForest(
+            feature=np.where(is_leaf, 0, self.feature[old_ids]).astype(np.int32),
+            threshold=np.where(is_leaf, np.inf, self.threshold[old_ids]),
+            left=np.where(is_leaf, new_ids, old_to_new[self.left[old_ids]]).astype(np.int32),
+            right=np.where(is_leaf, new_ids, old_to_new[self.right[old_ids]]).astype(np.int32),
+            value=np.ascontiguousarray(self.value[old_ids]),
+            roots=np.array(roots, dtype=np.int32),
+            classes_=self.classes_,
+            max_depth=depth_reached
+        )
+
+    @property
+    def nbytes(self):
+        """Memory held by the node arrays, in bytes."""
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS)
+
+    def _apply_tree_major(self, X):
+        """Walk every tree for every row; returns leaf ids shaped (n_trees, n_samples)."""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        n_samples, n_features = X.shape
+        flat_X = X.ravel()
+
+        # Tree-major order keeps each tree's nodes hot in cache while its samples advance
+        nodes = np.repeat(self.roots, n_samples)
+        offsets = np.tile(np.arange(0, n_samples * n_features, n_features, dtype=np.int32), self.n_trees)
+        for depth in range(self.max_depth):
+            goes_right = flat_X.take(offsets + self.feature.take(nodes)) > self.threshold.take(nodes)
+            nodes = self._children.take(2 * nodes + goes_right)
+            if depth % 4 == 3 and self._is_leaf.take(nodes).all():
+                break
+        return nodes.reshape(self.n_trees, n_samples)
+
+    def apply(self, X):
+        """Return the leaf reached in every tree, shape (n_samples, n_trees)."""
+        return self._apply_tree_major(X).T
+
+    def predict_proba(self, X):
+        """Average the leaf class distributions over all trees."""
+        X = np.asarray(X, dtype=np.float64)
+        proba = np.zeros((len(X), len(self.classes_)))
+        block = max(1, BLOCK_ROWS // self.n_trees)
+        for start in range(0, len(X), block):
+            leaves = self._apply_tree_major(X[start:start + block])
+            out = proba[start:start + block]
+            if leaves.shape[1] < SMALL_BATCH:
+                # A single cumsum beats one Python-level add per tree for tiny batches
+                out += np.cumsum(self.value[leaves], axis=0)[-1]
+            else:
+                # Accumulate tree by tree, in the same order (and with the same
+                # rounding) as RandomForestClassifier.predict_proba
+                for tree_leaves in leaves:
+                    out += self.value.take(tree_leaves, axis=0)
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X):
+        """Predict one crop label per row."""
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+    def save(self, file_path):
+        """Save the compiled arrays with joblib."""
+        state = {name: getattr(self, name) for name in self.ARRAYS}
+        state['max_depth'] = self.max_depth
+        joblib.dump(state, file_path)
+
+    @classmethod
+    def load(cls, file_path, mmap_mode=None):
+        """Load a compiled model saved by save()."""
+        return cls(**joblib.load(file_path, mmap_mode=mmap_mode))
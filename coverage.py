@@ -0,0 +1,177 @@
+import numpy as np
+
+# (path point, grid cell) pairs stamped per block, which bounds temporary arrays
+BLOCK_PAIRS = 1 << 22
+# Field grid rows classified per valid-mask call
+MASK_ROWS = 256
+
+def _axis(low, high, resolution, field_low=None, field_high=None):
+    """Sample positions low + i * resolution covering [low, high], widened by whole steps to the field."""
+    if field_low is not None and field_low < low:
+        low -= np.ceil((low - field_low) / resolution) * resolution
+    if field_high is not None:
+        high = max(high, field_high)
+    return np.arange(low, high + resolution, resolution)
+
+def _stencil(radius, resolution):
+    """Cell offsets a disc centred anywhere in the middle cell can reach."""
+    k = int(np.ceil(radius / resolution)) + 1
+    i, j = np.meshgrid(np.arange(-k, k + 1), np.arange(-k, k + 1), indexing='ij')
+    gap_i = np.maximum(np.abs(i) - 0.5, 0)
+    gap_j = np.maximum(np.abs(j) - 0.5, 0)
+    keep = gap_i**2 + gap_j**2 <= (radius / resolution)**2 + 1e-9
+    return i[keep], j[keep]
+
+class CoverageGrid:
+    """Running coverage of a path stamped onto fixed sample positions xs, ys, piece by piece.
+
+    add() takes points with their distance along the whole path, so a path
+    generated in chunks gives the same grid as the path added at once, in
+    memory proportional to the grid rather than the path. The spray covers
+    the segments between points, not only the points: each segment is
+    stamped every resolution along its length.
+    """
+
+    def __init__(self, xs, ys, radius, resolution):
+        self.xs, self.ys = xs, ys
+        self.radius = float(radius)
+        self.resolution = float(resolution)
+        self.first = np.full(len(xs) * len(ys), np.inf)
+        self.last = np.full(len(xs) * len(ys), -np.inf)
+        self._offsets = _stencil(self.radius, self.resolution)
+        self._tail = None
+
+    @classmethod
+    def for_field(cls, field_bounds, radius, resolution=None):
+        """A grid over the field grown by radius, for paths whose extent is not known up front."""
+        resolution = float(resolution or radius / 2)
+        x_min, y_min, x_max, y_max = field_bounds
+        return cls(_axis(x_min - radius, x_max + radius, resolution),
+                   _axis(y_min - radius, y_max + radius, resolution), radius, resolution)
+
+    def add(self, x, y, distance, join=True):
+        """Stamp path points x, y lying distance along the path, and the segments between them.
+
+        With join, the segment from the last point of the previous add() is
+        stamped too; pass join=False where a separate path begins.
+        """
+        x = np.asarray(x, dtype=np.float64).ravel()
+        y = np.asarray(y, dtype=np.float64).ravel()
+        distance = np.asarray(distance, dtype=np.float64).ravel()
+        if join and self._tail is not None and len(x):
+            x, y, distance = (np.concatenate([[value], values]) for value, values in zip(self._tail, (x, y, distance)))
+        if not len(x):
+            return
+        self._tail = (x[-1], y[-1], distance[-1])
+
+        # Points every resolution or closer along each segment, a block of segments at a time
+        dx, dy, dd = np.diff(x), np.diff(y), np.diff(distance)
+        steps = np.maximum(np.ceil(np.hypot(dx, dy) / self.resolution), 1).astype(np.int64)
+        starts = np.concatenate([[0], np.cumsum(steps)])
+        block = max(1, BLOCK_PAIRS // len(self._offsets[0]))
+        first = 0
+        while first < len(steps):
+            end = max(first + 1, int(np.searchsorted(starts, starts[first] + block, side='right')) - 1)
+            segments = np.repeat(np.arange(first, end), steps[first:end])
+            t = (np.arange(starts[end] - starts[first]) + starts[first] - starts[segments]) / steps[segments]
+            self._stamp(x[segments] + t * dx[segments], y[segments] + t * dy[segments],
+                        distance[segments] + t * dd[segments])
+            first = end
+        self._stamp(x[-1:], y[-1:], distance[-1:])
+
+    def _stamp(self, x, y, distance):
+        """Stamp the discs of points x, y lying distance along the path."""
+        xs, ys, radius, resolution = self.xs, self.ys, self.radius, self.resolution
+        offset_i, offset_j = self._offsets
+        col = np.rint((x - xs[0]) / resolution).astype(np.int64)
+        row = np.rint((y - ys[0]) / resolution).astype(np.int64)
+        block = max(1, BLOCK_PAIRS // len(offset_i))
+        for begin in range(0, len(x), block):
+            points = slice(begin, begin + block)
+            cols = (col[points, np.newaxis] + offset_i).ravel()
+            rows = (row[points, np.newaxis] + offset_j).ravel()
+            owners = np.repeat(np.arange(begin, min(begin + block, len(x))), len(offset_i))
+            inside = (cols >= 0) & (cols < len(xs)) & (rows >= 0) & (rows < len(ys))
+            cols, rows, owners = cols[inside], rows[inside], owners[inside]
+            hit = (xs[cols] - x[owners])**2 + (ys[rows] - y[owners])**2 <= radius * radius
+            cells = cols[hit] * len(ys) + rows[hit]
+            np.minimum.at(self.first, cells, distance[owners[hit]])
+            np.maximum.at(self.last, cells, distance[owners[hit]])
+
+    def result(self):
+        """Return (xs, ys, first, last), first and last NaN where nothing covers a sample."""
+        covered = np.isfinite(self.first)
+        first = np.where(covered, self.first, np.nan)
+        last = np.where(covered, self.last, np.nan)
+        shape = (len(self.xs), len(self.ys))
+        return self.xs, self.ys, first.reshape(shape), last.reshape(shape)
+
+    def report(self, field_mask=None):
+        """The coverage_report dict for the points added so far."""
+        xs, ys, first, last = self.result()
+        covered = ~np.isnan(first)
+        overlap = covered & (last - first > 2 * self.radius)
+        cell_area = self.resolution * self.resolution
+        report = {
+            'resolution': self.resolution,
+            'coveredArea': float(covered.sum() * cell_area),
+            'overlapArea': float(overlap.sum() * cell_area)
+        }
+        if field_mask is not None:
+            field = np.zeros(covered.shape, dtype=bool)
+            for begin in range(0, len(xs), MASK_ROWS):
+                grid_x, grid_y = np.meshgrid(xs[begin:begin + MASK_ROWS], ys, indexing='ij')
+                field[begin:begin + MASK_ROWS] = field_mask(grid_x, grid_y)
+            field_cells = int(field.sum())
+            covered_cells = int((covered & field).sum())
+            report.update({
+                'fieldArea': float(field_cells * cell_area),
+                'missedArea': float((field_cells - covered_cells) * cell_area),
+                'coveragePercent': 100.0 * covered_cells / field_cells if field_cells else 0.0
+            })
+        return report
+
+def _path_grid(x, y, radius, resolution, field_bounds, breaks=()):
+    """The grid the old per-point loop used, widened to field_bounds, with the path added."""
+    bounds = field_bounds if field_bounds is not None else (None,) * 4
+    grid = CoverageGrid(_axis(x.min() - radius, x.max() + radius, resolution, bounds[0], bounds[2]),
+                        _axis(y.min() - radius, y.max() + radius, resolution, bounds[1], bounds[3]),
+                        radius, resolution)
+    distance = np.concatenate([[0.0], np.cumsum(np.hypot(np.diff(x), np.diff(y)))])
+    edges = [0, *breaks, len(x)]
+    for begin, end in zip(edges[:-1], edges[1:]):
+        grid.add(x[begin:end], y[begin:end], distance[begin:end], join=False)
+    return grid
+
+def coverage_grid(x, y, radius, resolution=None, field_bounds=None, breaks=()):
+    """Rasterize the sprayed footprint of a path onto a grid of sample points.
+
+    A sample point is covered when it lies within radius of the path, which
+    is stamped every resolution along its segments, on the grid the old
+    per-point loop used: every resolution (radius / 2 by default) from the
+    path's bounding box grown by radius. field_bounds (x_min, y_min, x_max,
+    y_max) widens the grid to take in the whole field. breaks are the
+    indices where a separate path starts (another drone's), not joined to
+    the point before. Returns (xs, ys, first, last): the sample
+    coordinates and, per sample, the smallest and largest distance along
+    the path of a point covering it (NaN where nothing does).
+    """
+    x = np.asarray(x, dtype=np.float64).ravel()
+    y = np.asarray(y, dtype=np.float64).ravel()
+    radius = float(radius)
+    return _path_grid(x, y, radius, float(resolution or radius / 2), field_bounds, breaks).result()
+
+def coverage_report(x, y, radius, resolution=None, field_mask=None, field_bounds=None, breaks=()):
+    """Covered, overlapping and missed area of a path sprayed with the given radius.
+
+    A sample counts as overlap when the points covering it lie more than
+    2 * radius apart along the path, which a single straight pass cannot
+    do, so it was sprayed again on a later pass. field_mask(x, y) returns
+    which sample points belong to the field (PathPlanner.valid_mask); with
+    it, the report adds the field area, the missed area and the percentage
+    of the field covered. breaks are as in coverage_grid.
+    """
+    x = np.asarray(x, dtype=np.float64).ravel()
+    y = np.asarray(y, dtype=np.float64).ravel()
+    radius = float(radius)
+    return _path_grid(x, y, radius, float(resolution or radius / 2), field_bounds, breaks).report(field_mask)
@@ -0,0 +1,107 @@
+import io
+import json
+import numpy as np
+
+# pandas is imported inside the functions that need it: the compiled single-sample
+# path never does, and importing it at startup dominates boot time.
+
+# Feature order used by the scaler and the model
+FEATURE_COLUMNS = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
+
+def parse_samples(body, content_type):
+    """Parse a batch request body (JSON, CSV or NDJSON) into a DataFrame of samples."""
+    import pandas as pd
+
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    text = body.decode('utf-8') if isinstance(body, bytes) else body
+
+    if not text.strip():
+        raise ValueError('Request body is empty')
+
+    if content_type in ('text/csv', 'application/csv'):
+        return pd.read_csv(io.StringIO(text), dtype=str)
+
+    if content_type in ('application/x-ndjson', 'application/ndjson', 'application/jsonl'):
+        rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        payload = json.loads(text)
+        rows = payload.get('samples') if isinstance(payload, dict) else payload
+
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise ValueError('Expected a list of sample objects')
+
+    return pd.DataFrame(rows)
+
+def samples_to_array(samples):
+    """Validate samples and return (features, row_errors).
+
+    features is a float64 matrix in FEATURE_COLUMNS order and row_errors maps
+    the index of every invalid row to a message. Invalid rows are left as NaN.
+    """
+    import pandas as pd
+
+    missing = [field for field in FEATURE_COLUMNS if field not in samples.columns]
+    if missing:
+        raise ValueError(f'Missing required field: {missing[0]}')
+
+    raw = samples[FEATURE_COLUMNS]
+    numeric = raw.apply(pd.to_numeric, errors='coerce')
+    X = numeric.to_numpy(dtype=np.float64)
+
+    row_errors = {}
+    bad_rows = np.flatnonzero(~np.isfinite(X).all(axis=1))
+    if len(bad_rows):
+        is_missing = raw.isna().to_numpy()
+        for row in bad_rows:
+            col = int(np.flatnonzero(~np.isfinite(X[row]))[0])
+            field = FEATURE_COLUMNS[col]
+            if is_missing[row, col]:
+                row_errors[int(row)] = f'Missing required field: {field}'
+            else:
+                row_errors[int(row)] = f'Invalid value for {field}. Must be a number.'
+
+    return X, row_errors
+
+def scale_features(scaler, X):
+    """Apply the fitted scaler to a feature matrix in one pass."""
+    if scaler is None:
+        # Compiled models fold the scaler into their thresholds
+        return X
+    if hasattr(scaler, 'feature_names_in_'):
+        # The scaler was fitted on a DataFrame; keep the column names to avoid warnings
+        import pandas as pd
+        X = pd.DataFrame(X, columns=scaler.feature_names_in_)
+    return scaler.transform(X)
+
+def quantize_features(values, precision=2):
+    """Round a feature vector so near-identical sensor readings share a cache key."""
+    return tuple(round(float(value), precision) for value in values)
+
+def predict_top_k(model, scaler, X, top_k=3):
+    """Return the top_k crops and their probabilities for every row of X."""
+    probabilities = model.predict_proba(scale_features(scaler, X))
+    top_k = max(1, min(int(top_k), probabilities.shape[1]))
+
+    # argsort on the negated probabilities keeps the model's tie order
+    order = np.argsort(-probabilities, axis=1, kind='stable')[:, :top_k]
+    top_probabilities = np.take_along_axis(probabilities, order, axis=1)
+    top_names = np.asarray(model.classes_)[order]
+
+    return [
+        [
+            {'name': str(name), 'confidence': float(confidence)}
+            for name, confidence in zip(names, confidences)
+        ]
+        for names, confidences in zip(top_names, top_probabilities)
+    ]
+
+def format_recommendations(crops):
+    """Attach the user-facing description to a list of predicted crops."""
+    return [
+        {
+            'name': crop['name'],
+            'confidence': crop['confidence'],
+            'description': f"Based on the provided conditions, {crop['name']} is recommended."
+        }
+        for crop in crops
+    ]
@@ -1,21 +1,8 @@
-import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
+from dataset import load_dataset
 
 def load_data(file_path):
-    # Load the dataset
-    data = pd.read_csv(file_path)
+    # Load the dataset through the columnar cache, so repeated runs skip CSV parsing
+    dataset = load_dataset(file_path)
     
-    # Separate features and target
-    X = data.drop('label', axis=1)
-    y = data['label']
-    
-    # Split the data into training and testing sets
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    
-    # Scale the features
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
-    
-    return X_train_scaled, X_test_scaled, y_train, y_test, scaler
+    # Split into training and testing sets and scale the features
+    return dataset.train_test_scaled(test_size=0.2, random_state=42)
\ No newline at end of file
@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+FEATURE_COLUMNS = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
+LABEL_COLUMN = 'label'
+
+# Where converted datasets are kept, one sub-directory per source file hash.
+# Unset means a .cache directory next to each CSV.
+CACHE_DIR = os.getenv('CROP_DATASET_CACHE')
+
+class CropDataset:
+    """A crop dataset backed by memory-mapped float32 columns.
+
+    X is an (n_rows, 7) float32 array in FEATURE_COLUMNS order, codes holds
+    the int32 label code of every row and class_names maps codes to labels.
+    path is the cache directory the arrays were loaded from.
+    """
+
+    def __init__(self, X, codes, class_names, source_hash, path=None):
+        self.X = X
+        self.codes = codes
+        self.class_names = class_names
+        self.source_hash = source_hash
+        self.path = path
+
+    def __len__(self):
+        return len(self.X)
+
+    @property
+    def y(self):
+        """Labels of every row as an object array."""
+        return self.class_names[self.codes]
+
+    def split(self, test_size=0.2, random_state=42):
+        """Return (train_index, test_index), the same rows train_test_split picks."""
+        from sklearn.model_selection import train_test_split
+        return train_test_split(np.arange(len(self)), test_size=test_size, random_state=random_state)
+
+    def train_test_scaled(self, test_size=0.2, random_state=42):
+        """Split, fit a StandardScaler on the train rows and scale both splits."""
+        from sklearn.preprocessing import StandardScaler
+        train_index, test_index = self.split(test_size, random_state)
+        X_train = pd.DataFrame(self.X[train_index], columns=FEATURE_COLUMNS)
+        X_test = pd.DataFrame(self.X[test_index], columns=FEATURE_COLUMNS)
+
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
+        return X_train_scaled, X_test_scaled, self.y[train_index], self.y[test_index], scaler
+
+def file_hash(file_path):
+    """SHA-1 of a file's contents, read in 1 MB blocks."""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_dataset(csv_path, cache_dir=None, chunksize=200_000):
+    """Load a crop CSV through the columnar cache, converting it on first use."""
+    cache_dir = cache_dir or CACHE_DIR or os.path.join(os.path.dirname(os.path.abspath(csv_path)), '.cache')
+    source_hash = file_hash(csv_path)
+    dataset_dir = os.path.join(cache_dir, source_hash)
+    if not os.path.exists(os.path.join(dataset_dir, 'meta.json')):
+        _convert_csv(csv_path, dataset_dir, source_hash, chunksize)
+
+    with open(os.path.join(dataset_dir, 'meta.json')) as f:
+        meta = json.load(f)
+    return CropDataset(
+        X=np.load(os.path.join(dataset_dir, 'features.npy'), mmap_mode='r'),
+        codes=np.load(os.path.join(dataset_dir, 'labels.npy'), mmap_mode='r'),
+        class_names=np.array(meta['classes'], dtype=object),
+        source_hash=source_hash,
+        path=dataset_dir
+    )
+
+def _write_npy(raw_path, npy_path, dtype, shape):
+    """Wrap a raw binary file in an .npy header so np.load can memory-map it."""
+    with open(npy_path, 'wb') as out, open(raw_path, 'rb') as raw:
+        header = {'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)), 'fortran_order': False, 'shape': shape}
+        np.lib.format.write_array_header_1_0(out, header)
+        shutil.copyfileobj(raw, out, 1 << 20)
+    os.remove(raw_path)
+
+def _convert_csv(csv_path, dataset_dir, source_hash, chunksize):
+    """Stream the CSV once into float32 features and int32 label codes."""
+    os.makedirs(os.path.dirname(dataset_dir) or '.', exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.convert-', dir=os.path.dirname(dataset_dir) or '.')
+    try:
+        dtypes = {column: np.float32 for column in FEATURE_COLUMNS}
+        dtypes[LABEL_COLUMN] = 'category'
+        class_codes = {}
+        n_rows = 0
+
+        features_raw = os.path.join(staging, 'features.f32')
+        labels_raw = os.path.join(staging, 'labels.i32')
+        with open(features_raw, 'wb') as features, open(labels_raw, 'wb') as labels:
+            reader = pd.read_csv(csv_path, usecols=FEATURE_COLUMNS + [LABEL_COLUMN], dtype=dtypes, chunksize=chunksize)
+            for chunk in reader:
+                chunk = chunk.dropna()
+                categories = chunk[LABEL_COLUMN].cat.categories
+                for name in categories:
+                    class_codes.setdefault(name, len(class_codes))
+                lookup = np.array([class_codes[name] for name in categories], dtype=np.int32)
+
+                features.write(np.ascontiguousarray(chunk[FEATURE_COLUMNS].to_numpy(np.float32)).tobytes())
+                labels.write(lookup[chunk[LABEL_COLUMN].cat.codes.to_numpy()].tobytes())
+                n_rows += len(chunk)
+
+        _write_npy(features_raw, os.path.join(staging, 'features.npy'), np.float32, (n_rows, len(FEATURE_COLUMNS)))
+        _write_npy(labels_raw, os.path.join(staging, 'labels.npy'), np.int32, (n_rows,))
+
+        classes = sorted(class_codes, key=class_codes.get)
+        with open(os.path.join(staging, 'meta.json'), 'w') as f:
+            json.dump({'source': os.path.abspath(csv_path), 'sha1': source_hash, 'rows': n_rows,
+                       'columns': FEATURE_COLUMNS, 'classes': classes}, f, indent=2)
+
+        try:
+            os.replace(staging, dataset_dir)
+        except OSError:
+            # Another process converted the same file meanwhile; its copy is identical
+            if not os.path.exists(os.path.join(dataset_dir, 'meta.json')):
+                raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
@@ -0,0 +1,119 @@
+import numpy as np
+
+def as_ring(vertices):
+    """Return polygon vertices as an (n, 2) float array, without a repeated closing vertex."""
+    ring = np.asarray(vertices, dtype=np.float64).reshape(-1, 2)
+    if len(ring) > 1 and np.array_equal(ring[0], ring[-1]):
+        ring = ring[:-1]
+    if len(ring) < 3:
+        raise ValueError("A polygon needs at least 3 vertices")
+    return ring
+
+def points_in_ring(x, y, ring):
+    """Even-odd point-in-polygon test for arrays of points."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    inside = np.zeros(x.shape, dtype=bool)
+    for (x1, y1), (x2, y2) in zip(ring, np.roll(ring, -1, axis=0)):
+        if y1 == y2:
+            continue
+        crosses = (y1 <= y) != (y2 <= y)
+        x_cross = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (x < x_cross)
+    return inside
+
+def ring_crossings(ring, ys):
+    """Where each horizontal scan line crosses the ring's edges.
+
+    ys must be sorted. Returns (rows, xs): for every crossing, the index of
+    its scan line and its x coordinate. Edges are treated as half-open in y,
+    so every scan line crosses a closed ring an even number of times.
+    """
+    start, end = ring, np.roll(ring, -1, axis=0)
+    low = np.minimum(start[:, 1], end[:, 1])
+    high = np.maximum(start[:, 1], end[:, 1])
+    first = np.searchsorted(ys, low, side='left')
+    last = np.searchsorted(ys, high, side='left')
+    counts = np.where(high > low, last - first, 0)
+
+    edges = np.repeat(np.arange(len(ring)), counts)
+    rows = np.repeat(first, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    x1, y1 = start[edges, 0], start[edges, 1]
+    x2, y2 = end[edges, 0], end[edges, 1]
+    return rows, x1 + (ys[rows] - y1) * (x2 - x1) / (y2 - y1)
+
+def pair_crossings(rows, xs):
+    """Sort crossings along each scan line and pair them into (rows, x0, x1) intervals."""
+    order = np.lexsort((xs, rows))
+    rows, xs = rows[order], xs[order]
+    return rows[0::2], xs[0::2], xs[1::2]
+
+def _subtract(inside, blocked):
+    """Remove the blocked intervals from the sorted inside intervals of one scan line."""
+    blocked = sorted(blocked)
+    result = []
+    for start, end in inside:
+        for block_start, block_end in blocked:
+            if block_end <= start or block_start >= end:
+                continue
+            if block_start > start:
+                result.append((start, block_start))
+            start = max(start, block_end)
+            if start >= end:
+                break
+        if start < end:
+            result.append((start, end))
+    return result
+
+def scanline_segments(ys, inside, polygons=(), circles=None):
+    """Clip horizontal scan lines against obstacles.
+
+    inside is (rows, x0, x1), the free intervals of each scan line before
+    obstacles (from the field boundary and its holes). polygons lists
+    obstacle rings and circles is an (n, 3) array of x, y, radius. Returns
+    one sorted list of (x0, x1) segments per scan line.
+    """
+    blocked_rows, blocked_x0, blocked_x1 = [], [], []
+    for ring in polygons:
+        rows, x0, x1 = pair_crossings(*ring_crossings(ring, ys))
+        blocked_rows.append(rows)
+        blocked_x0.append(x0)
+        blocked_x1.append(x1)
+
+    if circles is not None and len(circles):
+        cx, cy, radius = circles[:, 0], circles[:, 1], circles[:, 2]
+        # Scan lines strictly inside each circle's vertical extent
+        first = np.searchsorted(ys, cy - radius, side='right')
+        counts = np.maximum(np.searchsorted(ys, cy + radius, side='left') - first, 0)
+        ids = np.repeat(np.arange(len(cx)), counts)
+        rows = np.repeat(first, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        half = np.sqrt(np.maximum(radius[ids]**2 - (ys[rows] - cy[ids])**2, 0.0))
+        blocked_rows.append(rows)
+        blocked_x0.append(cx[ids] - half)
+        blocked_x1.append(cx[ids] + half)
+
+    segments = [[] for _ in ys]
+    for row, x0, x1 in zip(*inside):
+        if x1 > x0:
+            segments[row].append((float(x0), float(x1)))
+    if not blocked_rows:
+        return segments
+
+    rows = np.concatenate(blocked_rows)
+    x0 = np.concatenate(blocked_x0)
+    x1 = np.concatenate(blocked_x1)
+    order = np.argsort(rows, kind='stable')
+    rows, x0, x1 = rows[order], x0[order], x1[order]
+    row_ids, starts = np.unique(rows, return_index=True)
+    ends = np.append(starts[1:], len(rows))
+    for row, start, end in zip(row_ids, starts, ends):
+        if segments[row]:
+            segments[row] = _subtract(segments[row], zip(x0[start:end].tolist(), x1[start:end].tolist()))
+    return segments
+
+def resample_segment(x0, x1, spacing):
+    """Evenly spaced x positions from x0 to x1, both included, at most spacing apart."""
+    if not spacing > 0:
+        raise ValueError("spacing must be positive")
+    count = max(1, int(np.ceil(abs(x1 - x0) / spacing)))
+    return np.linspace(x0, x1, count + 1)
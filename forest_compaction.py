@@ -0,0 +1,171 @@
+"""Shrink the trained crop forest for serving and report what each variant costs.
+
+Usage: python forest_compaction.py [data/crop_data.csv] [models/crop_model.joblib] [--tolerance 0.01]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from compiled_forest import CompiledForest
+from dataset import load_dataset
+from model_trainer import compiled_model_path
+from model_tuning import measure_latency
+
+# Greedy tree selection scores at most this many validation rows per step
+RANK_ROWS = 20_000
+
+def compact_model_path(model_file):
+    """Return the path of the compacted artifact saved next to a model file."""
+    return model_file.replace('.joblib', '_compact.joblib')
+
+def rank_trees(forest, X, y):
+    """Order trees by greedy forward selection on validation accuracy.
+
+    Each step adds the tree that most improves the accuracy of the trees
+    chosen so far, so the first k trees of the result are a good k-tree forest.
+    """
+    X, y = X[:RANK_ROWS], y[:RANK_ROWS]
+    leaves = forest._apply_tree_major(X)
+    targets = np.searchsorted(forest.classes_, y)
+    votes = np.zeros((len(X), len(forest.classes_)))
+    remaining = list(range(forest.n_trees))
+    order = []
+    while remaining:
+        scores = [(np.argmax(votes + forest.value[leaves[tree]], axis=1) == targets).mean()
+                  for tree in remaining]
+        best = remaining.pop(int(np.argmax(scores)))
+        votes += forest.value[leaves[best]]
+        order.append(best)
+    return order
+
+def distill(forest, X, n_estimators=10, max_depth=12, random_state=42):
+    """Fit a small forest on raw features to reproduce the full forest's labels."""
+    student = RandomForestClassifier(n_estimators=n_estimators, max_depth=max_depth,
+                                     random_state=random_state, n_jobs=-1)
+    student.fit(X, forest.predict(X))
+    return CompiledForest.from_sklearn(student)
+
+def _rss_delta_mb(file_path):
+    """Resident memory a fresh process gains by loading and using the artifact."""
+    script = (
+        "import sys, numpy as np\n"
+        "from compiled_forest import CompiledForest\n"
+        "def rss():\n"
+        "    with open('/proc/self/statm') as f:\n"
+        "        return int(f.read().split()[1]) * 4096\n"
+        "before = rss()\n"
+        "model = CompiledForest.load(sys.argv[1])\n"
+        "model.predict(np.zeros((1, 7)))\n"
+        "print((rss() - before) / (1024 * 1024))\n"
+    )
+    if not os.path.exists('/proc/self/statm'):
+        return None
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, '-c', script, file_path], capture_output=True, text=True, env=env)
+    return float(result.stdout) if result.returncode == 0 else None
+
+def evaluate_variant(name, forest, reference, X_valid, y_valid, X_test, y_test, work_dir):
+    """Accuracy, size, memory and latency of one compacted forest."""
+    file_path = os.path.join(work_dir, f'{name}.joblib')
+    forest.save(file_path)
+    report = {
+        'name': name,
+        'trees': forest.n_trees,
+        'nodes': int(len(forest.left)),
+        'maxDepth': forest.max_depth,
+        'validAccuracy': float((forest.predict(X_valid) == y_valid).mean()),
+        'testAccuracy': float((forest.predict(X_test) == y_test).mean()),
+        'agreement': float((forest.predict(X_test) == reference).mean()),
+        'diskMB': os.path.getsize(file_path) / (1024 * 1024),
+        'arraysMB': forest.nbytes / (1024 * 1024),
+        'rssDeltaMB': _rss_delta_mb(file_path)
+    }
+    report.update(measure_latency(forest, X_test))
+    return report
+
+def compact(data_file, model_file, output_file=None, tree_counts=(10, 25, 50), depths=(8, 12),
+            tolerance=0.01, distill_trees=10, distill_depth=12):
+    """Build compacted variants of the model, write a report and save the best one.
+
+    The test split train_model held out is halved: one half ranks trees and
+    picks the variant, the other reports accuracy. The saved variant is the
+    smallest on disk whose validation accuracy is within tolerance of the
+    full forest's; app.py serves it when COMPACT_MODEL_FILE points at it.
+    """
+    output_file = output_file or compact_model_path(model_file)
+    compiled_file = compiled_model_path(model_file)
+    if os.path.exists(compiled_file):
+        full = CompiledForest.load(compiled_file)
+    else:
+        full = CompiledForest.from_sklearn(joblib.load(model_file),
+                                           joblib.load(model_file.replace('.joblib', '_scaler.joblib')))
+
+    dataset = load_dataset(data_file)
+    train_index, test_index = dataset.split(test_size=0.2, random_state=42)
+    valid_index, test_index = test_index[:len(test_index) // 2], test_index[len(test_index) // 2:]
+    X_valid, y_valid = np.asarray(dataset.X[valid_index], dtype=np.float64), dataset.y[valid_index].astype(str)
+    X_test, y_test = np.asarray(dataset.X[test_index], dtype=np.float64), dataset.y[test_index].astype(str)
+    reference = full.predict(X_test)
+
+    order = rank_trees(full, X_valid, y_valid)
+    variants = [('full', full)]
+    for count in tree_counts:
+        if count < full.n_trees:
+            variants.append((f'top{count}', full.prune(trees=order[:count])))
+    for depth in depths:
+        if depth < full.max_depth:
+            variants.append((f'depth{depth}', full.prune(max_depth=depth)))
+            for count in tree_counts:
+                if count < full.n_trees:
+                    variants.append((f'top{count}-depth{depth}', full.prune(trees=order[:count], max_depth=depth)))
+    if distill_trees:
+        X_train = np.asarray(dataset.X[train_index], dtype=np.float64)
+        variants.append((f'distill{distill_trees}-depth{distill_depth}',
+                         distill(full, X_train, distill_trees, distill_depth)))
+
+    with tempfile.TemporaryDirectory(prefix='crop-compact-') as work_dir:
+        reports = [evaluate_variant(name, forest, reference, X_valid, y_valid, X_test, y_test, work_dir)
+                   for name, forest in variants]
+
+    baseline = reports[0]['validAccuracy']
+    eligible = [index for index, report in enumerate(reports) if report['validAccuracy'] >= baseline - tolerance]
+    selected = min(eligible, key=lambda index: reports[index]['diskMB'])
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+    variants[selected][1].save(output_file)
+
+    with open(output_file.replace('.joblib', '_report.json'), 'w') as f:
+        json.dump({'modelFile': model_file, 'output': output_file, 'tolerance': tolerance,
+                   'selected': reports[selected]['name'], 'variants': reports}, f, indent=2)
+
+    print(f"{'variant':<20} {'trees':>5} {'nodes':>8} {'test acc':>9} {'agree':>7} {'disk MB':>8} "
+          f"{'RSS MB':>7} {'p50 ms':>7} {'p99 ms':>7} {'batch p50':>10}")
+    for index, report in enumerate(reports):
+        rss = f"{report['rssDeltaMB']:7.1f}" if report['rssDeltaMB'] is not None else '      -'
+        marker = '*' if index == selected else ' '
+        print(f"{report['name']:<19}{marker} {report['trees']:>5} {report['nodes']:>8} {report['testAccuracy']:>9.4f} "
+              f"{report['agreement']:>7.4f} {report['diskMB']:>8.2f} {rss} {report['singleP50Ms']:>7.3f} "
+              f"{report['singleP99Ms']:>7.3f} {report['batchP50Ms']:>8.2f}ms")
+    print(f"Saved {reports[selected]['name']} to {output_file}")
+    return reports, reports[selected]
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compact the crop forest for faster, smaller serving.")
+    parser.add_argument("data_file", nargs="?", default="data/crop_data.csv")
+    parser.add_argument("model_file", nargs="?", default="models/crop_model.joblib")
+    parser.add_argument("--output", help="where to save the selected variant (default: <model>_compact.joblib)")
+    parser.add_argument("--trees", type=int, nargs="+", default=[10, 25, 50])
+    parser.add_argument("--depths", type=int, nargs="+", default=[8, 12])
+    parser.add_argument("--tolerance", type=float, default=0.01,
+                        help="validation accuracy the saved variant may give up against the full forest")
+    parser.add_argument("--distill-trees", type=int, default=10, help="0 disables the distilled variant")
+    parser.add_argument("--distill-depth", type=int, default=12)
+    args = parser.parse_args()
+
+    compact(args.data_file, args.model_file, args.output, args.trees, args.depths, args.tolerance,
+            args.distill_trees, args.distill_depth)
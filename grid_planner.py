@@ -0,0 +1,274 @@
+import heapq
+import math
+import numpy as np
+
+SQRT2 = math.sqrt(2.0)
+
+def _next_stop(stop, axis, forward):
+    """For every cell, the index along axis of the first stop cell at or after it in the direction of travel."""
+    n = stop.shape[axis]
+    positions = np.arange(n).reshape([-1 if a == axis else 1 for a in range(stop.ndim)])
+    if forward:
+        index = np.where(stop, positions, n)
+        return np.flip(np.minimum.accumulate(np.flip(index, axis), axis=axis), axis)
+    index = np.where(stop, positions, -1)
+    return np.maximum.accumulate(index, axis=axis)
+
+class GridPlanner:
+    """Shortest paths over a boolean occupancy grid, with A* or Jump Point Search.
+
+    blocked[i, j] marks cell (i, j), whose centre is at (i * resolution,
+    j * resolution). Moves go to the 4 or 8 neighbouring cells; diagonal
+    moves cost sqrt(2) and may not cut the corner of a blocked cell. The
+    grid is stored flattened with a blocked border, so neighbours never
+    need bounds checks. Jump Point Search (8-connectivity only) uses
+    per-direction "next stop" tables precomputed with NumPy, so each
+    straight scan is a single lookup.
+    """
+
+    def __init__(self, blocked, resolution=1.0, connectivity=8):
+        if connectivity not in (4, 8):
+            raise ValueError("connectivity must be 4 or 8")
+        blocked = np.asarray(blocked, dtype=bool)
+        self.shape = blocked.shape
+        self.resolution = float(resolution)
+        self.connectivity = connectivity
+
+        padded = np.ones((self.shape[0] + 2, self.shape[1] + 2), dtype=bool)
+        padded[1:-1, 1:-1] = blocked
+        self._padded = padded
+        self.stride = padded.shape[1]
+        self.free = (~padded).ravel().tolist()
+        s = self.stride
+        self._straight = [(s, 1.0), (-s, 1.0), (1, 1.0), (-1, 1.0)]
+        self._diagonal = [(s + 1, SQRT2), (s - 1, SQRT2), (-s + 1, SQRT2), (-s - 1, SQRT2)]
+        self._jump_tables = None
+
+    @property
+    def nbytes(self):
+        """Approximate memory held: the padded grid, the free-cell list and any jump tables."""
+        cells = len(self.free)
+        # A list slot is 8 bytes; table entries are also int objects of about 32 bytes
+        tables = len(self._jump_tables) * cells * 40 if self._jump_tables is not None else 0
+        return self._padded.nbytes + 8 * cells + tables
+
+    @classmethod
+    def from_planner(cls, planner, resolution=1.0, connectivity=8):
+        return cls(planner.occupancy_grid(resolution), resolution, connectivity)
+
+    def _node(self, point):
+        i, j = (int(round(c / self.resolution)) for c in point)
+        if not (0 <= i < self.shape[0] and 0 <= j < self.shape[1]):
+            raise ValueError(f"Point {tuple(point)} is outside the grid")
+        return (i + 1) * self.stride + j + 1
+
+    def _cell(self, node):
+        i, j = divmod(node, self.stride)
+        return i - 1, j - 1
+
+    def _heuristic(self, goal):
+        gi, gj = divmod(goal, self.stride)
+        s = self.stride
+        if self.connectivity == 4:
+            return lambda node: abs(node // s - gi) + abs(node % s - gj)
+        def octile(node):
+            di, dj = abs(node // s - gi), abs(node % s - gj)
+            return di + dj + (SQRT2 - 2) * min(di, dj)
+        return octile
+
+    def plan(self, start, goal, method='astar'):
+        """Return the shortest path from start to goal as a list of (x, y) cell centres.
+
+        Points are snapped to the nearest cell. Returns None when either end
+        is blocked or the goal cannot be reached.
+        """
+        if method not in ('astar', 'jps'):
+            raise ValueError("method must be 'astar' or 'jps'")
+        if method == 'jps' and self.connectivity != 8:
+            raise ValueError("Jump Point Search needs 8-connectivity")
+        start, goal = self._node(start), self._node(goal)
+        if not (self.free[start] and self.free[goal]):
+            return None
+        parents = self._astar(start, goal) if method == 'astar' else self._jps(start, goal)
+        if parents is None:
+            return None
+        return [(i * self.resolution, j * self.resolution) for i, j in self._walk(parents, start, goal)]
+
+    def path_length(self, path):
+        """Length of a path returned by plan()."""
+        if not path or len(path) < 2:
+            return 0.0
+        return float(np.hypot(*np.diff(np.asarray(path, dtype=np.float64), axis=0).T).sum())
+
+    def _walk(self, parents, start, goal):
+        """Cells from start to goal, filling in the straight runs between jump points."""
+        nodes = [goal]
+        while nodes[-1] != start:
+            nodes.append(parents[nodes[-1]])
+        nodes.reverse()
+        cells = [self._cell(nodes[0])]
+        for node in nodes[1:]:
+            i1, j1 = self._cell(node)
+            i0, j0 = cells[-1]
+            steps = max(abs(i1 - i0), abs(j1 - j0))
+            di, dj = (i1 > i0) - (i1 < i0), (j1 > j0) - (j1 < j0)
+            cells.extend((i0 + k * di, j0 + k * dj) for k in range(1, steps + 1))
+        return cells
+
+    def _astar(self, start, goal):
+        free, s = self.free, self.stride
+        heuristic = self._heuristic(goal)
+        moves = self._straight + (self._diagonal if self.connectivity == 8 else [])
+        g = {start: 0.0}
+        parents = {}
+        closed = set()
+        # Ties on f go to the node closer to the goal, which keeps plateaus from being flooded
+        h = heuristic(start)
+        heap = [(h, h, start)]
+        while heap:
+            _, _, node = heapq.heappop(heap)
+            if node == goal:
+                return parents
+            if node in closed:
+                continue
+            closed.add(node)
+            base = g[node]
+            for offset, cost in moves:
+                neighbour = node + offset
+                if not free[neighbour] or neighbour in closed:
+                    continue
+                if cost != 1.0:
+                    # No cutting the corner of a blocked cell
+                    di = s if offset > s // 2 else -s
+                    if not (free[node + di] and free[neighbour - di]):
+                        continue
+                new_g = base + cost
+                if new_g < g.get(neighbour, math.inf):
+                    g[neighbour] = new_g
+                    parents[neighbour] = node
+                    h = heuristic(neighbour)
+                    heapq.heappush(heap, (new_g + h, h, neighbour))
+        return None
+
+    def _tables(self):
+        """Per-direction next-stop node for every cell: the first blocked cell or jump point ahead."""
+        if self._jump_tables is not None:
+            return self._jump_tables
+        blocked = self._padded
+        free = ~blocked
+        s = self.stride
+        rows, cols = np.indices(blocked.shape)
+
+        def shifted(array, di, dj):
+            """array[i + di, j + dj], True outside the grid."""
+            out = np.ones_like(array)
+            src = array[max(di, 0):array.shape[0] + min(di, 0), max(dj, 0):array.shape[1] + min(dj, 0)]
+            out[max(-di, 0):array.shape[0] + min(-di, 0), max(-dj, 0):array.shape[1] + min(-dj, 0)] = src
+            return out
+
+        tables = {}
+        # A cell is a jump point when a side neighbour opens up that was blocked next to the previous cell
+        for (di, dj) in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            if di:
+                forced = (shifted(free, 0, 1) & shifted(blocked, -di, 1)) | (shifted(free, 0, -1) & shifted(blocked, -di, -1))
+            else:
+                forced = (shifted(free, 1, 0) & shifted(blocked, 1, -dj)) | (shifted(free, -1, 0) & shifted(blocked, -1, -dj))
+            stop = blocked | forced
+            axis = 0 if di else 1
+            index = _next_stop(stop, axis, (di or dj) > 0)
+            table = index * s + cols if axis == 0 else rows * s + index
+            tables[di * s + dj] = table.ravel().tolist()
+        self._jump_tables = tables
+        return tables
+
+    def _jump_straight(self, node, step, goal):
+        """Jump from node (the first cell of the run) along step; returns the jump point or None."""
+        stop = self._tables()[step][node]
+        low, high = (node, stop) if step > 0 else (stop, node)
+        if low <= goal <= high and (goal - node) % abs(step) == 0:
+            return goal
+        return stop if self.free[stop] else None
+
+    def _jump_diagonal(self, node, di, dj, goal):
+        free = self.free
+        while True:
+            if not free[node]:
+                return None
+            if node == goal:
+                return node
+            if self._jump_straight(node + di, di, goal) is not None or \
+                    self._jump_straight(node + dj, dj, goal) is not None:
+                return node
+            if not (free[node + di] and free[node + dj]):
+                return None
+            node += di + dj
+
+    def _jps_neighbours(self, node, parent):
+        """Directions to search from node, pruned by the direction it was reached from."""
+        free, s = self.free, self.stride
+        if parent is None:
+            directions = [offset for offset, _ in self._straight]
+            for offset, _ in self._diagonal:
+                di = s if offset > s // 2 else -s
+                if free[node + di] and free[node + offset - di]:
+                    directions.append(offset)
+            return directions
+
+        pi, pj = divmod(parent, s)
+        ni, nj = divmod(node, s)
+        di = s * ((ni > pi) - (ni < pi))
+        dj = (nj > pj) - (nj < pj)
+        directions = []
+        if di and dj:
+            if free[node + dj]:
+                directions.append(dj)
+            if free[node + di]:
+                directions.append(di)
+            if free[node + dj] and free[node + di]:
+                directions.append(di + dj)
+            return directions
+        step, sides = (di, (1, -1)) if di else (dj, (s, -s))
+        ahead = free[node + step]
+        if ahead:
+            directions.append(step)
+        for side in sides:
+            if free[node + side]:
+                directions.append(side)
+                if ahead:
+                    directions.append(step + side)
+        return directions
+
+    def _jps(self, start, goal):
+        s = self.stride
+        heuristic = self._heuristic(goal)
+        g = {start: 0.0}
+        parents = {}
+        closed = set()
+        h = heuristic(start)
+        heap = [(h, h, start)]
+        while heap:
+            _, _, node = heapq.heappop(heap)
+            if node == goal:
+                return parents
+            if node in closed:
+                continue
+            closed.add(node)
+            for direction in self._jps_neighbours(node, parents.get(node)):
+                if abs(direction) in (1, s):
+                    jump = self._jump_straight(node + direction, direction, goal)
+                else:
+                    dj = 1 if (direction % s) == 1 else -1
+                    jump = self._jump_diagonal(node + direction, direction - dj, dj, goal)
+                if jump is None or jump in closed:
+                    continue
+                # Jump points lie on a straight or diagonal line from node
+                i0, j0 = divmod(node, s)
+                i1, j1 = divmod(jump, s)
+                a, b = abs(i1 - i0), abs(j1 - j0)
+                new_g = g[node] + max(a, b) + (SQRT2 - 1) * min(a, b)
+                if new_g < g.get(jump, math.inf):
+                    g[jump] = new_g
+                    parents[jump] = node
+                    h = heuristic(jump)
+                    heapq.heappush(heap, (new_g + h, h, jump))
+        return None
@@ -0,0 +1,103 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+
+class MicroBatcher:
+    """Coalesce concurrent single-sample predictions into one model call.
+
+    Callers block in submit() while a background thread gathers every request
+    that arrives within max_wait_ms (or until max_batch_size requests are
+    queued), runs predict_fn once on the stacked feature matrix and hands each
+    caller its own row of the result.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=64, max_wait_ms=2.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+        self._batches = 0
+        self._items = 0
+        self._max_batch = 0
+        self._last_batch = 0
+        self._errors = 0
+
+    def submit(self, features, timeout=None):
+        """Queue one feature vector and wait for its prediction."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((np.asarray(features, dtype=np.float64), future))
+        return future.result(timeout=timeout)
+
+    def stats(self):
+        """Return queue depth and batch-size statistics."""
+        with self._lock:
+            return {
+                'queueDepth': self._queue.qsize(),
+                'batches': self._batches,
+                'items': self._items,
+                'meanBatchSize': self._items / self._batches if self._batches else 0.0,
+                'maxBatchSize': self._max_batch,
+                'lastBatchSize': self._last_batch,
+                'errors': self._errors,
+                'maxWaitMs': self.max_wait * 1000.0,
+                'batchLimit': self.max_batch_size
+            }
+
+    def _ensure_worker(self):
+        # Threads do not survive a fork, so restart the worker in each gunicorn worker
+        if self._worker is not None and self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or self._worker_pid != os.getpid() or not self._worker.is_alive():
+                if self._worker_pid != os.getpid():
+                    self._queue = queue.Queue()
+                self._worker_pid = os.getpid()
+                self._worker = threading.Thread(target=self._run, name='prediction-batcher', daemon=True)
+                self._worker.start()
+
+    def _collect(self):
+        """Block for the first request, then gather more until the window closes."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                # Stacking fails on a request of the wrong shape; it fails its batch, not the worker
+                features = np.vstack([item[0] for item in batch])
+                results, error = self.predict_fn(features), None
+            except Exception as e:
+                results, error = None, e
+
+            # Record the batch before waking callers so stats() is never behind
+            with self._lock:
+                self._batches += 1
+                self._items += len(batch)
+                self._last_batch = len(batch)
+                self._max_batch = max(self._max_batch, len(batch))
+                if error is not None:
+                    self._errors += 1
+
+            if error is not None:
+                for _, future in batch:
+                    future.set_exception(error)
+            else:
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
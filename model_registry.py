@@ -0,0 +1,198 @@
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import joblib
+from compiled_forest import CompiledForest
+
+MODEL_NAME = 'model.joblib'
+SCALER_NAME = 'scaler.joblib'
+COMPILED_NAME = 'compiled.joblib'
+ACTIVE_POINTER = 'ACTIVE'
+
+logger = logging.getLogger(__name__)
+
+def model_version(model_file):
+    """Return a short content hash identifying a saved model file."""
+    digest = hashlib.sha1()
+    with open(model_file, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+class ModelBundle:
+    """One immutable model version: the predictor, its scaler and its version id.
+
+    Requests take a reference to the active bundle once and use it until they
+    finish, so swapping in a new version never affects requests in flight.
+    """
+
+    def __init__(self, version, model, scaler):
+        self.version = version
+        self.model = model
+        self.scaler = scaler
+
+class ModelRegistry:
+    """Versioned model store with memory-mapped loading and atomic hot swap.
+
+    Every version lives in its own directory under root, named by the content
+    hash of the model file. The ACTIVE file names the version to serve; each
+    worker re-reads it at most every watch_interval seconds, so activating a
+    version in one worker (or by editing the file) rolls it out to all of them
+    without a restart. Arrays are loaded with joblib mmap_mode='r', so workers
+    on one host share the pages of the compiled forest instead of holding a
+    private copy each.
+    """
+
+    def __init__(self, root, use_compiled=True, mmap_mode='r', watch_interval=5.0):
+        self.root = root
+        self.use_compiled = use_compiled
+        self.mmap_mode = mmap_mode
+        self.watch_interval = watch_interval
+        self._active = None
+        self._failed_version = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def publish(self, model_file, scaler_file):
+        """Copy a trained model into the registry and return its version id."""
+        version = model_version(model_file)
+        version_dir = os.path.join(self.root, version)
+        if os.path.isdir(version_dir):
+            return version
+
+        # model_trainer pulls in scikit-learn, which serving a compiled model never needs
+        from model_trainer import compiled_model_path
+
+        os.makedirs(self.root, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.publish-', dir=self.root)
+        try:
+            shutil.copy2(model_file, os.path.join(staging, MODEL_NAME))
+            shutil.copy2(scaler_file, os.path.join(staging, SCALER_NAME))
+
+            compiled_file = compiled_model_path(model_file)
+            if os.path.exists(compiled_file) and os.path.getmtime(compiled_file) >= os.path.getmtime(model_file):
+                shutil.copy2(compiled_file, os.path.join(staging, COMPILED_NAME))
+            else:
+                # Models trained before compiled artifacts existed are compiled here
+                compiled = CompiledForest.from_sklearn(joblib.load(model_file), joblib.load(scaler_file))
+                compiled.save(os.path.join(staging, COMPILED_NAME))
+
+            # Rename last so a version directory is never seen half-written
+            os.replace(staging, version_dir)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            if not os.path.isdir(version_dir):
+                raise
+        return version
+
+    def publish_compiled(self, compiled_file):
+        """Publish a compiled-only artifact, such as a compacted forest, and return its version id."""
+        version = model_version(compiled_file)
+        version_dir = os.path.join(self.root, version)
+        if os.path.isdir(version_dir):
+            return version
+
+        os.makedirs(self.root, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.publish-', dir=self.root)
+        try:
+            shutil.copy2(compiled_file, os.path.join(staging, COMPILED_NAME))
+            os.replace(staging, version_dir)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            if not os.path.isdir(version_dir):
+                raise
+        return version
+
+    def versions(self):
+        """List the published versions, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        names = [name for name in os.listdir(self.root)
+                 if not name.startswith('.') and os.path.isdir(os.path.join(self.root, name))]
+        return sorted(names, key=lambda name: os.path.getmtime(os.path.join(self.root, name)))
+
+    def load(self, version):
+        """Load one version from disk without activating it."""
+        version_dir = os.path.join(self.root, version)
+        if not re.fullmatch(r'[A-Za-z0-9_-]+', version) or not os.path.isdir(version_dir):
+            raise ValueError(f"Unknown model version: {version}")
+
+        compiled_file = os.path.join(version_dir, COMPILED_NAME)
+        model_file = os.path.join(version_dir, MODEL_NAME)
+        # Compacted versions have no sklearn estimator, so they are always served compiled
+        if os.path.exists(compiled_file) and (self.use_compiled or not os.path.exists(model_file)):
+            return ModelBundle(version, CompiledForest.load(compiled_file, mmap_mode=self.mmap_mode), None)
+
+        model = joblib.load(model_file, mmap_mode=self.mmap_mode)
+        scaler = joblib.load(os.path.join(version_dir, SCALER_NAME))
+        return ModelBundle(version, model, scaler)
+
+    def activate(self, version):
+        """Load version and make it the one served to new requests."""
+        with self._lock:
+            bundle = self.load(version)
+            self._write_pointer(version)
+            self._swap(bundle)
+        return bundle
+
+    def active(self):
+        """Return the bundle new requests should use, picking up external activations."""
+        if self.watch_interval is not None and time.monotonic() - self._last_check >= self.watch_interval:
+            try:
+                self.refresh(blocking=False)
+            except Exception as e:
+                logger.error(f"Error switching model version: {e}")
+        return self._active
+
+    def active_version(self):
+        """Return the version named by the ACTIVE file, if any."""
+        try:
+            with open(os.path.join(self.root, ACTIVE_POINTER)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def refresh(self, blocking=True):
+        """Swap to the version named in the ACTIVE file if it is not the one being served."""
+        if not self._lock.acquire(blocking=blocking):
+            # Another thread is already loading; keep serving the current bundle
+            return self._active
+        try:
+            self._last_check = time.monotonic()
+            version = self.active_version()
+            if version and version != self._failed_version and (
+                    self._active is None or version != self._active.version):
+                try:
+                    self._swap(self.load(version))
+                except Exception:
+                    # Do not retry a broken version on every check
+                    self._failed_version = version
+                    raise
+            return self._active
+        finally:
+            self._lock.release()
+
+    def on_activate(self, callback):
+        """Register callback(bundle), called after every swap."""
+        self._listeners.append(callback)
+
+    def _write_pointer(self, version):
+        os.makedirs(self.root, exist_ok=True)
+        pointer = os.path.join(self.root, ACTIVE_POINTER)
+        tmp = f"{pointer}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(version)
+        os.replace(tmp, pointer)
+        self._failed_version = None
+
+    def _swap(self, bundle):
+        # A single reference assignment, so readers see either the old or the new bundle
+        self._active = bundle
+        for callback in self._listeners:
+            callback(bundle)
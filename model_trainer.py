@@ -1,10 +1,21 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier
 import joblib
 import os
+import json
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from compiled_forest import CompiledForest
+from dataset import FEATURE_COLUMNS, load_dataset
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
 def load_data(file_path):
     """Load and preprocess the crop recommendation dataset."""
@@ -16,22 +27,8 @@ def load_data(file_path):
         if not os.path.exists(file_path):
             create_sample_dataset(file_path)
         
-        # Load the dataset
-        data = pd.read_csv(file_path)
-        
-        # Split features and target
-        X = data[['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']]
-        y = data['label']
-        
-        # Split the data
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        
-        # Scale the features
-        scaler = StandardScaler()
-        X_train_scaled = scaler.fit_transform(X_train)
-        X_test_scaled = scaler.transform(X_test)
-        
-        return X_train_scaled, X_test_scaled, y_train, y_test, scaler
+        # Load the dataset through the columnar cache, then split and scale it
+        return load_dataset(file_path).train_test_scaled(test_size=0.2, random_state=42)
     except Exception as e:
         print(f"Error loading data: {e}")
         return None, None, None, None, None
@@ -55,8 +52,11 @@ def create_sample_dataset(file_path):
     df.to_csv(file_path, index=False)
     print(f"Created sample dataset at {file_path}")
 
-def train_model(data_file, model_file):
-    """Train and save the crop recommendation model."""
+def train_model(data_file, model_file, params=None):
+    """Train and save the crop recommendation model.
+
+    params overrides the forest's defaults, e.g. the ones model_tuning selected.
+    """
     try:
         # Load and preprocess data
         X_train, X_test, y_train, y_test, scaler = load_data(data_file)
@@ -65,13 +65,11 @@ def train_model(data_file, model_file):
             raise Exception("Failed to load data")
         
         # Train the model
-        model = RandomForestClassifier(n_estimators=100, random_state=42)
+        model = RandomForestClassifier(**{'n_estimators': 100, 'random_state': 42, **(params or {})})
         model.fit(X_train, y_train)
         
         # Save the model and scaler
-        os.makedirs(os.path.dirname(model_file), exist_ok=True)
-        joblib.dump(model, model_file)
-        joblib.dump(scaler, model_file.replace('.joblib', '_scaler.joblib'))
+        save_model(model, scaler, model_file)
         
         # Print model accuracy
         train_accuracy = model.score(X_train, y_train)
@@ -85,6 +83,138 @@ def train_model(data_file, model_file):
         print(f"Error training model: {e}")
         return None, None
 
+def save_model(model, scaler, model_file):
+    """Save the model, its scaler and the compiled serving artifact."""
+    os.makedirs(os.path.dirname(model_file), exist_ok=True)
+    joblib.dump(model, model_file)
+    joblib.dump(scaler, model_file.replace('.joblib', '_scaler.joblib'))
+
+    # Save the compiled, scaler-folded form used for serving
+    compiled = CompiledForest.from_sklearn(model, scaler)
+    compiled.save(compiled_model_path(model_file))
+
+def _peak_rss_mb():
+    """Peak resident set size of this process so far, in MB."""
+    if resource is None:
+        return None
+    # ru_maxrss is reported in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+@contextmanager
+def _measure_phase(report, name):
+    """Record wall time and peak Python/NumPy allocations of one training phase."""
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    yield
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    report['phases'].append({
+        'name': name,
+        'seconds': seconds,
+        'peakAllocatedMB': peak / (1024 * 1024),
+        'peakRssMB': _peak_rss_mb()
+    })
+    print(f"  {name:<12} {seconds:8.2f}s  peak allocated {peak / (1024 * 1024):8.1f} MB")
+
+def train_model_streaming(data_file, model_file, chunksize=100_000, n_estimators=100,
+                          trees_per_batch=10, n_jobs=-1, max_samples=None, test_size=0.2,
+                          random_state=42):
+    """Train the crop model out of core on a large CSV.
+
+    The CSV is converted once, in chunks, into the float32 columnar cache of
+    dataset.load_dataset. The scaler is fitted on it with partial_fit and the
+    scaled splits are written to memory-mapped files, and the forest is grown in
+    warm_start batches of trees_per_batch trees built in parallel on n_jobs
+    cores. max_samples (a row count or fraction) caps each tree's bootstrap
+    sample to bound training time and memory. Per-phase wall time and peak
+    memory are printed and saved next to the model as a JSON report.
+    """
+    try:
+        report = {'dataFile': data_file, 'phases': []}
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        print(f"Streaming training on {data_file}")
+
+        with _measure_phase(report, 'load_dataset'):
+            # Parses the CSV only the first time; later runs memory-map the cache
+            dataset = load_dataset(data_file, chunksize=chunksize)
+        if len(dataset) == 0:
+            raise Exception("Failed to load data")
+
+        with tempfile.TemporaryDirectory(prefix='crop-train-') as work_dir:
+            scaler = StandardScaler()
+            with _measure_phase(report, 'split_scale'):
+                is_test = np.random.default_rng(random_state).random(len(dataset)) < test_size
+                index = {'train': np.flatnonzero(~is_test), 'test': np.flatnonzero(is_test)}
+                for start in range(0, len(index['train']), chunksize):
+                    rows = dataset.X[index['train'][start:start + chunksize]]
+                    scaler.partial_fit(pd.DataFrame(rows, columns=FEATURE_COLUMNS))
+
+                # The forest needs random access to every row, so scaled copies go to disk too
+                X = {}
+                for split, rows in index.items():
+                    if not len(rows):
+                        continue
+                    X[split] = np.memmap(os.path.join(work_dir, f'{split}.f32'), dtype=np.float32,
+                                         mode='w+', shape=(len(rows), len(FEATURE_COLUMNS)))
+                    for start in range(0, len(rows), chunksize):
+                        block = pd.DataFrame(dataset.X[rows[start:start + chunksize]], columns=FEATURE_COLUMNS)
+                        X[split][start:start + chunksize] = scaler.transform(block)
+                    X[split].flush()
+                counts = {split: len(rows) for split, rows in index.items()}
+                labels = {split: dataset.codes[rows] for split, rows in index.items()}
+                class_names = dataset.class_names
+
+            y_train = class_names[labels['train']]
+            model = RandomForestClassifier(n_estimators=0, warm_start=True, n_jobs=n_jobs,
+                                           max_samples=max_samples, random_state=random_state)
+            with _measure_phase(report, 'fit_forest'):
+                while model.n_estimators < n_estimators:
+                    model.n_estimators = min(model.n_estimators + trees_per_batch, n_estimators)
+                    model.fit(X['train'], y_train)
+                    print(f"    {model.n_estimators}/{n_estimators} trees")
+
+            with _measure_phase(report, 'evaluate'):
+                accuracy = {}
+                for split, X_split in X.items():
+                    correct = 0
+                    for start in range(0, len(X_split), chunksize):
+                        predicted = model.predict(X_split[start:start + chunksize])
+                        correct += int((predicted == class_names[labels[split][start:start + chunksize]]).sum())
+                    accuracy[split] = correct / len(X_split)
+
+            with _measure_phase(report, 'save'):
+                save_model(model, scaler, model_file)
+
+        if not was_tracing:
+            tracemalloc.stop()
+
+        report.update({
+            'rows': counts,
+            'classes': len(class_names),
+            'trainAccuracy': accuracy.get('train'),
+            'testAccuracy': accuracy.get('test'),
+            'totalSeconds': sum(phase['seconds'] for phase in report['phases']),
+            'peakRssMB': _peak_rss_mb()
+        })
+        with open(model_file.replace('.joblib', '_training_report.json'), 'w') as f:
+            json.dump(report, f, indent=2)
+
+        print(f"Model trained successfully!")
+        print(f"Rows: {counts['train']} train / {counts['test']} test")
+        print(f"Training accuracy: {accuracy.get('train', 0):.2f}")
+        print(f"Testing accuracy: {accuracy.get('test', 0):.2f}")
+
+        return model, scaler
+    except Exception as e:
+        print(f"Error training model: {e}")
+        return None, None
+
+def compiled_model_path(model_file):
+    """Return the path of the compiled artifact saved next to a model file."""
+    return model_file.replace('.joblib', '_compiled.joblib')
+
 def load_model(model_file):
     """Load the trained model."""
     try:
@@ -96,7 +226,28 @@ def load_model(model_file):
         return None
 
 if __name__ == "__main__":
-    # Train the model if run directly
-    data_file = "data/crop_data.csv"
-    model_file = "models/crop_model.joblib"
-    train_model(data_file, model_file)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train the crop recommendation model.")
+    parser.add_argument("data_file", nargs="?", default="data/crop_data.csv")
+    parser.add_argument("model_file", nargs="?", default="models/crop_model.joblib")
+    parser.add_argument("--streaming", action="store_true",
+                        help="stream a large CSV in chunks and grow the forest in parallel batches")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--trees-per-batch", type=int, default=10)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--max-samples", type=float, default=None,
+                        help="bootstrap sample per tree, as a fraction (<= 1) or a row count")
+    args = parser.parse_args()
+
+    if args.streaming:
+        max_samples = args.max_samples
+        if max_samples is not None and max_samples > 1:
+            max_samples = int(max_samples)
+        train_model_streaming(args.data_file, args.model_file, chunksize=args.chunksize,
+                              n_estimators=args.n_estimators, trees_per_batch=args.trees_per_batch,
+                              n_jobs=args.n_jobs, max_samples=max_samples)
+    else:
+        # Train the model if run directly
+        train_model(args.data_file, args.model_file)
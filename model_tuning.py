@@ -0,0 +1,224 @@
+"""Cross-validated hyperparameter search for the crop forest.
+
+Usage: python model_tuning.py [data/crop_data.csv] [--search random --n-iter 20] [--refit models/crop_model.joblib]
+"""
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import KFold, ParameterGrid, ParameterSampler, StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+from compiled_forest import CompiledForest
+from dataset import load_dataset
+
+DEFAULT_PARAM_GRID = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [None, 10, 20],
+    'max_features': ['sqrt', 'log2'],
+    'min_samples_leaf': [1, 2, 4]
+}
+
+# Worker state, opened once per process by _init_worker
+_worker = {}
+
+def prepare_folds(dataset, n_folds=5, random_state=42):
+    """Assign folds and scale the features once per fold, caching the result.
+
+    Each fold gets a scaler fitted on its training rows and a float32 copy of
+    every row scaled with it, saved as .npy next to the dataset's columnar
+    cache, so later searches on the same CSV skip this step and workers can
+    memory-map the matrices instead of receiving a pickled copy.
+    """
+    folds_dir = os.path.join(dataset.path, f'folds-{n_folds}-{random_state}')
+    if os.path.exists(os.path.join(folds_dir, 'folds.npy')):
+        return folds_dir
+
+    codes = np.asarray(dataset.codes)
+    if np.bincount(codes).min() >= n_folds:
+        splitter = StratifiedKFold(n_folds, shuffle=True, random_state=random_state)
+    else:
+        splitter = KFold(n_folds, shuffle=True, random_state=random_state)
+
+    staging = tempfile.mkdtemp(prefix='.folds-', dir=dataset.path)
+    try:
+        fold_of_row = np.empty(len(dataset), dtype=np.int8)
+        for fold, (_, test_index) in enumerate(splitter.split(np.zeros((len(dataset), 1)), codes)):
+            fold_of_row[test_index] = fold
+
+        for fold in range(n_folds):
+            train = fold_of_row != fold
+            scaler = StandardScaler().fit(np.asarray(dataset.X[train], dtype=np.float64))
+            scaled = np.lib.format.open_memmap(os.path.join(staging, f'scaled_{fold}.npy'), mode='w+',
+                                               dtype=np.float32, shape=dataset.X.shape)
+            for start in range(0, len(dataset), 1 << 20):
+                scaled[start:start + (1 << 20)] = scaler.transform(dataset.X[start:start + (1 << 20)])
+            scaled.flush()
+            del scaled
+            joblib.dump(scaler, os.path.join(staging, f'scaler_{fold}.joblib'))
+        # folds.npy is written last; its presence marks a complete directory
+        np.save(os.path.join(staging, 'folds.npy'), fold_of_row)
+
+        try:
+            os.replace(staging, folds_dir)
+        except OSError:
+            # Another search prepared the same folds meanwhile
+            if not os.path.exists(os.path.join(folds_dir, 'folds.npy')):
+                raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return folds_dir
+
+def candidates(param_grid=None, search='grid', n_iter=20, random_state=42):
+    """List the parameter sets to try: the full grid, or n_iter random draws from it."""
+    param_grid = param_grid or DEFAULT_PARAM_GRID
+    if search == 'random':
+        return list(ParameterSampler(param_grid, n_iter=n_iter, random_state=random_state))
+    return list(ParameterGrid(param_grid))
+
+def _init_worker(dataset_dir, folds_dir):
+    fold_of_row = np.load(os.path.join(folds_dir, 'folds.npy'))
+    _worker['folds'] = fold_of_row
+    _worker['codes'] = np.load(os.path.join(dataset_dir, 'labels.npy'), mmap_mode='r')
+    _worker['scaled'] = [np.load(os.path.join(folds_dir, f'scaled_{fold}.npy'), mmap_mode='r')
+                         for fold in range(int(fold_of_row.max()) + 1)]
+    _worker['folds_dir'] = folds_dir
+
+def _evaluate(index, params, random_state, artifact_dir):
+    """Cross-validate one candidate and save its first-fold model, compiled, for timing."""
+    fold_of_row, codes = _worker['folds'], _worker['codes']
+    accuracies = []
+    fit_seconds = 0.0
+    first_model = None
+    for fold, scaled in enumerate(_worker['scaled']):
+        train = fold_of_row != fold
+        model = RandomForestClassifier(random_state=random_state, n_jobs=1, **params)
+        start = time.perf_counter()
+        model.fit(scaled[train], codes[train])
+        fit_seconds += time.perf_counter() - start
+        accuracies.append(float((model.predict(scaled[~train]) == codes[~train]).mean()))
+        if first_model is None:
+            first_model = model
+
+    scaler = joblib.load(os.path.join(_worker['folds_dir'], 'scaler_0.joblib'))
+    compiled = CompiledForest.from_sklearn(first_model, scaler)
+    compiled.save(os.path.join(artifact_dir, f'candidate_{index}.joblib'))
+    return {
+        'params': params,
+        'meanAccuracy': float(np.mean(accuracies)),
+        'stdAccuracy': float(np.std(accuracies)),
+        'foldAccuracies': accuracies,
+        'fitSeconds': fit_seconds / len(accuracies),
+        'nodes': int(len(compiled.feature))
+    }
+
+def _percentiles(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return float(np.percentile(samples, 50)), float(np.percentile(samples, 99))
+
+def measure_latency(model, X, batch_size=1000, repeat=1000):
+    """Time single-row and batch predictions of a compiled model, in milliseconds."""
+    single = np.asarray(X[:1], dtype=np.float64)
+    batch = np.asarray(X[:batch_size], dtype=np.float64)
+    model.predict(single)
+    model.predict(batch)
+    single_p50, single_p99 = _percentiles(lambda: model.predict(single), repeat)
+    batch_p50, batch_p99 = _percentiles(lambda: model.predict(batch), max(repeat // 50, 5))
+    return {
+        'singleP50Ms': single_p50,
+        'singleP99Ms': single_p99,
+        'batchRows': len(batch),
+        'batchP50Ms': batch_p50,
+        'batchP99Ms': batch_p99,
+        'batchRowsPerSecond': len(batch) / (batch_p50 / 1000) if batch_p50 else None
+    }
+
+def select_model(leaderboard, tolerance=0.005):
+    """Pick the fastest candidate whose accuracy is within tolerance of the best."""
+    best = max(entry['meanAccuracy'] for entry in leaderboard)
+    eligible = [entry for entry in leaderboard if entry['meanAccuracy'] >= best - tolerance]
+    return min(eligible, key=lambda entry: (entry['singleP50Ms'], entry['batchP50Ms']))
+
+def tune(data_file, output_file, param_grid=None, search='grid', n_iter=20, n_folds=5,
+         n_jobs=-1, tolerance=0.005, random_state=42, batch_size=1000, latency_repeat=1000):
+    """Run the search and write the leaderboard to output_file as JSON.
+
+    Candidates are cross-validated in parallel on a process pool; latency is
+    measured afterwards, one candidate at a time, so the timings are not
+    skewed by other workers competing for the CPU.
+    """
+    dataset = load_dataset(data_file)
+    start = time.perf_counter()
+    folds_dir = prepare_folds(dataset, n_folds, random_state)
+    prepare_seconds = time.perf_counter() - start
+
+    params_list = candidates(param_grid, search, n_iter, random_state)
+    workers = os.cpu_count() if n_jobs is None or n_jobs < 1 else n_jobs
+    print(f"Evaluating {len(params_list)} candidates x {n_folds} folds on {workers} workers "
+          f"({len(dataset)} rows, folds ready in {prepare_seconds:.2f}s)")
+
+    with tempfile.TemporaryDirectory(prefix='crop-tune-') as artifact_dir:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(dataset.path, folds_dir)) as pool:
+            futures = [pool.submit(_evaluate, index, params, random_state, artifact_dir)
+                       for index, params in enumerate(params_list)]
+            results = [future.result() for future in futures]
+
+        for index, result in enumerate(results):
+            compiled = CompiledForest.load(os.path.join(artifact_dir, f'candidate_{index}.joblib'))
+            result.update(measure_latency(compiled, dataset.X, batch_size, latency_repeat))
+
+    leaderboard = sorted(results, key=lambda entry: (-entry['meanAccuracy'], entry['singleP50Ms']))
+    for rank, entry in enumerate(leaderboard, 1):
+        entry['rank'] = rank
+    selected = select_model(leaderboard, tolerance)
+
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+    with open(output_file, 'w') as f:
+        json.dump({
+            'dataFile': data_file,
+            'rows': len(dataset),
+            'folds': n_folds,
+            'search': search,
+            'tolerance': tolerance,
+            'selected': selected['rank'],
+            'leaderboard': leaderboard
+        }, f, indent=2)
+
+    print(f"{'rank':>4} {'accuracy':>9} {'single p50':>11} {'single p99':>11} {'batch p50':>10} {'nodes':>8}  params")
+    for entry in leaderboard:
+        marker = '*' if entry is selected else ' '
+        print(f"{entry['rank']:>3}{marker} {entry['meanAccuracy']:>9.4f} {entry['singleP50Ms']:>9.3f}ms "
+              f"{entry['singleP99Ms']:>9.3f}ms {entry['batchP50Ms']:>8.2f}ms {entry['nodes']:>8}  {entry['params']}")
+    print(f"Leaderboard written to {output_file}; * marks the fastest model within {tolerance} of the best accuracy")
+    return leaderboard, selected
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tune the crop forest with cross-validation.")
+    parser.add_argument("data_file", nargs="?", default="data/crop_data.csv")
+    parser.add_argument("--output", default="models/tuning_leaderboard.json")
+    parser.add_argument("--search", choices=["grid", "random"], default="grid")
+    parser.add_argument("--n-iter", type=int, default=20, help="candidates drawn by a random search")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--tolerance", type=float, default=0.005,
+                        help="accuracy a faster model may give up against the best one")
+    parser.add_argument("--refit", metavar="MODEL_FILE",
+                        help="train the selected parameters on the full data and save them here")
+    args = parser.parse_args()
+
+    _, selected = tune(args.data_file, args.output, search=args.search, n_iter=args.n_iter,
+                       n_folds=args.folds, n_jobs=args.n_jobs, tolerance=args.tolerance)
+    if args.refit:
+        from model_trainer import train_model
+        train_model(args.data_file, args.refit, params=selected['params'])
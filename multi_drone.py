@@ -0,0 +1,136 @@
+import math
+import os
+import numpy as np
+from process_pool import submit
+from spray_path import AVERAGE_SPEED
+
+# What the regions are balanced on: free area, or the estimated flying time of a zigzag over them
+BALANCE_MODES = ('area', 'time')
+
+def _plan_region(field, region, start_point, options):
+    return field.restricted(region).optimize_spraying_pattern(start_point=start_point, **options)
+
+def row_weights(ys, segments, row_spacing, balance='area'):
+    """Work per sweep line: its free length for area, or its span plus the turn to the next line for time."""
+    if balance not in BALANCE_MODES:
+        raise ValueError(f"Invalid balance. Choose from: {list(BALANCE_MODES)}")
+    weights = np.zeros(len(ys))
+    for i, row in enumerate(segments):
+        if not row:
+            continue
+        if balance == 'area':
+            weights[i] = sum(x1 - x0 for x0, x1 in row)
+        else:
+            weights[i] = row[-1][1] - row[0][0] + row_spacing
+    return weights
+
+def balanced_groups(weights, parts):
+    """Split weights into at most parts runs of consecutive entries, minimizing the largest run's sum.
+
+    Binary search on that largest sum, each candidate checked by packing
+    runs greedily. Returns the index where each run starts.
+    """
+    prefix = np.concatenate([[0.0], np.cumsum(weights)])
+    total = prefix[-1]
+
+    def pack(limit):
+        starts = [0]
+        while True:
+            end = int(np.searchsorted(prefix, prefix[starts[-1]] + limit, side='right')) - 1
+            if end >= len(weights):
+                return starts
+            starts.append(max(end, starts[-1] + 1))
+            if len(starts) > parts:
+                return None
+
+    low, high = max(weights.max(), total / parts), total
+    while high - low > 1e-9 * total:
+        middle = (low + high) / 2
+        if pack(middle) is None:
+            low = middle
+        else:
+            high = middle
+    return pack(high)
+
+def partition_field(planner, coverage_radius, num_drones, balance='area'):
+    """Split the field into at most num_drones bands with balanced work; returns their regions.
+
+    Bands are cut halfway between the zigzag's sweep lines, so each line
+    and its obstacle-free segments fall in exactly one band, and the work
+    per line (see row_weights) is balanced so the largest band's is as
+    small as possible. Fewer bands come back when the field has fewer
+    sweep lines than drones. Regions are (x_min, y_min, x_max, y_max)
+    with infinite outer bounds, for PathPlanner.restricted.
+    """
+    if num_drones < 1:
+        raise ValueError("numDrones must be at least 1")
+    ys, segments = planner.sweep_lines(coverage_radius)
+    weights = row_weights(ys, segments, coverage_radius * 1.2, balance)
+    if not weights.any():
+        raise ValueError("The field has no free area to spray")
+    starts = balanced_groups(weights, num_drones)
+    edges = [-math.inf] + [(ys[start - 1] + ys[start]) / 2 for start in starts[1:]] + [math.inf]
+    return [(-math.inf, low, math.inf, high) for low, high in zip(edges[:-1], edges[1:])]
+
+def region_start(planner, region, coverage_radius, base):
+    """The point of region on a sweep line's free segment nearest base, where its drone starts spraying."""
+    ys, segments = planner.sweep_lines(coverage_radius)
+    best, best_distance = None, math.inf
+    for y, row in zip(ys, segments):
+        if not region[1] <= y <= region[3]:
+            continue
+        for x0, x1 in row:
+            # Keep clear of the segment ends, which lie on the edge of the field or an obstacle
+            inset = min(coverage_radius / 2, (x1 - x0) / 2)
+            x = min(max(base[0], x0 + inset), x1 - inset)
+            distance = math.hypot(x - base[0], y - base[1])
+            if distance < best_distance:
+                best, best_distance = (float(x), float(y)), distance
+    return best
+
+def plan_fleet(planner, start_point, coverage_radius, num_drones, balance='area', workers=None, **options):
+    """Plan a spraying path per drone over a partition of the field, in parallel.
+
+    The field is split by partition_field and each region is planned with
+    optimize_spraying_pattern(**options) (pattern, spraying_rate, ...) on the
+    shared process pool of workers processes (os.cpu_count() by default; 1
+    plans in this process). Every drone takes off from start_point and starts
+    spraying at its region's point nearest it. Returns (regions, paths).
+    """
+    regions = partition_field(planner, coverage_radius, num_drones, balance)
+    starts = [region_start(planner, region, coverage_radius, start_point) for region in regions]
+    options = dict(options, coverage_radius=coverage_radius)
+    workers = workers or os.cpu_count() or 1
+    # A plain copy of the field, without the prepared state, is cheap to send with each region
+    field = planner.restricted(None)
+    if workers <= 1 or len(regions) <= 1:
+        return regions, [_plan_region(field, region, start, options) for region, start in zip(regions, starts)]
+    futures = [submit(workers, _plan_region, field, region, start, options) for region, start in zip(regions, starts)]
+    return regions, [future.result() for future in futures]
+
+def fleet_statistics(start_point, paths, speed=AVERAGE_SPEED):
+    """Per-drone distance and time, including the transit from start_point, and the fleet's makespan.
+
+    The makespan is the time until the last drone finishes; balance is the
+    mean drone time over the makespan (1.0 when every drone finishes
+    together).
+    """
+    drones = []
+    for path in paths:
+        transit = math.hypot(path.x[0] - start_point[0], path.y[0] - start_point[1]) if len(path) else 0.0
+        spray_time = path.estimated_time(speed)
+        drones.append({
+            'numberOfPoints': len(path),
+            'totalDistance': path.total_distance,
+            'transitDistance': transit,
+            'sprayTime': spray_time,
+            'estimatedTime': spray_time + transit / speed
+        })
+    times = [drone['estimatedTime'] for drone in drones]
+    makespan = max(times)
+    return drones, {
+        'numDrones': len(drones),
+        'makespan': makespan,
+        'totalTime': sum(times),
+        'balance': float(np.mean(times)) / makespan if makespan else 1.0
+    }
@@ -0,0 +1,93 @@
+import numpy as np
+
+# Upper bound on grid cells per axis, so a few huge obstacles cannot blow up the grid
+MAX_CELLS_PER_AXIS = 1024
+# (point, obstacle) candidate pairs tested per block, which bounds temporary arrays
+BLOCK_PAIRS = 1 << 22
+
+class ObstacleIndex:
+    """Uniform grid hash over circular obstacles for batch point-in-obstacle tests.
+
+    Each obstacle is registered in every grid cell its bounding box touches,
+    stored CSR-style: cell_obstacles[cell_start[c]:cell_start[c + 1]] are the
+    obstacles overlapping cell c. A query point is then only compared with the
+    obstacles of its own cell, so the cost per point stays flat as the number
+    of obstacles grows.
+    """
+
+    def __init__(self, x, y, radius, cell_size=None):
+        self.x = np.asarray(x, dtype=np.float64).ravel()
+        self.y = np.asarray(y, dtype=np.float64).ravel()
+        self.radius = np.asarray(radius, dtype=np.float64).ravel()
+        if not len(self.x):
+            return
+
+        self.min_x = float((self.x - self.radius).min())
+        self.min_y = float((self.y - self.radius).min())
+        extent = max(float((self.x + self.radius).max()) - self.min_x,
+                     float((self.y + self.radius).max()) - self.min_y, 1e-9)
+        if cell_size is None:
+            # About one obstacle diameter per cell keeps candidate lists short
+            cell_size = 2.0 * float(np.median(self.radius))
+        self.cell_size = max(float(cell_size), extent / MAX_CELLS_PER_AXIS, 1e-9)
+
+        x0, y0 = self._cell(self.x - self.radius, self.y - self.radius)
+        x1, y1 = self._cell(self.x + self.radius, self.y + self.radius)
+        self.n_cols = int(x1.max()) + 1
+        self.n_rows = int(y1.max()) + 1
+
+        # Expand every obstacle into the cells of its bounding box
+        widths = x1 - x0 + 1
+        counts = widths * (y1 - y0 + 1)
+        obstacle_ids = np.repeat(np.arange(len(self.x)), counts)
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        cols = x0[obstacle_ids] + within % widths[obstacle_ids]
+        rows = y0[obstacle_ids] + within // widths[obstacle_ids]
+        cells = rows * self.n_cols + cols
+
+        order = np.argsort(cells, kind='stable')
+        self.cell_obstacles = obstacle_ids[order]
+        self.cell_start = np.zeros(self.n_rows * self.n_cols + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=self.n_rows * self.n_cols), out=self.cell_start[1:])
+
+    def __len__(self):
+        return len(self.x)
+
+    @property
+    def nbytes(self):
+        arrays = [self.x, self.y, self.radius, getattr(self, 'cell_start', None), getattr(self, 'cell_obstacles', None)]
+        return sum(array.nbytes for array in arrays if array is not None)
+
+    def _cell(self, x, y):
+        col = np.floor((np.asarray(x) - self.min_x) / self.cell_size).astype(np.int64)
+        row = np.floor((np.asarray(y) - self.min_y) / self.cell_size).astype(np.int64)
+        return col, row
+
+    def blocked(self, x, y):
+        """Return a boolean mask of the points strictly inside any obstacle."""
+        x = np.asarray(x, dtype=np.float64).ravel()
+        y = np.asarray(y, dtype=np.float64).ravel()
+        mask = np.zeros(len(x), dtype=bool)
+        if not len(self) or not len(x):
+            return mask
+
+        col, row = self._cell(x, y)
+        candidates = np.flatnonzero((col >= 0) & (col < self.n_cols) & (row >= 0) & (row < self.n_rows))
+        cells = row[candidates] * self.n_cols + col[candidates]
+        starts = self.cell_start[cells]
+        counts = self.cell_start[cells + 1] - starts
+
+        # Split the points so each block tests about BLOCK_PAIRS pairs
+        total = np.cumsum(counts)
+        edges = np.searchsorted(total, np.arange(BLOCK_PAIRS, total[-1] if len(total) else 0, BLOCK_PAIRS), side='right')
+        edges = np.unique(np.concatenate([[0], edges, [len(candidates)]]))
+        for begin, end in zip(edges[:-1], edges[1:]):
+            block_counts = counts[begin:end]
+            points = np.repeat(candidates[begin:end], block_counts)
+            within = np.arange(block_counts.sum()) - np.repeat(np.cumsum(block_counts) - block_counts, block_counts)
+            obstacles = self.cell_obstacles[np.repeat(starts[begin:end], block_counts) + within]
+
+            # Same test as the scalar check: sqrt(dx**2 + dy**2) < radius
+            distance = np.sqrt((x[points] - self.x[obstacles])**2 + (y[points] - self.y[obstacles])**2)
+            mask[points[distance < self.radius[obstacles]]] = True
+        return mask
@@ -0,0 +1,322 @@
+import gzip
+import json
+import logging
+import struct
+import time
+import zlib
+import numpy as np
+from spray_path import SprayPath
+
+try:
+    import msgpack
+except ImportError:  # Optional: pip install msgpack
+    msgpack = None
+try:
+    import brotli
+except ImportError:  # Optional: pip install brotli
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Response formats for planned paths and their media types
+PATH_FORMATS = {
+    'json': 'application/json',
+    'polyline': 'application/json',
+    'msgpack': 'application/msgpack',
+    'float32': 'application/octet-stream'
+}
+# Media types in an Accept header that select a format
+ACCEPT_FORMATS = {
+    'application/msgpack': 'msgpack',
+    'application/x-msgpack': 'msgpack',
+    'application/octet-stream': 'float32'
+}
+# Formats a path can be streamed in, and the media types of the streams
+STREAM_FORMATS = {
+    'json': 'application/x-ndjson',
+    'float32': 'application/octet-stream'
+}
+# Columns of the float32 format, one row per point
+FLOAT32_COLUMNS = ('x', 'y', 'spraying_rate')
+# Decimal places kept by the polyline format (centimetres)
+POLYLINE_PRECISION = 2
+# Largest polyline precision; more decimals overflow the int64 values of field-sized coordinates
+MAX_POLYLINE_PRECISION = 10
+# Smaller bodies are sent uncompressed, where the headers would cost more than they save
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+def available_formats():
+    return [name for name in PATH_FORMATS if name != 'msgpack' or msgpack is not None]
+
+def negotiate_format(requested=None, accept=None):
+    """Pick the path format from an explicit format name, else the Accept header, else JSON."""
+    if requested:
+        if requested not in PATH_FORMATS:
+            raise ValueError(f"Invalid format. Choose from: {available_formats()}")
+        fmt = requested
+    else:
+        fmt = 'json'
+        for media_type in (accept or '').split(','):
+            media_type = media_type.split(';')[0].strip().lower()
+            if media_type in ACCEPT_FORMATS:
+                fmt = ACCEPT_FORMATS[media_type]
+                break
+    if fmt == 'msgpack' and msgpack is None:
+        raise ValueError("The msgpack format needs the msgpack package")
+    return fmt
+
+def polyline_precision(value):
+    """Parse a requested polyline precision, raising ValueError unless it is a whole number of decimals in range."""
+    try:
+        precision = int(value)
+    except (TypeError, ValueError):
+        precision = None
+    if precision is None or isinstance(value, bool) or precision != float(value) \
+            or not 0 <= precision <= MAX_POLYLINE_PRECISION:
+        raise ValueError(f"precision must be a whole number from 0 to {MAX_POLYLINE_PRECISION}")
+    return precision
+
+def encode_polyline(x, y, precision=POLYLINE_PRECISION):
+    """Encode points with the polyline algorithm: rounded, delta-coded, zigzag, 5-bit ASCII chunks.
+
+    Values go x, y, x, y, ... with precision decimal places.
+    """
+    precision = polyline_precision(precision)
+    values = np.rint(np.column_stack([x, y]).ravel() * 10**precision).astype(np.int64)
+    deltas = np.diff(values.reshape(-1, 2), axis=0, prepend=[[0, 0]]).ravel()
+    # Zigzag so small negative deltas stay small: 0, -1, 1, -2 ... -> 0, 1, 2, 3 ...
+    unsigned = ((deltas << 1) ^ (deltas >> 63)).astype(np.uint64)
+
+    chunks = np.ones(len(unsigned), dtype=np.int64)
+    for shift in range(5, 64, 5):
+        chunks += (unsigned >> np.uint64(shift)) > 0
+    width = int(chunks.max()) if len(chunks) else 1
+    shifts = np.arange(width, dtype=np.uint64) * np.uint64(5)
+    codes = ((unsigned[:, np.newaxis] >> shifts) & np.uint64(31)).astype(np.uint8)
+    # Every chunk but a value's last carries the continuation bit
+    position = np.arange(width)
+    codes[position < chunks[:, np.newaxis] - 1] |= 0x20
+    codes += 63
+    return codes[position < chunks[:, np.newaxis]].tobytes().decode('ascii')
+
+def decode_polyline(text, precision=POLYLINE_PRECISION):
+    """Inverse of encode_polyline; returns (x, y) arrays."""
+    precision = polyline_precision(precision)
+    if not isinstance(text, str) or not text.isascii():
+        raise ValueError("A polyline must be a string of ASCII characters")
+    codes = np.frombuffer(text.encode('ascii'), dtype=np.uint8).astype(np.int64) - 63
+    if not len(codes):
+        return np.empty(0), np.empty(0)
+    if ((codes < 0) | (codes > 63)).any() or codes[-1] & 0x20:
+        raise ValueError("Malformed polyline: characters must be '?' to '~' and the last value complete")
+    ends = np.flatnonzero((codes & 0x20) == 0)
+    if len(ends) % 2:
+        raise ValueError("Malformed polyline: it must hold an x and a y per point")
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    position = np.arange(len(codes)) - np.repeat(starts, ends - starts + 1)
+    unsigned = np.add.reduceat((codes & 31) << (5 * position), starts)
+    deltas = (unsigned >> 1) ^ -(unsigned & 1)
+    values = np.cumsum(deltas.reshape(-1, 2), axis=0) / 10**precision
+    return values[:, 0], values[:, 1]
+
+def _rates(path):
+    """A single spraying rate when the path has one, else the rate column."""
+    if len(path) and (path.rate == path.rate[0]).all():
+        return {'sprayingRate': float(path.rate[0])}
+    return {'sprayingRates': path.rate.tolist()}
+
+def encode_path(path, statistics, fmt='json', precision=POLYLINE_PRECISION):
+    """Serialize a SprayPath and its statistics; returns (body bytes, media type, extra headers)."""
+    headers = {}
+    if fmt == 'json':
+        body = json.dumps({'path': path.to_dicts(), 'statistics': statistics}, separators=(',', ':')).encode('utf-8')
+    elif fmt == 'polyline':
+        body = json.dumps({
+            'path': encode_polyline(path.x, path.y, precision),
+            'pathEncoding': 'polyline',
+            'precision': precision,
+            **_rates(path),
+            'statistics': statistics
+        }, separators=(',', ':')).encode('utf-8')
+    elif fmt == 'msgpack':
+        body = msgpack.packb({
+            'x': path.x.tolist(),
+            'y': path.y.tolist(),
+            'spraying_rate': path.rate.tolist(),
+            'statistics': statistics
+        })
+    elif fmt == 'float32':
+        body = np.column_stack([path.x, path.y, path.rate]).astype('<f4').tobytes()
+        headers = {
+            'X-Path-Columns': ','.join(FLOAT32_COLUMNS),
+            'X-Path-Statistics': json.dumps(statistics, separators=(',', ':'))
+        }
+    else:
+        raise ValueError(f"Invalid format. Choose from: {available_formats()}")
+    return body, PATH_FORMATS[fmt], headers
+
+def query_floats(args, names):
+    """The fields of names present in query args, as floats; raises ValueError for one that is not a number."""
+    values = {}
+    for name in names:
+        if name in args:
+            try:
+                values[name] = float(args[name])
+            except ValueError:
+                raise ValueError(f"{name} must be a number") from None
+            if not np.isfinite(values[name]):
+                raise ValueError(f"{name} must be a number")
+    return values
+
+def decode_path(data=None, body=None, content_type=None, precision=POLYLINE_PRECISION):
+    """Read a path sent by a client, in any of the formats encode_path writes.
+
+    data is the parsed JSON or msgpack request (its 'path' a list of point
+    dicts or a polyline string); body is the raw request for float32.
+    Raises ValueError for a malformed path.
+    """
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if ACCEPT_FORMATS.get(content_type) == 'float32':
+        row_bytes = 4 * len(FLOAT32_COLUMNS)
+        if len(body) % row_bytes:
+            raise ValueError(f"A float32 path body must be whole rows of {row_bytes} bytes (x, y, spraying_rate)")
+        columns = np.frombuffer(body, dtype='<f4').reshape(-1, len(FLOAT32_COLUMNS)).astype(np.float64)
+        return SprayPath(columns[:, 0], columns[:, 1], columns[:, 2])
+    if 'x' in data and 'y' in data:
+        return SprayPath(data['x'], data['y'], data.get('spraying_rate', 1.0))
+    if data.get('pathEncoding') == 'polyline':
+        x, y = decode_polyline(data['path'], data.get('precision', precision))
+        rate = data.get('sprayingRates', data.get('sprayingRate', 1.0))
+        return SprayPath(x, y, rate)
+    return SprayPath.from_points(data['path'])
+
+def encode_stream(chunks, statistics, fmt='json'):
+    """Yield the encoded records of a path as its SprayPath chunks are generated.
+
+    json is NDJSON: a {"path": [point, ...]} line per chunk and a final
+    {"statistics": {...}} line. float32 is a sequence of frames, each a
+    little-endian uint32 row count and that many x, y, rate float32 rows;
+    a frame of 0 rows ends the path and is followed by a uint32 length and
+    the statistics as JSON. statistics() is called after the last chunk.
+    An error part way through ends the stream with {"error": message} in
+    place of the statistics, since the response status has already gone.
+    """
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"Invalid stream format. Choose from: {list(STREAM_FORMATS)}")
+    try:
+        for chunk in chunks:
+            if fmt == 'json':
+                yield json.dumps({'path': chunk.to_dicts()}, separators=(',', ':')).encode('utf-8') + b'\n'
+            else:
+                rows = np.column_stack([chunk.x, chunk.y, chunk.rate]).astype('<f4')
+                yield struct.pack('<I', len(rows)) + rows.tobytes()
+        trailer = {'statistics': statistics()}
+    except Exception as e:
+        logger.error(f"Path stream failed: {e}")
+        trailer = {'error': str(e)}
+    if fmt == 'json':
+        yield json.dumps(trailer, separators=(',', ':')).encode('utf-8') + b'\n'
+    else:
+        record = json.dumps(trailer.get('statistics', trailer), separators=(',', ':')).encode('utf-8')
+        yield struct.pack('<II', 0, len(record)) + record
+
+def decode_stream(body, fmt='json'):
+    """Read a whole stream written by encode_stream; returns (SprayPath, trailing record)."""
+    chunks = []
+    if fmt == 'json':
+        for line in body.splitlines():
+            record = json.loads(line)
+            if 'path' not in record:
+                return SprayPath.concatenate(chunks), record
+            chunks.append(SprayPath.from_points(record['path']))
+        raise ValueError("The stream ended without its statistics")
+    offset = 0
+    while offset + 4 <= len(body):
+        rows, = struct.unpack_from('<I', body, offset)
+        offset += 4
+        if rows == 0:
+            length, = struct.unpack_from('<I', body, offset)
+            return SprayPath.concatenate(chunks), json.loads(body[offset + 4:offset + 4 + length])
+        columns = np.frombuffer(body, dtype='<f4', count=rows * 3, offset=offset).reshape(rows, 3)
+        chunks.append(SprayPath(columns[:, 0], columns[:, 1], columns[:, 2]))
+        offset += rows * 12
+    raise ValueError("The stream ended without its statistics")
+
+def unpack_request(body, content_type):
+    """Parse a msgpack request body, or return None for other content types."""
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if ACCEPT_FORMATS.get(content_type) != 'msgpack':
+        return None
+    if msgpack is None:
+        raise ValueError("msgpack requests need the msgpack package")
+    return msgpack.unpackb(body)
+
+def choose_encoding(size, accept_encoding=None):
+    """The content encoding compress() would use for a body of size bytes, or None."""
+    if size < MIN_COMPRESS_BYTES:
+        return None
+    accepted = set()
+    for token in (accept_encoding or '').split(','):
+        name, _, params = token.strip().lower().partition(';')
+        if name and params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(name)
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+def compress(body, accept_encoding=None):
+    """Compress a response body with brotli or gzip when the client accepts it.
+
+    Returns (body, content encoding or None).
+    """
+    encoding = choose_encoding(len(body), accept_encoding)
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY), 'br'
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL), 'gzip'
+    return body, None
+
+def compress_stream(pieces, encoding=None):
+    """Compress a stream of byte strings in the given content encoding, or pass it through.
+
+    The compressor is flushed after every piece, so each record reaches the
+    client as soon as it is generated.
+    """
+    if encoding == 'gzip':
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for piece in pieces:
+            yield compressor.compress(piece) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+    elif encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        for piece in pieces:
+            yield compressor.process(piece) + compressor.flush()
+        yield compressor.finish()
+    else:
+        yield from pieces
+
+def measure_formats(path, statistics, encodings=('identity', 'gzip', 'br'), precision=POLYLINE_PRECISION):
+    """Payload size and encoding time for every available format and content encoding."""
+    results = []
+    for fmt in available_formats():
+        start = time.perf_counter()
+        body, _, headers = encode_path(path, statistics, fmt, precision)
+        encode_seconds = time.perf_counter() - start
+        header_bytes = sum(len(name) + len(value) for name, value in headers.items())
+        for encoding in encodings:
+            if encoding == 'br' and brotli is None:
+                continue
+            start = time.perf_counter()
+            payload, _ = compress(body, encoding) if encoding != 'identity' else (body, None)
+            results.append({
+                'format': fmt,
+                'encoding': encoding,
+                'bytes': len(payload) + header_bytes,
+                'bytesPerPoint': (len(payload) + header_bytes) / max(len(path), 1),
+                'encodeMs': 1000 * (encode_seconds + time.perf_counter() - start)
+            })
+    return results
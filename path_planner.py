@@ -1,16 +1,52 @@
+import itertools
+import threading
 import numpy as np
 # import matplotlib.pyplot as plt # Removed matplotlib
 # import io # Removed io
 # import base64 # Removed base64
-import networkx as nx
-from scipy.spatial import KDTree
-from scipy.interpolate import splprep, splev
+# networkx and scipy are imported in the methods that use them to keep startup fast
+from obstacle_index import ObstacleIndex
+from tour_engine import greedy_tour, improve_tour
+from spray_path import SprayPath
+from grid_planner import GridPlanner
+from field_geometry import as_ring, points_in_ring, ring_crossings, pair_crossings, scanline_segments, resample_segment
+
+# Spiral shapes for the spiral pattern
+SPIRAL_MODES = ('archimedean', 'rectangular')
+# Points per chunk when streaming the custom pattern, whose tour has no rows or turns
+CHUNK_POINTS = 4096
+# Points of the neighbouring chunks fitted along with each chunk when smoothing a stream
+SMOOTH_OVERLAP = 8
+# Prepared entries (grids, sweep segments, ...) kept per planner; the least recently used goes first
+MAX_PREPARED = 8
+# Smallest resample spacing as a fraction of the coverage radius, which bounds the points per metre of path
+MIN_RESAMPLE_RATIO = 0.1
+
+def check_resample_spacing(resample_spacing, coverage_radius):
+    """Raise ValueError unless resample_spacing is None or a number of at least MIN_RESAMPLE_RATIO * coverage_radius."""
+    if resample_spacing is None:
+        return
+    if isinstance(resample_spacing, bool) or not isinstance(resample_spacing, (int, float, np.number)):
+        raise ValueError("Resample spacing must be a number")
+    if not np.isfinite(resample_spacing) or resample_spacing < MIN_RESAMPLE_RATIO * coverage_radius:
+        raise ValueError(f"Resample spacing must be at least {MIN_RESAMPLE_RATIO:g} times the coverage radius")
 
 class PathPlanner:
     def __init__(self, field_size=(100, 100)):
         """Initialize the path planner with field dimensions."""
         self.field_width, self.field_height = field_size
         self.obstacles = []
+        self._obstacle_index = None
+        # Preprocessing reused across plans on this field (occupancy grids, sweep segments, ...),
+        # guarded by a lock since cached planners serve concurrent requests
+        self._prepared = {}
+        self._prepared_lock = threading.RLock()
+        # Optional polygon boundary (with holes) replacing the field_size rectangle
+        self.boundary = None
+        self.holes = []
+        self.polygon_obstacles = []
+        # Optional (x_min, y_min, x_max, y_max) rectangle the plans are limited to, as set by restricted()
+        self.region = None
         self.graph = None
         self.spraying_patterns = {
             'zigzag': self._zigzag_pattern,
@@ -25,106 +61,349 @@ class PathPlanner:
             'y': y,
             'radius': radius
         })
+        self._obstacle_index = None
+        self._prepared = {}
+
+    def set_boundary(self, vertices, holes=()):
+        """Use a polygon (x, y vertex list), minus optional hole polygons, as the field."""
+        self.boundary = as_ring(vertices)
+        self.holes = [as_ring(hole) for hole in holes]
+        self._prepared = {}
+
+    def add_polygon_obstacle(self, vertices):
+        """Add a polygonal obstacle (building, pond, tree line) to the field."""
+        self.polygon_obstacles.append(as_ring(vertices))
+        self._prepared = {}
+
+    def restricted(self, region):
+        """A planner for the same field limited to region = (x_min, y_min, x_max, y_max), edges included.
+
+        Bounds may be infinite. The copy shares the obstacles and their
+        index, and starts with no prepared state; restricted(None) gives a
+        plain copy of that kind, which is cheap to pickle.
+        """
+        planner = PathPlanner(field_size=(self.field_width, self.field_height))
+        planner.obstacles = self.obstacles
+        planner._obstacle_index = self._obstacle_index
+        planner.boundary = self.boundary
+        planner.holes = self.holes
+        planner.polygon_obstacles = self.polygon_obstacles
+        planner.region = tuple(float(v) for v in region) if region is not None else None
+        return planner
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_prepared_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._prepared_lock = threading.RLock()
+
+    def _prepare(self, key, build):
+        """Return the preprocessed state stored under key, building it on first use.
+
+        At most MAX_PREPARED entries are kept, least recently used dropped first.
+        """
+        with self._prepared_lock:
+            value = self._prepared.pop(key, None)
+            if value is None:
+                value = build()
+            self._prepared[key] = value
+            while len(self._prepared) > MAX_PREPARED:
+                del self._prepared[next(iter(self._prepared))]
+            return value
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the obstacle index and the prepared state."""
+        total = self._obstacle_index.nbytes if self._obstacle_index is not None else 0
+        with self._prepared_lock:
+            values = list(self._prepared.values())
+        for value in values:
+            if isinstance(value, np.ndarray):
+                total += value.nbytes
+            elif isinstance(value, GridPlanner):
+                total += value.nbytes
+            else:
+                # Sweep lines: ys plus one list of (x0, x1) tuples per line, ~120 bytes a segment
+                ys, segments = value
+                total += ys.nbytes + 64 * len(segments) + 120 * sum(len(row) for row in segments)
+        return total
+
+    def field_bounds(self):
+        """Return (x_min, y_min, x_max, y_max) of the field."""
+        if self.boundary is not None:
+            bounds = (*self.boundary.min(axis=0).tolist(), *self.boundary.max(axis=0).tolist())
+        else:
+            bounds = (0, 0, self.field_width, self.field_height)
+        if self.region is not None:
+            x_min, y_min, x_max, y_max = self.region
+            bounds = (max(bounds[0], x_min), max(bounds[1], y_min), min(bounds[2], x_max), min(bounds[3], y_max))
+        return bounds
+
+    def obstacle_index(self):
+        """Return the spatial index over the obstacles, rebuilding it after changes."""
+        if self._obstacle_index is None or len(self._obstacle_index) != len(self.obstacles):
+            self._obstacle_index = ObstacleIndex(
+                [obstacle['x'] for obstacle in self.obstacles],
+                [obstacle['y'] for obstacle in self.obstacles],
+                [obstacle['radius'] for obstacle in self.obstacles]
+            )
+        return self._obstacle_index
+
+    def valid_mask(self, x, y):
+        """Check many points at once; returns a boolean mask of the valid ones."""
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if self.boundary is not None:
+            mask = points_in_ring(x, y, self.boundary)
+            for hole in self.holes:
+                mask &= ~points_in_ring(x, y, hole)
+        else:
+            # Check field boundaries with a small margin
+            margin = 1.0
+            mask = (margin <= x) & (x <= self.field_width - margin) & (margin <= y) & (y <= self.field_height - margin)
+        for polygon in self.polygon_obstacles:
+            mask &= ~points_in_ring(x, y, polygon)
+        if self.region is not None:
+            x_min, y_min, x_max, y_max = self.region
+            mask &= (x_min <= x) & (x <= x_max) & (y_min <= y) & (y <= y_max)
+
+        # Check obstacles, only for the points still in the running
+        flat = mask.ravel()
+        inside = np.flatnonzero(flat)
+        if self.obstacles and len(inside):
+            flat[inside[self.obstacle_index().blocked(x.ravel()[inside], y.ravel()[inside])]] = False
+        return flat.reshape(mask.shape)
 
     def is_valid_point(self, x, y):
         """Check if a point is within the field and not in an obstacle."""
-        # Check field boundaries with a small margin
-        margin = 1.0
-        if not (margin <= x <= self.field_width - margin and margin <= y <= self.field_height - margin):
-            return False
-        
-        # Check obstacles
-        for obstacle in self.obstacles:
-            distance = np.sqrt((x - obstacle['x'])**2 + (y - obstacle['y'])**2)
-            if distance < obstacle['radius']:
-                return False
-        
-        return True
+        return bool(self.valid_mask(np.array([x]), np.array([y]))[0])
 
-    def _zigzag_pattern(self, start_point, coverage_radius):
-        """Generate a zigzag pattern for spraying."""
-        x, y = start_point
+    def _zigzag_pattern(self, start_point, coverage_radius, resample_spacing=None):
+        """Generate a zigzag pattern for spraying.
+
+        Each sweep line is clipped against the field boundary, its holes and
+        the obstacles analytically, and the path visits the entry and exit
+        point of every free segment, alternating direction between lines.
+        With resample_spacing, points are added along each segment at most
+        that far apart.
+        """
+        return SprayPath.concatenate(self._zigzag_chunks(start_point, coverage_radius, resample_spacing))
+
+    def _zigzag_chunks(self, start_point, coverage_radius, resample_spacing=None):
+        """Yield the zigzag pattern one sweep line at a time."""
+        ys, segments = self.sweep_lines(coverage_radius)
+
+        forward = True
+        for y, row in zip(ys, segments):
+            if not row:
+                continue
+            ordered = row if forward else [(end, start) for start, end in reversed(row)]
+            xs = np.concatenate([resample_segment(start, end, resample_spacing) if resample_spacing is not None
+                                 else np.array([start, end]) for start, end in ordered])
+            yield SprayPath(xs, np.full(len(xs), y))
+            forward = not forward
+
+    def sweep_lines(self, coverage_radius):
+        """The zigzag's sweep lines for coverage_radius and their free (x0, x1) segments, as (ys, segments)."""
         row_spacing = coverage_radius * 1.2
-        num_rows = int(self.field_height / row_spacing) + 1
-        path = []
-        
-        for row in range(num_rows):
-            y = row * row_spacing
-            if row % 2 == 0:
-                x_points = np.arange(0, self.field_width + coverage_radius/2, coverage_radius/2)
-            else:
-                x_points = np.arange(self.field_width, -coverage_radius/2, -coverage_radius/2)
-            
-            row_points = [(x, y) for x in x_points if self.is_valid_point(x, y)]
-            path.extend(row_points if row % 2 == 0 else reversed(row_points))
-        
-        return path
+        return self._prepare(('sweep', row_spacing), lambda: self._sweep_segments(row_spacing))
+
+    def _sweep_segments(self, row_spacing):
+        """Sweep lines row_spacing apart and their free (x0, x1) segments, as (ys, segments)."""
+        if self.boundary is not None:
+            y_min, y_max = self.boundary[:, 1].min(), self.boundary[:, 1].max()
+            ys = y_min + np.arange(int((y_max - y_min) / row_spacing) + 1) * row_spacing
+            rows, xs = zip(*[ring_crossings(ring, ys) for ring in [self.boundary] + self.holes])
+            inside = pair_crossings(np.concatenate(rows), np.concatenate(xs))
+        else:
+            margin = 1.0
+            ys = np.arange(int(self.field_height / row_spacing) + 1) * row_spacing
+            rows = np.flatnonzero((margin <= ys) & (ys <= self.field_height - margin))
+            inside = (rows, np.full(len(rows), margin), np.full(len(rows), self.field_width - margin))
+
+        circles = np.array([[o['x'], o['y'], o['radius']] for o in self.obstacles], dtype=np.float64).reshape(-1, 3)
+        segments = scanline_segments(ys, inside, self.polygon_obstacles, circles)
+        if self.region is not None:
+            x_min, y_min, x_max, y_max = self.region
+            segments = [[(max(x0, x_min), min(x1, x_max)) for x0, x1 in row if min(x1, x_max) > max(x0, x_min)]
+                        if y_min <= y <= y_max else [] for y, row in zip(ys, segments)]
+        return ys, segments
+
+    def _spiral_pattern(self, start_point, coverage_radius, resample_spacing=None, mode='archimedean'):
+        """Generate a spiral pattern for spraying, with points resample_spacing apart along the path.
+
+        The archimedean mode spirals out from the start point, one coverage
+        radius further per turn, until it reaches the farthest field corner.
+        The rectangular mode spirals inward in laps parallel to the field
+        edges, starting from the corner closest to the start point. Points
+        outside the field or in obstacles are dropped.
+        """
+        return SprayPath.concatenate(self._spiral_chunks(start_point, coverage_radius, resample_spacing, mode))
 
-    def _spiral_pattern(self, start_point, coverage_radius):
-        """Generate a spiral pattern for spraying."""
+    def _spiral_chunks(self, start_point, coverage_radius, resample_spacing=None, mode='archimedean'):
+        """Yield the spiral pattern one turn (archimedean) or lap (rectangular) at a time."""
+        if mode not in SPIRAL_MODES:
+            raise ValueError(f"Invalid spiral mode. Choose from: {list(SPIRAL_MODES)}")
+        spacing = coverage_radius / 2 if resample_spacing is None else resample_spacing
+        if not spacing > 0:
+            raise ValueError("Resample spacing must be positive")
+        if mode == 'rectangular':
+            turns = self._rectangular_spiral(start_point, coverage_radius, spacing)
+        else:
+            turns = self._archimedean_spiral(start_point, coverage_radius, spacing)
+        for x_new, y_new in turns:
+            keep = self.valid_mask(x_new, y_new)
+            if keep.any():
+                yield SprayPath(x_new[keep], y_new[keep])
+
+    def _archimedean_spiral(self, start_point, coverage_radius, spacing):
+        """Points at constant arc length on r = coverage_radius * (1 + angle / 2pi) around start_point.
+
+        Yields the (x, y) arrays of one turn at a time.
+        """
         x, y = start_point
-        path = []
-        angle = 0
-        radius = coverage_radius
-        max_radius = max(self.field_width, self.field_height)
-        
-        while radius < max_radius:
-            x_new = x + radius * np.cos(angle)
-            y_new = y + radius * np.sin(angle)
-            
-            if self.is_valid_point(x_new, y_new):
-                path.append((x_new, y_new))
-            
-            angle += 0.1
-            radius += coverage_radius / (2 * np.pi)
-        
-        return path
+        corners = self.boundary if self.boundary is not None else \
+            np.array([(0, 0), (self.field_width, 0), (0, self.field_height), (self.field_width, self.field_height)])
+        if self.region is not None:
+            x_min, y_min, x_max, y_max = self.field_bounds()
+            corners = np.array([(x_min, y_min), (x_max, y_min), (x_min, y_max), (x_max, y_max)])
+        max_radius = float(np.hypot(corners[:, 0] - x, corners[:, 1] - y).max())
+        if coverage_radius >= max_radius:
+            return
 
-    def _custom_pattern(self, start_point, coverage_radius):
-        """Generate a custom pattern based on field characteristics."""
-        # Create a grid of potential points
+        # With r = b * phi, the arc length from phi = 0 is b / 2 * (phi * sqrt(1 + phi^2) + asinh(phi))
+        b = coverage_radius / (2 * np.pi)
+        def arc_length(phi):
+            return b / 2 * (phi * np.sqrt(1 + phi**2) + np.arcsinh(phi))
+
+        phi_start, phi_end = coverage_radius / b, max_radius / b
+        offset = arc_length(phi_start)
+        count = int(np.ceil((arc_length(phi_end) - offset) / spacing))
+        # Point i lies i * spacing along the spiral; a turn ends where phi has grown by 2pi
+        turn_ends = arc_length(np.arange(phi_start + 2 * np.pi, phi_end + 2 * np.pi, 2 * np.pi)) - offset
+        ends = np.minimum(np.ceil(turn_ends / spacing).astype(np.int64), count)
+        ends[-1] = count
+        begin = 0
+        for end in ends:
+            if end <= begin:
+                continue
+            target = offset + np.arange(begin, end) * spacing
+            # Newton's method from the large-phi approximation arc_length ~ b * phi^2 / 2
+            phi = np.sqrt(2 * target / b)
+            for _ in range(4):
+                phi -= (arc_length(phi) - target) / (b * np.sqrt(1 + phi**2))
+
+            radius, angle = b * phi, phi - phi_start
+            yield x + radius * np.cos(angle), y + radius * np.sin(angle)
+            begin = end
+
+    def _rectangular_spiral(self, start_point, coverage_radius, spacing):
+        """Inward laps coverage_radius apart along the field edges, from the corner nearest start_point.
+
+        Yields the (x, y) arrays of one lap at a time.
+        """
+        margin = 1.0
+        left, bottom, right, top = margin, margin, self.field_width - margin, self.field_height - margin
+        if self.region is not None:
+            # Half a lap in from a region's edges, so the laps of neighbouring regions stay a lap apart
+            half = coverage_radius / 2
+            left, bottom = max(left, self.region[0] + half), max(bottom, self.region[1] + half)
+            right, top = min(right, self.region[2] - half), min(top, self.region[3] - half)
+        width, height = right - left, top - bottom
+        if width <= 0 or height <= 0:
+            return
+
+        # Lap k runs right, up, left and down at inset k * coverage_radius,
+        # stopping one lap width above where it started
+        inset = np.arange(int(min(width, height) / (2 * coverage_radius)) + 2)[:, np.newaxis] * coverage_radius
+        corners = np.concatenate([
+            np.hstack([width - inset, inset]),
+            np.hstack([width - inset, height - inset]),
+            np.hstack([inset, height - inset]),
+            np.hstack([inset, inset + coverage_radius])
+        ], axis=1).reshape(-1, 2)
+        corners = np.vstack([[0.0, 0.0], corners])
+
+        # The spiral ends at the first leg that no longer heads the way its side should
+        headings = np.tile([[1, 0], [0, 1], [-1, 0], [0, -1]], (len(inset), 1))
+        lengths = (np.diff(corners, axis=0) * headings).sum(axis=1)
+        ends = np.flatnonzero(lengths <= 0)
+        if len(ends):
+            corners, lengths = corners[:ends[0] + 1], lengths[:ends[0]]
+
+        # Resample the four legs of each lap, keeping their start points; the last lap adds the final corner
+        counts = np.maximum(np.ceil(lengths / spacing).astype(np.int64), 1)
+        for first in range(0, max(len(counts), 1), 4):
+            lap = counts[first:first + 4]
+            legs = np.repeat(np.arange(first, first + len(lap)), lap)
+            step = np.arange(lap.sum()) - np.repeat(np.cumsum(lap) - lap, lap)
+            t = (step / counts[legs])[:, np.newaxis]
+            points = corners[legs] + t * (corners[legs + 1] - corners[legs])
+            if first + 4 >= len(counts):
+                points = np.vstack([points, corners[-1:]])
+
+            # Mirror so the spiral starts at the corner closest to the start point
+            x, y = points[:, 0], points[:, 1]
+            if start_point[0] > (left + right) / 2:
+                x = width - x
+            if start_point[1] > (bottom + top) / 2:
+                y = height - y
+            yield x + left, y + bottom
+
+    def _custom_pattern(self, start_point, coverage_radius, tour_time_limit=None):
+        """Visit a grid of valid points at coverage_radius / 2 in greedy nearest-neighbour order.
+
+        tour_time_limit, in seconds, adds a 2-opt / Or-opt pass that shortens
+        the greedy tour until the time runs out.
+        """
+        points = self._prepare(('custom', coverage_radius), lambda: self._custom_points(coverage_radius))
+
+        order = greedy_tour(points, start_point)
+        if tour_time_limit:
+            order = improve_tour(points, order, tour_time_limit)
+
+        # Start from the given point, unless the tour already does: a zero-length first segment breaks splprep
+        tour = points[order]
+        if not len(tour) or (tour[0] != start_point).any():
+            tour = np.vstack([np.reshape(start_point, (1, 2)), tour])
+        return SprayPath(tour[:, 0], tour[:, 1])
+
+    def _custom_chunks(self, start_point, coverage_radius, tour_time_limit=None):
+        """Yield the custom pattern CHUNK_POINTS at a time; the whole tour is planned before the first."""
+        path = self._custom_pattern(start_point, coverage_radius, tour_time_limit)
+        for begin in range(0, len(path), CHUNK_POINTS):
+            yield path[begin:begin + CHUNK_POINTS]
+
+    def _custom_points(self, coverage_radius):
+        """The valid points of a grid coverage_radius / 2 apart, as an (n, 2) array."""
         x_points = np.arange(0, self.field_width, coverage_radius/2)
         y_points = np.arange(0, self.field_height, coverage_radius/2)
-        points = [(x, y) for x in x_points for y in y_points if self.is_valid_point(x, y)]
-        
-        # Use KDTree for efficient nearest neighbor search
-        tree = KDTree(points)
-        
-        # Start from the given point
-        current_point = start_point
-        path = [current_point]
-        remaining_points = set(points)
-        
-        while remaining_points:
-            # Find nearest valid point
-            distances, indices = tree.query([current_point], k=1)
-            next_point = points[indices[0]]
-            
-            if next_point in remaining_points:
-                path.append(next_point)
-                remaining_points.remove(next_point)
-                current_point = next_point
-            else:
-                break
-        
-        return path
+        if self.region is not None:
+            x_min, y_min, x_max, y_max = self.region
+            x_points = x_points[(x_min <= x_points) & (x_points <= x_max)]
+            y_points = y_points[(y_min <= y_points) & (y_points <= y_max)]
+        grid_x, grid_y = np.meshgrid(x_points, y_points, indexing='ij')
+        keep = self.valid_mask(grid_x, grid_y)
+        return np.column_stack([grid_x[keep], grid_y[keep]])
 
     def optimize_spraying_pattern(self, start_point=(0, 0), coverage_radius=10, pattern='zigzag', 
-                                spraying_rate=None, smooth_path=True):
-        """Generate an optimized spraying pattern with the specified parameters."""
+                                spraying_rate=None, smooth_path=True, resample_spacing=None,
+                                tour_time_limit=None, spiral_mode='archimedean'):
+        """Generate an optimized spraying pattern with the specified parameters, as a SprayPath.
+
+        The zigzag pattern returns only segment endpoints unless resample_spacing
+        is given; smoothing needs dense points, so it resamples at
+        coverage_radius / 2 by default. The spiral pattern is sampled every
+        resample_spacing (coverage_radius / 2 by default) in spiral_mode, and
+        tour_time_limit bounds the tour improvement of the custom pattern, in
+        seconds.
+        """
         try:
-            if coverage_radius <= 0:
-                raise ValueError("Coverage radius must be positive")
-            
-            x, y = start_point
-            if not self.is_valid_point(x, y):
-                raise ValueError("Start point is not valid (outside field or in obstacle)")
-            
-            # Generate base path using selected pattern
-            if pattern not in self.spraying_patterns:
-                raise ValueError(f"Invalid pattern. Choose from: {list(self.spraying_patterns.keys())}")
-            
-            path = self.spraying_patterns[pattern](start_point, coverage_radius)
+            path = SprayPath.concatenate(self._pattern_chunks(start_point, coverage_radius, pattern, smooth_path,
+                                                              resample_spacing, tour_time_limit, spiral_mode))
             
             if len(path) < 2:
                 raise ValueError("Could not generate valid path with given parameters")
@@ -133,42 +412,109 @@ class PathPlanner:
             if smooth_path:
                 path = self._smooth_path(path)
             
-            # Convert path points to list of dictionaries with spraying rate
-            path_points = []
-            for x, y in path:
-                point = {
-                    'x': float(x),
-                    'y': float(y),
-                    'spraying_rate': spraying_rate if spraying_rate is not None else 1.0
-                }
-                path_points.append(point)
-            
-            return path_points
+            return SprayPath(path.x, path.y, spraying_rate if spraying_rate is not None else 1.0)
             
         except Exception as e:
             print(f"Error in optimize_spraying_pattern: {e}")
             raise
 
+    def stream_spraying_pattern(self, start_point=(0, 0), coverage_radius=10, pattern='zigzag',
+                                spraying_rate=None, smooth_path=True, resample_spacing=None,
+                                tour_time_limit=None, spiral_mode='archimedean'):
+        """Generate the spraying pattern as an iterator of SprayPath chunks, for streaming.
+
+        Takes the arguments of optimize_spraying_pattern, and raises the same
+        errors before returning. Chunks follow the pattern: a sweep line, a
+        spiral turn or lap, or CHUNK_POINTS of the custom tour. Smoothing
+        fits each chunk along with SMOOTH_OVERLAP points of its neighbours,
+        so it differs slightly from smoothing the whole path at once.
+        """
+        chunks = self._pattern_chunks(start_point, coverage_radius, pattern, smooth_path,
+                                      resample_spacing, tour_time_limit, spiral_mode)
+        # Generate until there are two points, so a path that cannot be made fails before streaming
+        head = []
+        while sum(len(chunk) for chunk in head) < 2:
+            chunk = next(chunks, None)
+            if chunk is None:
+                raise ValueError("Could not generate valid path with given parameters")
+            head.append(chunk)
+        chunks = itertools.chain(head, chunks)
+        if smooth_path:
+            chunks = self._smooth_chunks(chunks)
+        rate = spraying_rate if spraying_rate is not None else 1.0
+        return (SprayPath(chunk.x, chunk.y, rate) for chunk in chunks if len(chunk))
+
+    def _pattern_chunks(self, start_point, coverage_radius, pattern, smooth_path, resample_spacing,
+                        tour_time_limit, spiral_mode):
+        """Check the arguments and return an iterator over the chunks of the chosen pattern."""
+        if coverage_radius <= 0:
+            raise ValueError("Coverage radius must be positive")
+        
+        x, y = start_point
+        if not self.is_valid_point(x, y):
+            raise ValueError("Start point is not valid (outside field or in obstacle)")
+        
+        # Generate base path using selected pattern
+        if pattern not in self.spraying_patterns:
+            raise ValueError(f"Invalid pattern. Choose from: {list(self.spraying_patterns.keys())}")
+        check_resample_spacing(resample_spacing, coverage_radius)
+        
+        if pattern == 'zigzag':
+            if resample_spacing is None and smooth_path:
+                resample_spacing = coverage_radius / 2
+            return self._zigzag_chunks(start_point, coverage_radius, resample_spacing)
+        if pattern == 'spiral':
+            if spiral_mode not in SPIRAL_MODES:
+                raise ValueError(f"Invalid spiral mode. Choose from: {list(SPIRAL_MODES)}")
+            return self._spiral_chunks(start_point, coverage_radius, resample_spacing, spiral_mode)
+        if pattern == 'custom':
+            return self._custom_chunks(start_point, coverage_radius, tour_time_limit)
+        return iter([self.spraying_patterns[pattern](start_point, coverage_radius)])
+
     def _smooth_path(self, path, smoothing_factor=0.5):
         """Smooth the path using spline interpolation."""
         if len(path) < 3:
             return path
         
-        # Convert path to numpy arrays
-        x = np.array([p[0] for p in path])
-        y = np.array([p[1] for p in path])
-        
         # Fit spline
-        tck, u = splprep([x, y], s=smoothing_factor)
+        from scipy.interpolate import splprep, splev
+        tck, u = splprep([path.x, path.y], s=smoothing_factor)
         
         # Generate smooth path
         u_new = np.linspace(0, 1, len(path) * 2)
         x_new, y_new = splev(u_new, tck)
         
-        # Convert back to list of tuples and filter invalid points
-        smooth_path = [(x, y) for x, y in zip(x_new, y_new) if self.is_valid_point(x, y)]
-        
-        return smooth_path
+        # Filter invalid points
+        keep = self.valid_mask(x_new, y_new)
+        return SprayPath(x_new[keep], y_new[keep])
+
+    def _smooth_chunks(self, chunks, smoothing_factor=0.5):
+        """Smooth a chunked path, fitting a spline to each chunk plus SMOOTH_OVERLAP points either side.
+
+        Each chunk's stretch of spline runs up to the first point of the next
+        chunk, so every join is smoothed once, and is sampled at twice the
+        chunk's point count as in _smooth_path.
+        """
+        from scipy.interpolate import splprep, splev
+        chunks = (chunk for chunk in chunks if len(chunk))
+        tail = np.empty((0, 2))
+        current = next(chunks, None)
+        while current is not None:
+            following = next(chunks, None)
+            head = following.xy[:SMOOTH_OVERLAP] if following is not None else np.empty((0, 2))
+            window = np.vstack([tail, current.xy, head])
+            tail = current.xy[-SMOOTH_OVERLAP:]
+            if len(window) <= 3:
+                yield current
+            else:
+                tck, u = splprep([window[:, 0], window[:, 1]], s=smoothing_factor)
+                last = following is None
+                end = u[-1] if last else u[len(window) - len(head)]
+                u_new = np.linspace(u[len(window) - len(head) - len(current)], end, 2 * len(current), endpoint=last)
+                x_new, y_new = splev(u_new, tck)
+                keep = self.valid_mask(x_new, y_new)
+                yield SprayPath(x_new[keep], y_new[keep])
+            current = following
 
     def visualize_path(self, path, coverage_radius):
         """Create a simple text-based visualization of the path."""
@@ -179,24 +525,20 @@ class PathPlanner:
             # Create a simple grid representation
             grid_width = int(self.field_width) + 1
             grid_height = int(self.field_height) + 1
-            grid = [['.' for _ in range(grid_width)] for _ in range(grid_height)]
-
-            # Mark path points on the grid
-            for point in path:
-                x, y = int(point['x']), int(point['y'])
-                if 0 <= x < grid_width and 0 <= y < grid_height:
-                    grid[y][x] = 'X'
-
-            # Mark start and end points
-            start_x, start_y = int(path[0]['x']), int(path[0]['y'])
-            end_x, end_y = int(path[-1]['x']), int(path[-1]['y'])
-            if 0 <= start_x < grid_width and 0 <= start_y < grid_height:
-                grid[start_y][start_x] = 'S'
-            if 0 <= end_x < grid_width and 0 <= end_y < grid_height:
-                grid[end_y][end_x] = 'E'
+            grid = np.full((grid_height, grid_width), '.', dtype='<U1')
+
+            # Mark path points on the grid, then the start and end points
+            path = SprayPath.from_points(path)
+            x = np.trunc(path.x).astype(np.int64)
+            y = np.trunc(path.y).astype(np.int64)
+            on_grid = (0 <= x) & (x < grid_width) & (0 <= y) & (y < grid_height)
+            grid[y[on_grid], x[on_grid]] = 'X'
+            for index, mark in ((0, 'S'), (-1, 'E')):
+                if on_grid[index]:
+                    grid[y[index], x[index]] = mark
 
             # Convert grid to a string representation
-            visualization_str = "\n".join([" ".join(row) for row in reversed(grid)])
+            visualization_str = "\n".join([" ".join(row) for row in grid[::-1].tolist()])
 
             # Add basic information
             visualization_str = f"Field Size: {self.field_width}x{self.field_height} | Coverage Radius: {coverage_radius}\n" + visualization_str
@@ -209,6 +551,7 @@ class PathPlanner:
 
     def plan_path(self, start, end):
         """Plan path using A* algorithm."""
+        import networkx as nx
         try:
             path = nx.astar_path(self.graph, start, end)
             return path
@@ -217,6 +560,7 @@ class PathPlanner:
 
     def grid_to_graph(self):
         """Convert the field grid to a graph for path planning."""
+        import networkx as nx
         self.graph = nx.grid_2d_graph(self.field_width, self.field_height)
         
         # Remove nodes that are in obstacles
@@ -229,7 +573,51 @@ class PathPlanner:
                         if (x, y) in self.graph:
                             self.graph.remove_node((x, y))
 
+    def occupancy_grid(self, resolution=1.0):
+        """Boolean grid of blocked cells, cell (i, j) centred at (i * resolution, j * resolution).
+
+        Circular obstacles block the cells within their radius, edge included,
+        as grid_to_graph does; polygon obstacles, holes and cells outside a
+        polygon boundary are blocked too. The grid is built once per resolution.
+        """
+        return self._prepare(('occupancy', resolution), lambda: self._occupancy_grid(resolution))
+
+    def _occupancy_grid(self, resolution):
+        xs = np.arange(int(self.field_width / resolution)) * resolution
+        ys = np.arange(int(self.field_height / resolution)) * resolution
+        blocked = np.zeros((len(xs), len(ys)), dtype=bool)
+        if self.boundary is not None or self.polygon_obstacles:
+            grid_x, grid_y = np.meshgrid(xs, ys, indexing='ij')
+            if self.boundary is not None:
+                blocked |= ~points_in_ring(grid_x, grid_y, self.boundary)
+                for hole in self.holes:
+                    blocked |= points_in_ring(grid_x, grid_y, hole)
+            for polygon in self.polygon_obstacles:
+                blocked |= points_in_ring(grid_x, grid_y, polygon)
+
+        for obstacle in self.obstacles:
+            x, y, radius = obstacle['x'], obstacle['y'], obstacle['radius']
+            i0, i1 = np.searchsorted(xs, x - radius, side='left'), np.searchsorted(xs, x + radius, side='right')
+            j0, j1 = np.searchsorted(ys, y - radius, side='left'), np.searchsorted(ys, y + radius, side='right')
+            dx = xs[i0:i1, np.newaxis] - x
+            dy = ys[np.newaxis, j0:j1] - y
+            blocked[i0:i1, j0:j1] |= dx**2 + dy**2 <= radius**2
+        return blocked
+
+    def plan_grid_path(self, start, end, resolution=1.0, connectivity=8, method='astar'):
+        """Shortest path between two points over the occupancy grid, as a list of (x, y) cell centres.
+
+        method is 'astar' or 'jps' (Jump Point Search, 8-connectivity only).
+        Returns None when no path exists.
+        """
+        return self.grid_planner(resolution, connectivity).plan(start, end, method)
+
+    def grid_planner(self, resolution=1.0, connectivity=8):
+        """The GridPlanner over this field's occupancy grid, kept for reuse."""
+        return self._prepare(('grid', resolution, connectivity),
+                             lambda: GridPlanner.from_planner(self, resolution, connectivity))
+
     def plan_path_with_graph(self, start, end):
         """Plan path using graph-based approach."""
-        self.grid_to_graph()
-        return self.plan_path(start, end) 
\ No newline at end of file
+        path = self.plan_grid_path(start, end, connectivity=4)
+        return [(int(x), int(y)) for x, y in path] if path is not None else None
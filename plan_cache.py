@@ -0,0 +1,222 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from path_encoding import compress
+from ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Bump when planning or encoding changes the response for the same request,
+# so results already in a shared disk cache are not served
+PLAN_CACHE_VERSION = 1
+# Request fields a /path-plan response depends on, with the value a missing field means
+PLAN_FIELDS = {
+    'fieldWidth': None,
+    'fieldHeight': None,
+    'boundary': None,
+    'holes': None,
+    'obstacles': None,
+    'coverageRadius': None,
+    'startX': None,
+    'startY': None,
+    'pattern': None,
+    'sprayingRate': None,
+    'smoothPath': True,
+    'resampleSpacing': None,
+    'tourTimeLimit': None,
+    'spiralMode': 'archimedean',
+    'numDrones': 1,
+    'droneBalance': 'area'
+}
+DISK_SUFFIX = '.plan'
+# Expired files are swept from the disk tier after this many writes
+DISK_PRUNE_EVERY = 256
+
+def _canonical(value):
+    """Numbers as floats (so 100 and 100.0 agree) and tuples as lists, recursively."""
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    return [_canonical(v) for v in value]
+
+def plan_key(data, fmt='json', precision=None):
+    """Content hash of everything a /path-plan response depends on.
+
+    Missing, null and empty-list fields count as their defaults and the
+    order of JSON keys does not matter, so equivalent requests share a key.
+    """
+    request = {}
+    for name, default in PLAN_FIELDS.items():
+        value = data.get(name)
+        request[name] = _canonical(default if value is None or value == [] else value)
+    canonical = {'version': PLAN_CACHE_VERSION, 'request': request, 'format': fmt,
+                 'precision': precision if fmt == 'polyline' else None}
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+def _opaque_tag(tag):
+    tag = tag.strip()
+    return tag[2:] if tag.startswith('W/') else tag
+
+def etag_matches(if_none_match, etag):
+    """Whether an If-None-Match header names etag (weak comparison, as RFC 9110 asks for)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return _opaque_tag(etag) in (_opaque_tag(tag) for tag in if_none_match.split(','))
+
+class CachedPlan:
+    """One encoded response: the uncompressed body, its media type and headers.
+
+    Compressed copies are made on first use and kept in variants. The strong
+    ETag is a hash of the body, with the content encoding appended for a
+    compressed copy since its bytes differ.
+    """
+
+    def __init__(self, body, mimetype, headers=None):
+        self.body = body
+        self.mimetype = mimetype
+        self.headers = dict(headers or {})
+        self.digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.variants = {}
+
+    def etag(self, encoding=None):
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+    def payload(self, encoding=None):
+        """The body in the given content encoding."""
+        if not encoding:
+            return self.body
+        if encoding not in self.variants:
+            self.variants[encoding], _ = compress(self.body, encoding)
+        return self.variants[encoding]
+
+    @property
+    def nbytes(self):
+        return len(self.body) + sum(len(body) for body in self.variants.values())
+
+class PlanCache:
+    """Encoded /path-plan responses keyed by plan_key, in memory and optionally on disk.
+
+    The memory tier is an LRU bounded by entry count and bytes. With a
+    directory, responses are also written there (one file per key, renamed
+    into place) so other worker processes sharing the directory reuse them;
+    disk entries older than ttl are ignored and swept. Disk errors are
+    logged and otherwise treated as misses.
+    """
+
+    def __init__(self, maxsize=256, ttl=None, maxbytes=None, directory=None):
+        self.ttl = ttl
+        self.directory = directory
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl, maxbytes=maxbytes, sizeof=lambda entry: entry.nbytes)
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.disk_writes = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key):
+        """Return the CachedPlan for key from memory, else from disk, else None."""
+        entry = self.memory.get(key)
+        if entry is None and self.directory:
+            entry = self._read(key)
+            if entry is not None:
+                self.memory.put(key, entry)
+                with self._lock:
+                    self.disk_hits += 1
+        return entry
+
+    def put(self, key, body, mimetype, headers=None):
+        """Cache an encoded response; returns its CachedPlan."""
+        entry = CachedPlan(body, mimetype, headers)
+        self.memory.put(key, entry)
+        if self.directory:
+            self._write(key, entry)
+        return entry
+
+    def payload(self, key, entry, encoding=None):
+        """entry's body in encoding, re-measuring the memory tier when a new compressed copy is made."""
+        new = encoding and encoding not in entry.variants
+        body = entry.payload(encoding)
+        if new:
+            self.memory.put(key, entry)
+        return body
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + DISK_SUFFIX)
+
+    def _read(self, key):
+        file_path = self._path(key)
+        try:
+            if self.ttl and os.path.getmtime(file_path) + self.ttl <= time.time():
+                os.remove(file_path)
+                return None
+            with open(file_path, 'rb') as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable plan cache file {file_path}: {e}")
+            return None
+        return CachedPlan(body, meta['mimetype'], meta['headers'])
+
+    def _write(self, key, entry):
+        # Write to a temporary file and rename, so readers never see half a response
+        file_path = self._path(key)
+        tmp = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        meta = json.dumps({'mimetype': entry.mimetype, 'headers': entry.headers}, separators=(',', ':'))
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(meta.encode('utf-8') + b'\n')
+                f.write(entry.body)
+            os.replace(tmp, file_path)
+        except OSError as e:
+            logger.warning(f"Could not write plan cache file {file_path}: {e}")
+            return
+        with self._lock:
+            self.disk_writes += 1
+            prune = self.disk_writes % DISK_PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+
+    def prune(self):
+        """Remove disk entries older than ttl; returns how many were removed."""
+        if not (self.directory and self.ttl):
+            return 0
+        removed = 0
+        cutoff = time.time() - self.ttl
+        for name in os.listdir(self.directory):
+            if not name.endswith(DISK_SUFFIX):
+                continue
+            try:
+                if os.path.getmtime(os.path.join(self.directory, name)) <= cutoff:
+                    os.remove(os.path.join(self.directory, name))
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def clear(self):
+        """Drop every entry from memory and disk."""
+        self.memory.clear()
+        if self.directory:
+            for name in os.listdir(self.directory):
+                if name.endswith(DISK_SUFFIX):
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except OSError:
+                        pass
+
+    def stats(self):
+        stats = self.memory.stats()
+        stats['directory'] = self.directory
+        stats['diskHits'] = self.disk_hits
+        stats['diskWrites'] = self.disk_writes
+        return stats
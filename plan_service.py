@@ -0,0 +1,149 @@
+import hashlib
+import math
+import json
+import numpy as np
+from coverage import coverage_report
+from multi_drone import BALANCE_MODES, plan_fleet, fleet_statistics
+from path_planner import PathPlanner, SPIRAL_MODES, check_resample_spacing
+from spray_path import SprayPath
+
+# /path-plan planning that does not need the web app, so batch workers can run it in their own processes
+
+VALID_PATTERNS = ['zigzag', 'spiral', 'custom']
+REQUIRED_FIELDS = ['fieldWidth', 'fieldHeight', 'coverageRadius', 'startX', 'startY', 'pattern']
+
+def validate_plan_request(data, max_drones):
+    """Return the error message for an invalid /path-plan request body, or None."""
+    if not isinstance(data, dict) or not all(field in data for field in REQUIRED_FIELDS):
+        return 'Missing required fields'
+    try:
+        # Validate field dimensions
+        if data['fieldWidth'] <= 0 or data['fieldHeight'] <= 0 or data['coverageRadius'] <= 0:
+            return 'Field dimensions and coverage radius must be positive'
+
+        # Validate start point
+        if (data['startX'] < 0 or data['startY'] < 0 or
+                data['startX'] > data['fieldWidth'] or data['startY'] > data['fieldHeight']):
+            return 'Start point must be within field boundaries'
+    except TypeError:
+        return 'Field dimensions, coverage radius and start point must be numbers'
+
+    # Validate pattern
+    if data['pattern'] not in VALID_PATTERNS:
+        return f'Invalid pattern. Choose from: {VALID_PATTERNS}'
+    if data.get('spiralMode', 'archimedean') not in SPIRAL_MODES:
+        return f'Invalid spiral mode. Choose from: {list(SPIRAL_MODES)}'
+    try:
+        check_resample_spacing(data.get('resampleSpacing'), data['coverageRadius'])
+    except ValueError as e:
+        return str(e)
+    limit = data.get('tourTimeLimit')
+    if limit is not None and (isinstance(limit, bool) or not isinstance(limit, (int, float))
+                              or not 0 <= limit < math.inf):
+        return 'tourTimeLimit must be a non-negative number of seconds'
+
+    # Several drones split the field between them
+    try:
+        num_drones = drone_count(data)
+    except (TypeError, ValueError):
+        return 'numDrones must be an integer'
+    if not 1 <= num_drones <= max_drones:
+        return f'numDrones must be between 1 and {max_drones}'
+    if data.get('droneBalance', 'area') not in BALANCE_MODES:
+        return f'Invalid drone balance. Choose from: {list(BALANCE_MODES)}'
+    return None
+
+def drone_count(data):
+    return int(data['numDrones']) if data.get('numDrones') is not None else 1
+
+def planning_options(data):
+    """The optimize_spraying_pattern arguments of a request body, but the start point and radius."""
+    return {
+        'pattern': data['pattern'],
+        'spraying_rate': data.get('sprayingRate'),
+        'smooth_path': data.get('smoothPath', True),
+        'resample_spacing': data.get('resampleSpacing'),
+        'tour_time_limit': data.get('tourTimeLimit'),
+        'spiral_mode': data.get('spiralMode', 'archimedean')
+    }
+
+def build_planner(data):
+    """Create a PathPlanner for a /path-plan request body.
+
+    Besides fieldWidth/fieldHeight the body may give a polygon "boundary"
+    ([[x, y], ...]) with "holes" (a list of polygons), and "obstacles":
+    circles as {"x", "y", "radius"} or polygons as {"vertices": [[x, y], ...]}.
+    """
+    planner = PathPlanner(field_size=(data['fieldWidth'], data['fieldHeight']))
+    if data.get('boundary'):
+        planner.set_boundary(data['boundary'], holes=data.get('holes') or [])
+    for obstacle in data.get('obstacles') or []:
+        if 'vertices' in obstacle:
+            planner.add_polygon_obstacle(obstacle['vertices'])
+        else:
+            radius = float(obstacle['radius'])
+            if radius <= 0:
+                raise ValueError('obstacle radius must be positive')
+            planner.add_obstacle(float(obstacle['x']), float(obstacle['y']), radius)
+    return planner
+
+def field_key(data):
+    """Content hash of the field geometry in a request body: dimensions, boundary, holes and obstacles."""
+    geometry = {name: data.get(name) for name in ('fieldWidth', 'fieldHeight', 'boundary', 'holes', 'obstacles')}
+    return hashlib.sha1(json.dumps(geometry, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+def path_statistics(data, path, coverage):
+    """The statistics of a /path-plan response, for a SprayPath or the PathTotals of a streamed path."""
+    x_min, y_min, x_max, y_max = path.bounds()
+    return {
+        'totalDistance': path.total_distance,
+        'coverageArea': coverage['coveredArea'],
+        'coverage': coverage,
+        'estimatedTime': path.estimated_time(),
+        'bounds': {'xMin': x_min, 'yMin': y_min, 'xMax': x_max, 'yMax': y_max},
+        'numberOfPoints': len(path),
+        'pattern': data['pattern'],
+        'sprayingRate': data.get('sprayingRate', 1.0)
+    }
+
+def plan_path(planner, data):
+    """Plan a single-drone request; returns (SprayPath, statistics)."""
+    path = planner.optimize_spraying_pattern(start_point=(data['startX'], data['startY']),
+                                             coverage_radius=data['coverageRadius'], **planning_options(data))
+    if not len(path):
+        raise ValueError('Failed to generate path')
+    coverage = coverage_report(path.x, path.y, data['coverageRadius'],
+                               field_mask=planner.valid_mask, field_bounds=planner.field_bounds())
+    return path, path_statistics(data, path, coverage)
+
+def fleet_plan_body(planner, data, workers=None):
+    """JSON body of a multi-drone plan: each drone's region, path and statistics, and the fleet's makespan.
+
+    The statistics are those of a single-drone plan over all the paths,
+    with totalDistance summed over the drones and estimatedTime the
+    makespan, the time until the last drone is done (transit from the
+    start point included).
+    """
+    start_point = (data['startX'], data['startY'])
+    regions, paths = plan_fleet(planner, start_point, data['coverageRadius'], drone_count(data),
+                                balance=data.get('droneBalance', 'area'), workers=workers,
+                                **planning_options(data))
+    drones, fleet = fleet_statistics(start_point, paths)
+    combined = SprayPath.concatenate(paths)
+    coverage = coverage_report(combined.x, combined.y, data['coverageRadius'],
+                               field_mask=planner.valid_mask, field_bounds=planner.field_bounds(),
+                               breaks=np.cumsum([len(path) for path in paths])[:-1].tolist())
+    statistics = path_statistics(data, combined, coverage)
+    statistics.update(fleet, totalDistance=sum(drone['totalDistance'] for drone in drones),
+                      estimatedTime=fleet['makespan'])
+
+    response = []
+    for index, (region, path, drone) in enumerate(zip(regions, paths, drones)):
+        x_min, y_min, x_max, y_max = planner.restricted(region).field_bounds()
+        response.append({
+            'drone': index,
+            'region': {'xMin': x_min, 'yMin': y_min, 'xMax': x_max, 'yMax': y_max},
+            'path': path.to_dicts(),
+            'statistics': drone
+        })
+    return json.dumps({'drones': response, 'statistics': statistics}, separators=(',', ':')).encode('utf-8')
@@ -0,0 +1,299 @@
+import csv
+import io
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import numpy as np
+from crop_predictor import samples_to_array, predict_top_k
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process job locks
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+INPUT_NAME = 'input.csv'
+STATE_NAME = 'job.json'
+LOCK_NAME = 'job.lock'
+OUTPUT_FORMATS = {'ndjson': 'results.ndjson', 'csv': 'results.csv'}
+
+def _write_json(file_path, data):
+    # Write to a temporary file and rename, so a crash never leaves half a state file
+    tmp = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, file_path)
+
+def _csv_records(f):
+    """Yield (record, end offset) for each CSV record of binary file f from its current position.
+
+    Newlines inside quoted fields stay within their record, and blank lines
+    are skipped, as pandas does.
+    """
+    offset = f.tell()
+    lines, quotes = [], 0
+    for line in f:
+        offset += len(line)
+        lines.append(line)
+        quotes += line.count(b'"')
+        if quotes % 2:
+            continue
+        record, lines, quotes = b''.join(lines), [], 0
+        if record.strip():
+            yield record, offset
+    if lines and b''.join(lines).strip():
+        yield b''.join(lines), offset
+
+def _count_rows(file_path):
+    """Count data rows in a CSV file by its records, without parsing them."""
+    with open(file_path, 'rb') as f:
+        return max(sum(1 for _ in _csv_records(f)) - 1, 0)
+
+def _lock_job(job_dir):
+    """Open the job's lock file holding an exclusive lock on it, or return None if another process holds it."""
+    lock = open(os.path.join(job_dir, LOCK_NAME), 'a')
+    if fcntl is not None:
+        try:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            return None
+    return lock
+
+class PredictionJobs:
+    """Bulk crop predictions over uploaded CSV files, run by a pool of worker threads.
+
+    Every job lives in its own directory under root: the uploaded input, the
+    results file and a job.json holding the state. The input is read
+    chunk_size rows at a time and each chunk's results are appended to the
+    output, so memory does not grow with the file. After every chunk
+    job.json records how many input rows are done, the input offset they end
+    at and how many output bytes they produced; resume() truncates the output
+    to that offset and seeks the input to the next row, so a crash loses at
+    most one chunk of work. A job runs while holding a lock on its job.lock,
+    so gunicorn workers resuming the same jobs never run one twice.
+
+    get_bundle(version) returns the ModelBundle to predict with: the version
+    the job started on, or the active one when version is None. It may
+    return None while no model is loaded; workers then wait for one, for
+    up to model_timeout seconds before the job fails.
+    """
+
+    def __init__(self, root, get_bundle, workers=2, chunk_size=10_000, model_wait=1.0, model_timeout=600.0):
+        self.root = root
+        self.get_bundle = get_bundle
+        self.chunk_size = chunk_size
+        self.model_wait = model_wait
+        self.model_timeout = model_timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='prediction-job')
+        self._queued = set()
+        self._lock = threading.Lock()
+
+    def submit(self, stream, output_format='ndjson', top_k=3):
+        """Save an uploaded CSV stream as a new job and queue it; returns the job state."""
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Invalid format. Choose from: {list(OUTPUT_FORMATS)}")
+        if int(top_k) < 1:
+            raise ValueError("top_k must be at least 1")
+
+        job_id = uuid.uuid4().hex
+        job_dir = os.path.join(self.root, job_id)
+        os.makedirs(job_dir)
+        with open(os.path.join(job_dir, INPUT_NAME), 'wb') as f:
+            shutil.copyfileobj(stream, f, 1 << 20)
+
+        state = {
+            'id': job_id,
+            'status': 'queued',
+            'format': output_format,
+            'topK': int(top_k),
+            'chunkSize': self.chunk_size,
+            'totalRows': None,
+            'rowsDone': 0,
+            'inputOffset': 0,
+            'chunksDone': 0,
+            'outputBytes': 0,
+            'errors': 0,
+            'modelVersion': None,
+            'error': None,
+            'createdAt': time.time(),
+            'finishedAt': None
+        }
+        _write_json(os.path.join(job_dir, STATE_NAME), state)
+        self._enqueue(job_id)
+        return state
+
+    def status(self, job_id):
+        """Return the job's state, or None for an unknown job."""
+        job_dir = self._job_dir(job_id)
+        if job_dir is None:
+            return None
+        with open(os.path.join(job_dir, STATE_NAME)) as f:
+            state = json.load(f)
+        if state['totalRows']:
+            state['progress'] = state['rowsDone'] / state['totalRows']
+        return state
+
+    def result_path(self, job_id):
+        """Path of the results file of a job, or None for an unknown job."""
+        state = self.status(job_id)
+        if state is None:
+            return None
+        return os.path.join(self.root, job_id, OUTPUT_FORMATS[state['format']])
+
+    def resume(self):
+        """Re-queue every job that was queued or running when the process stopped."""
+        if not os.path.isdir(self.root):
+            return []
+        resumed = []
+        for job_id in sorted(os.listdir(self.root)):
+            state = self.status(job_id)
+            if state is not None and state['status'] in ('queued', 'running'):
+                self._enqueue(job_id)
+                resumed.append(job_id)
+        if resumed:
+            logger.info(f"Resuming {len(resumed)} prediction jobs")
+        return resumed
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _job_dir(self, job_id):
+        job_dir = os.path.join(self.root, str(job_id))
+        if not re.fullmatch(r'[0-9a-f]{32}', str(job_id)) or not os.path.exists(os.path.join(job_dir, STATE_NAME)):
+            return None
+        return job_dir
+
+    def _enqueue(self, job_id):
+        with self._lock:
+            if job_id in self._queued:
+                return
+            self._queued.add(job_id)
+        self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id):
+        job_dir = os.path.join(self.root, job_id)
+        lock = _lock_job(job_dir)
+        try:
+            state = self.status(job_id) if lock is not None else None
+            # Another process holds the job, or has finished it since it was queued here
+            if state is None or state['status'] not in ('queued', 'running'):
+                return
+            self._execute(job_dir, state)
+        finally:
+            if lock is not None:
+                lock.close()
+            with self._lock:
+                self._queued.discard(job_id)
+
+    def _execute(self, job_dir, state):
+        job_id = state['id']
+        state_file = os.path.join(job_dir, STATE_NAME)
+        try:
+            bundle = self.get_bundle(state['modelVersion'])
+            deadline = time.monotonic() + self.model_timeout
+            while bundle is None:
+                if time.monotonic() >= deadline:
+                    raise RuntimeError(f"No model was loaded within {self.model_timeout:g} seconds")
+                time.sleep(self.model_wait)
+                bundle = self.get_bundle(state['modelVersion'])
+
+            state.pop('progress', None)
+            input_file = os.path.join(job_dir, INPUT_NAME)
+            # As predict_top_k does, so the CSV header has a column pair per crop written
+            state.update(status='running', modelVersion=bundle.version,
+                         topK=min(state['topK'], len(bundle.model.classes_)))
+            if state['totalRows'] is None:
+                state['totalRows'] = _count_rows(input_file)
+            _write_json(state_file, state)
+            self._process(job_dir, state, bundle)
+
+            state.update(status='completed', finishedAt=time.time())
+        except Exception as e:
+            logger.error(f"Prediction job {job_id} failed: {e}")
+            state.update(status='failed', error=str(e), finishedAt=time.time())
+        finally:
+            state.pop('progress', None)
+            _write_json(state_file, state)
+
+    def _process(self, job_dir, state, bundle):
+        import pandas as pd
+
+        output_file = os.path.join(job_dir, OUTPUT_FORMATS[state['format']])
+        with open(output_file, 'ab') as out, open(os.path.join(job_dir, INPUT_NAME), 'rb') as f:
+            # Drop whatever the last, unrecorded chunk wrote before a crash
+            out.truncate(state['outputBytes'])
+            out.seek(state['outputBytes'])
+            if state['format'] == 'csv' and state['outputBytes'] == 0:
+                out.write(self._csv_header(state['topK']))
+
+            # Continue from the first input record not done yet, just after the header on a new job
+            header, header_end = next(_csv_records(f), (b'', 0))
+            f.seek(max(state['inputOffset'], header_end))
+            records = _csv_records(f)
+
+            while True:
+                batch = list(islice(records, state['chunkSize']))
+                if not batch:
+                    break
+                chunk = pd.read_csv(io.BytesIO(header + b''.join(record for record, _ in batch)), dtype=str)
+
+                # Same per-row validation as the batch endpoint
+                X, row_errors = samples_to_array(chunk.reset_index(drop=True))
+                valid_rows = np.setdiff1d(np.arange(len(X)), list(row_errors))
+                predictions = predict_top_k(bundle.model, bundle.scaler, X[valid_rows], state['topK']) \
+                    if len(valid_rows) else []
+
+                results = dict(zip(valid_rows.tolist(), predictions))
+                out.write(self._encode(state, len(X), results, row_errors))
+                out.flush()
+                os.fsync(out.fileno())
+
+                state['rowsDone'] += len(X)
+                state['inputOffset'] = batch[-1][1]
+                state['chunksDone'] += 1
+                state['errors'] += len(row_errors)
+                state['outputBytes'] = out.tell()
+                _write_json(os.path.join(job_dir, STATE_NAME), state)
+
+    @staticmethod
+    def _csv_header(top_k):
+        columns = ['index']
+        for rank in range(1, top_k + 1):
+            columns += [f'crop_{rank}', f'confidence_{rank}']
+        return (','.join(columns + ['error']) + '\n').encode('utf-8')
+
+    @staticmethod
+    def _encode(state, n_rows, results, row_errors):
+        """Serialize one chunk of results, in input order."""
+        offset = state['rowsDone']
+        if state['format'] == 'ndjson':
+            lines = []
+            for row in range(n_rows):
+                if row in row_errors:
+                    record = {'index': offset + row, 'error': row_errors[row]}
+                else:
+                    record = {'index': offset + row, 'recommendations': results[row]}
+                lines.append(json.dumps(record))
+            return ('\n'.join(lines) + '\n').encode('utf-8') if lines else b''
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        width = 2 * state['topK']
+        for row in range(n_rows):
+            if row in row_errors:
+                writer.writerow([offset + row] + [''] * width + [row_errors[row]])
+            else:
+                cells = []
+                for crop in results[row]:
+                    cells += [crop['name'], f"{crop['confidence']:.6g}"]
+                writer.writerow([offset + row] + cells + [''] * (width - len(cells)) + [''])
+        return buffer.getvalue().encode('utf-8')
@@ -0,0 +1,70 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Modules the fork server imports once, so every process it starts has them loaded
+PRELOAD = ['path_planner']
+
+_pools = {}
+_lock = threading.Lock()
+
+def _context():
+    # Windows and some macOS builds have no fork server
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(PRELOAD)
+        return context
+    return multiprocessing.get_context('spawn')
+
+def shared_pool(workers):
+    """The long-lived process pool of workers processes, shared by every request asking for that many.
+
+    The processes come from a fork server (spawn where there is none), not
+    from forking this process, whose other threads (prediction batcher,
+    model warmup, Flask) may hold locks at the time; and they are started
+    once rather than per request. Each gunicorn worker gets its own pools,
+    and a pool submit() finds broken by a dead process is replaced. As
+    with any spawned process, they import the __main__ script as
+    __mp_main__, so a script starting pools keeps its own work under
+    if __name__ == '__main__'.
+    """
+    with _lock:
+        if any(pid != os.getpid() for pid, _ in _pools):
+            _pools.clear()
+        key = (os.getpid(), workers)
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ProcessPoolExecutor(max_workers=workers, mp_context=_context())
+        return pool
+
+def _discard(pool):
+    """Forget a broken pool, so the next shared_pool() call starts a new one."""
+    with _lock:
+        for key, value in list(_pools.items()):
+            if value is pool:
+                del _pools[key]
+    pool.shutdown(wait=False)
+
+def submit(workers, fn, *args):
+    """Run fn(*args) on the shared pool of workers processes; returns its future.
+
+    A pool that turns out to be broken, when submitting or when a task
+    fails with BrokenProcessPool, is discarded; submitting retries once on
+    a new pool.
+    """
+    pool = shared_pool(workers)
+    try:
+        future = pool.submit(fn, *args)
+    except BrokenProcessPool:
+        _discard(pool)
+        pool = shared_pool(workers)
+        future = pool.submit(fn, *args)
+
+    def check(done):
+        if not done.cancelled() and isinstance(done.exception(), BrokenProcessPool):
+            _discard(pool)
+
+    future.add_done_callback(check)
+    return future
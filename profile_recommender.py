@@ -0,0 +1,117 @@
+import logging
+import threading
+import time
+import numpy as np
+from crop_predictor import FEATURE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+class ProfileIndex:
+    """KD-tree over crop optimal profiles, normalized so every feature counts alike.
+
+    Each feature is divided by its standard deviation across the profiles, so
+    a distance of 1 means "one typical between-crop spread away" whatever the
+    unit (kg/ha of N, pH, mm of rain).
+    """
+
+    def __init__(self, names, profiles):
+        from scipy.spatial import cKDTree
+
+        self.names = np.asarray(names, dtype=object)
+        self.profiles = np.asarray(profiles, dtype=np.float64).reshape(-1, len(FEATURE_COLUMNS))
+        scale = self.profiles.std(axis=0) if len(self.profiles) > 1 else np.ones(len(FEATURE_COLUMNS))
+        self.scale = np.where(scale > 0, scale, 1.0)
+        self.tree = cKDTree(self.profiles / self.scale)
+
+    def __len__(self):
+        return len(self.names)
+
+    def query(self, X, k=3):
+        """Return the k nearest crops to every row of X, closest first.
+
+        Each crop comes with its normalized distance, a confidence of
+        1 / (1 + distance) and the per-feature gaps (sample minus optimum,
+        in raw units) that explain the distance.
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        k = max(1, min(int(k), len(self)))
+        distances, indices = self.tree.query(X / self.scale, k=k)
+        distances = distances.reshape(len(X), k)
+        indices = indices.reshape(len(X), k)
+        gaps = X[:, np.newaxis, :] - self.profiles[indices]
+
+        return [
+            [
+                {
+                    'name': str(self.names[index]),
+                    'confidence': float(1.0 / (1.0 + distance)),
+                    'distance': float(distance),
+                    'gaps': dict(zip(FEATURE_COLUMNS, np.round(gap, 4).tolist()))
+                }
+                for index, distance, gap in zip(row_indices, row_distances, row_gaps)
+            ]
+            for row_indices, row_distances, row_gaps in zip(indices, distances, gaps)
+        ]
+
+class ProfileRecommender:
+    """Nearest-profile crop recommender that rebuilds its index only when the table changes.
+
+    load_profiles() returns (names, profiles) from the crop table. invalidate()
+    forces a rebuild on the next query (the app calls it from SQLAlchemy write
+    events); signature(), if given, returns a cheap fingerprint of the table
+    that is compared at most every check_interval seconds, so edits made by
+    other processes are picked up too.
+    """
+
+    def __init__(self, load_profiles, signature=None, check_interval=5.0):
+        self.load_profiles = load_profiles
+        self.signature = signature
+        self.check_interval = check_interval
+        self._index = None
+        self._signature = None
+        self._stale = True
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+
+    def invalidate(self):
+        """Mark the index stale; it is rebuilt on the next query."""
+        self._stale = True
+
+    def index(self):
+        """Return the current ProfileIndex, or None if no crop has a full profile."""
+        if not self._stale and self.signature is not None and self.check_interval is not None \
+                and time.monotonic() - self._last_check >= self.check_interval:
+            self._last_check = time.monotonic()
+            try:
+                if self.signature() != self._signature:
+                    self._stale = True
+            except Exception as e:
+                logger.error(f"Error checking crop profiles: {e}")
+        if self._stale:
+            with self._lock:
+                if self._stale:
+                    self._rebuild()
+        return self._index
+
+    def recommend(self, X, k=3):
+        """Return the k nearest crops for every row of X, or None without profiles."""
+        index = self.index()
+        if index is None:
+            return None
+        return index.query(X, k)
+
+    def stats(self):
+        index = self._index
+        return {'profiles': len(index) if index is not None else 0, 'rebuilds': self.rebuilds}
+
+    def _rebuild(self):
+        # Clear the flag first so an invalidate() during the load is not lost
+        self._stale = False
+        self._last_check = time.monotonic()
+        signature = self.signature() if self.signature is not None else None
+        names, profiles = self.load_profiles()
+        self._index = ProfileIndex(names, profiles) if len(names) else None
+        self._signature = signature
+        self.rebuilds += 1
+        logger.info(f"Built crop profile index over {len(names)} crops")
@@ -0,0 +1,126 @@
+import numpy as np
+
+# Average sprayer speed, in meters per minute
+AVERAGE_SPEED = 10.0
+
+class SprayPath:
+    """A spraying path stored as contiguous columns: x, y, spraying rate and distance so far.
+
+    distance[i] is the length of the path from its first point to point i.
+    Indexing with an integer and iterating still give the legacy point dicts
+    ({'x', 'y', 'spraying_rate'}) so existing callers keep working, but the
+    statistics are computed on the columns; to_dicts() builds the full list
+    only where it is serialized.
+    """
+
+    def __init__(self, x, y, rate=1.0):
+        self.x = np.ascontiguousarray(x, dtype=np.float64).ravel()
+        self.y = np.ascontiguousarray(y, dtype=np.float64).ravel()
+        if len(self.x) != len(self.y):
+            raise ValueError("x and y must have the same length")
+        self.rate = np.ascontiguousarray(np.broadcast_to(np.asarray(rate, dtype=np.float64), self.x.shape))
+        self.distance = np.zeros(len(self.x))
+        if len(self.x) > 1:
+            np.cumsum(np.hypot(np.diff(self.x), np.diff(self.y)), out=self.distance[1:])
+
+    @classmethod
+    def from_points(cls, points, rate=1.0):
+        """Build a path from a SprayPath, point dicts or (x, y) pairs."""
+        if isinstance(points, cls):
+            return points
+        points = list(points)
+        if points and isinstance(points[0], dict):
+            return cls([p['x'] for p in points], [p['y'] for p in points],
+                       [p.get('spraying_rate', rate) for p in points])
+        xy = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return cls(xy[:, 0], xy[:, 1], rate)
+
+    @classmethod
+    def concatenate(cls, paths):
+        """Join paths end to end."""
+        paths = list(paths)
+        if not paths:
+            return cls([], [])
+        return cls(np.concatenate([path.x for path in paths]), np.concatenate([path.y for path in paths]),
+                   np.concatenate([path.rate for path in paths]))
+
+    def __len__(self):
+        return len(self.x)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return SprayPath(self.x[index], self.y[index], self.rate[index])
+        return {'x': float(self.x[index]), 'y': float(self.y[index]), 'spraying_rate': float(self.rate[index])}
+
+    def __iter__(self):
+        return iter(self.to_dicts())
+
+    @property
+    def xy(self):
+        """Points as an (n, 2) array."""
+        return np.column_stack([self.x, self.y])
+
+    @property
+    def total_distance(self):
+        return float(self.distance[-1]) if len(self) else 0.0
+
+    def estimated_time(self, speed=AVERAGE_SPEED):
+        """Minutes to fly the path, each segment weighted by the spraying rate at its start."""
+        if len(self) < 2:
+            return 0.0
+        return float(np.dot(np.diff(self.distance), self.rate[:-1]) / speed)
+
+    def bounds(self):
+        """Return (x_min, y_min, x_max, y_max) of the points."""
+        return (float(self.x.min()), float(self.y.min()), float(self.x.max()), float(self.y.max()))
+
+    def to_dicts(self):
+        """The legacy list of {'x', 'y', 'spraying_rate'} dicts, for JSON responses."""
+        return [{'x': x, 'y': y, 'spraying_rate': rate}
+                for x, y, rate in zip(self.x.tolist(), self.y.tolist(), self.rate.tolist())]
+
+class PathTotals:
+    """Distance, time, point count and bounds of a path that arrives in chunks.
+
+    The totals match those of the SprayPath the chunks concatenate to, with
+    the gap between one chunk's last point and the next one's first counted
+    as a segment.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total_distance = 0.0
+        self._rate_distance = 0.0
+        self._last = None
+        self._low = np.full(2, np.inf)
+        self._high = np.full(2, -np.inf)
+
+    def add(self, chunk):
+        """Count the next chunk; returns the distance along the whole path of each of its points."""
+        if not len(chunk):
+            return chunk.distance
+        offset = self.total_distance
+        if self._last is not None:
+            x, y, rate = self._last
+            gap = float(np.hypot(chunk.x[0] - x, chunk.y[0] - y))
+            offset += gap
+            self._rate_distance += gap * rate
+        self._rate_distance += float(np.dot(np.diff(chunk.distance), chunk.rate[:-1]))
+        distance = offset + chunk.distance
+        self.total_distance = float(distance[-1])
+        self.count += len(chunk)
+        self._last = (chunk.x[-1], chunk.y[-1], chunk.rate[-1])
+        np.minimum(self._low, [chunk.x.min(), chunk.y.min()], out=self._low)
+        np.maximum(self._high, [chunk.x.max(), chunk.y.max()], out=self._high)
+        return distance
+
+    def __len__(self):
+        return self.count
+
+    def estimated_time(self, speed=AVERAGE_SPEED):
+        """Minutes to fly the path so far, as SprayPath.estimated_time."""
+        return self._rate_distance / speed
+
+    def bounds(self):
+        """Return (x_min, y_min, x_max, y_max) of the points so far."""
+        return (*self._low.tolist(), *self._high.tolist())
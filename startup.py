@@ -0,0 +1,68 @@
+import threading
+import time
+from contextlib import contextmanager
+
+class StartupReport:
+    """Record how long each startup phase took, for logs and the readiness probe.
+
+    mark(name) closes a synchronous phase that ran since the previous mark;
+    phase(name) times a block, which may run on a background thread.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._last_mark = self._start
+        self._phases = []
+        self._lock = threading.Lock()
+        self.ready_after = None
+        self.state = 'starting'
+        self.error = None
+
+    def mark(self, name):
+        """Record the time since the previous mark as phase name."""
+        now = time.perf_counter()
+        self._record(name, self._last_mark, now, threading.current_thread().name)
+        self._last_mark = now
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as phase name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, start, time.perf_counter(), threading.current_thread().name)
+
+    def set_state(self, state, error=None):
+        """Update the overall state (starting, loading, ready or failed)."""
+        self.state = state
+        self.error = error
+        if state == 'ready' and self.ready_after is None:
+            self.ready_after = time.perf_counter() - self._start
+
+    def as_dict(self):
+        with self._lock:
+            phases = list(self._phases)
+        return {
+            'state': self.state,
+            'error': self.error,
+            'startedAt': self.started_at,
+            'readyAfterSeconds': self.ready_after,
+            'uptimeSeconds': time.perf_counter() - self._start,
+            'phases': phases
+        }
+
+    def summary(self):
+        """One log line with every phase duration."""
+        with self._lock:
+            return ', '.join(f"{p['name']}={p['seconds'] * 1000:.0f}ms" for p in self._phases)
+
+    def _record(self, name, start, end, thread_name):
+        with self._lock:
+            self._phases.append({
+                'name': name,
+                'seconds': end - start,
+                'offsetSeconds': start - self._start,
+                'thread': thread_name
+            })
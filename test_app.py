@@ -0,0 +1,128 @@
+import json
+import os
+import struct
+import numpy as np
+import pytest
+
+FIELD = {
+    'fieldWidth': 30,
+    'fieldHeight': 20,
+    'coverageRadius': 2,
+    'startX': 1,
+    'startY': 1,
+    'pattern': 'zigzag'
+}
+
+@pytest.fixture(scope='module')
+def app(tmp_path_factory):
+    # The app keeps its model, data and job files under the working directory;
+    # there it trains a model on generated data, which the fixture waits for
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('app'))
+    try:
+        import app
+        app.model_warmup_thread.join()
+        yield app
+    finally:
+        os.chdir(cwd)
+
+@pytest.fixture
+def client(app):
+    return app.app.test_client()
+
+def test_readiness_follows_the_model(app, client, monkeypatch):
+    response = client.get('/readyz')
+    assert response.status_code == 200
+    assert response.get_json()['ready'] is True
+    assert response.get_json()['modelVersion'] == app.model_registry.active_version()
+
+    # Before the warmup has loaded a model, or after it failed, the app is live but not ready
+    monkeypatch.setattr(app.model_registry, 'active', lambda: None)
+    response = client.get('/readyz')
+    assert response.status_code == 503
+    assert response.get_json() == {'ready': False, 'state': app.startup_report.state, 'modelVersion': None}
+    assert client.get('/healthz').status_code == 200
+
+    monkeypatch.undo()
+    assert client.get('/readyz').status_code == 200
+
+def test_matching_if_none_match_gets_304(client):
+    first = client.post('/path-plan', json=dict(FIELD, coverageRadius=3))
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    repeat = client.post('/path-plan', json=dict(FIELD, coverageRadius=3), headers={'If-None-Match': etag})
+    assert repeat.status_code == 304
+    assert repeat.data == b''
+    assert repeat.headers['ETag'] == etag
+    assert repeat.headers['X-Cache'] == 'hit'
+
+    # Another plan does not match the first one's tag
+    other = client.post('/path-plan', json=dict(FIELD, coverageRadius=4), headers={'If-None-Match': etag})
+    assert other.status_code == 200
+    assert other.headers['ETag'] != etag
+
+def test_ndjson_stream_ends_with_the_statistics(client):
+    response = client.post('/path-plan?stream=1', json=FIELD)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+
+    lines = [json.loads(line) for line in response.data.splitlines()]
+    assert len(lines) >= 2
+    assert all(set(line) == {'path'} and line['path'] for line in lines[:-1])
+    statistics = lines[-1]['statistics']
+    assert statistics['numberOfPoints'] == sum(len(line['path']) for line in lines[:-1])
+    assert statistics['pattern'] == 'zigzag'
+
+def test_float32_stream_ends_with_an_empty_frame_and_the_statistics(client):
+    response = client.post('/path-plan?stream=1&format=float32', json=FIELD)
+    assert response.status_code == 200
+    assert response.mimetype == 'application/octet-stream'
+
+    body, offset, points = response.data, 0, 0
+    while True:
+        rows, = struct.unpack_from('<I', body, offset)
+        offset += 4
+        if rows == 0:
+            break
+        frame = np.frombuffer(body, dtype='<f4', count=3 * rows, offset=offset).reshape(rows, 3)
+        assert np.all((frame[:, 0] >= 0) & (frame[:, 0] <= FIELD['fieldWidth']))
+        points += rows
+        offset += frame.nbytes
+    length, = struct.unpack_from('<I', body, offset)
+    statistics = json.loads(body[offset + 4:])
+    assert offset + 4 + length == len(body)
+    assert points > 0
+    assert statistics['numberOfPoints'] == points
+
+def test_batch_reports_each_field_with_its_own_status(app, client, monkeypatch):
+    import batch_planner
+    # Plan in this process, where a failing planner can be patched in
+    monkeypatch.setattr(app, 'BATCH_PLAN_WORKERS', 1)
+    plan_body = batch_planner.plan_body
+
+    def failing_plan_body(planner, data):
+        if data.get('id') == 'broken':
+            raise RuntimeError('planner crashed')
+        return plan_body(planner, data)
+
+    monkeypatch.setattr(batch_planner, 'plan_body', failing_plan_body)
+    fields = [
+        dict(FIELD, id='good'),
+        dict(FIELD, id='negative', fieldWidth=-1),
+        dict(FIELD, id='geometry', obstacles=[{'x': 1}]),
+        dict(FIELD, id='broken', startX=3)
+    ]
+    response = client.post('/path-plan/batch', json={'fields': fields})
+    assert response.status_code == 200
+
+    body = response.get_json()
+    assert [(result['id'], result['status']) for result in body['results']] == \
+        [('good', 200), ('negative', 400), ('geometry', 400), ('broken', 500)]
+    assert body['results'][0]['result']['statistics']['numberOfPoints'] > 0
+    assert body['results'][1]['error'] == 'Field dimensions and coverage radius must be positive'
+    assert body['results'][2]['error'].startswith('Invalid field geometry')
+    assert body['results'][3]['error'] == 'planner crashed'
+    assert body['summary']['fields'] == 4
+    assert body['summary']['succeeded'] == 1
+    assert body['summary']['failed'] == 3
@@ -0,0 +1,47 @@
+import json
+from batch_planner import group_by_field, plan_batch, batch_record
+
+FIELD = {'fieldWidth': 60, 'fieldHeight': 40, 'coverageRadius': 4, 'startX': 2, 'startY': 2, 'pattern': 'zigzag',
+         'obstacles': [{'x': 30, 'y': 20, 'radius': 5}]}
+
+def test_requests_are_grouped_by_field_geometry():
+    items = [(0, FIELD), (1, dict(FIELD, pattern='spiral')), (2, dict(FIELD, fieldWidth=80)), (3, dict(FIELD, startX=3))]
+    groups = group_by_field(items, group_size=2)
+    assert sorted(len(group) for group in groups) == [1, 1, 2]
+    assert sorted(index for group in groups for index, _ in group) == [0, 1, 2, 3]
+
+def test_batch_reports_each_field_on_its_own():
+    items = [(0, FIELD), (1, dict(FIELD, pattern='custom', startX=5, startY=5)), (2, dict(FIELD, startX=30, startY=20)),
+             (3, dict(FIELD, obstacles=[{'x': 1, 'y': 1, 'radius': -1}])), (4, dict(FIELD, numDrones=2))]
+    for workers in (1, 2):
+        results = {index: (status, result) for index, status, result in plan_batch(items, workers=workers)}
+        assert sorted(results) == [0, 1, 2, 3, 4]
+        assert [results[index][0] for index in range(5)] == [200, 200, 500, 400, 200]
+        assert json.loads(results[0][1])['statistics']['pattern'] == 'zigzag'
+        assert len(json.loads(results[4][1])['drones']) == 2
+        assert 'radius' in results[3][1]
+
+    record = json.loads(batch_record(7, {'id': 'north'}, 200, results[0][1]))
+    assert (record['index'], record['id'], record['status']) == (7, 'north', 200)
+    assert record['result'] == json.loads(results[0][1])
+    assert json.loads(batch_record(8, 5, 400, 'Missing required fields')) == \
+        {'index': 8, 'id': None, 'status': 400, 'error': 'Missing required fields'}
+
+def test_a_group_lost_with_its_worker_fails_only_its_fields(monkeypatch):
+    from concurrent.futures import Future
+    from concurrent.futures.process import BrokenProcessPool
+    import batch_planner
+
+    def submit(workers, fn, group):
+        future = Future()
+        if any(index == 1 for index, _ in group):
+            future.set_exception(BrokenProcessPool('worker died'))
+        else:
+            future.set_result(fn(group))
+        return future
+
+    monkeypatch.setattr(batch_planner, 'submit', submit)
+    items = [(0, FIELD), (1, dict(FIELD, fieldWidth=80)), (2, dict(FIELD, fieldWidth=80, startX=3))]
+    results = {index: (status, result) for index, status, result in plan_batch(items, workers=2)}
+    assert [results[index][0] for index in range(3)] == [200, 500, 500]
+    assert 'worker died' in results[1][1]
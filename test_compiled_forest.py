@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+from compiled_forest import CompiledForest
+from crop_predictor import FEATURE_COLUMNS
+
+def _fit(n_rows=600, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(50, 20, size=(n_rows, len(FEATURE_COLUMNS))).round(1), columns=FEATURE_COLUMNS)
+    y = np.array(['rice', 'maize', 'cotton'])[(X['N'] + X['P'] - X['K'] + rng.normal(0, 10, n_rows) > 50).astype(int) + (X['ph'] > 60)]
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=25, random_state=42).fit(scaler.transform(X), y)
+    return X, model, scaler
+
+def test_compiled_forest_matches_sklearn_exactly():
+    X, model, scaler = _fit()
+    compiled = CompiledForest.from_sklearn(model, scaler)
+
+    # Training rows lie right next to split thresholds; add unseen queries too
+    rng = np.random.default_rng(1)
+    queries = np.vstack([X.to_numpy(), rng.normal(50, 20, size=(2000, len(FEATURE_COLUMNS)))])
+    scaled = scaler.transform(pd.DataFrame(queries, columns=FEATURE_COLUMNS))
+
+    assert np.array_equal(compiled.predict_proba(queries), model.predict_proba(scaled))
+    assert np.array_equal(compiled.predict(queries), model.predict(scaled))
+    # Single rows take the small-batch accumulation path
+    assert np.array_equal(compiled.predict_proba(queries[:1]), model.predict_proba(scaled[:1]))
+
+def test_save_and_load_round_trip(tmp_path):
+    X, model, scaler = _fit(n_rows=200)
+    compiled = CompiledForest.from_sklearn(model, scaler)
+    file_path = str(tmp_path / 'crop_model_compiled.joblib')
+    compiled.save(file_path)
+
+    loaded = CompiledForest.load(file_path, mmap_mode='r')
+    assert np.array_equal(loaded.predict(X.to_numpy()), compiled.predict(X.to_numpy()))
+
+def test_prune_keeps_chosen_trees_and_cuts_depth():
+    X, model, scaler = _fit(n_rows=300)
+    compiled = CompiledForest.from_sklearn(model, scaler)
+    queries = X.to_numpy()
+
+    # Pruning nothing reproduces the forest exactly
+    assert np.array_equal(compiled.prune().predict_proba(queries), compiled.predict_proba(queries))
+
+    subset = compiled.prune(trees=[3, 7])
+    expected = (model.estimators_[3].predict_proba(scaler.transform(X)) +
+                model.estimators_[7].predict_proba(scaler.transform(X))) / 2
+    assert subset.n_trees == 2
+    assert np.allclose(subset.predict_proba(queries), expected)
+
+    shallow = compiled.prune(max_depth=2)
+    assert shallow.max_depth == 2
+    assert len(shallow.left) <= compiled.n_trees * 7
+    assert np.allclose(shallow.predict_proba(queries).sum(axis=1), 1.0)
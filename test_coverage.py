@@ -0,0 +1,53 @@
+import numpy as np
+from coverage import coverage_report
+from path_planner import PathPlanner
+
+def loop_coverage_area(x, y, radius):
+    """The per-sample, per-point loop coverage_report replaces."""
+    resolution = radius / 2
+    covered = 0
+    for gx in np.arange(x.min() - radius, x.max() + radius + resolution, resolution):
+        for gy in np.arange(y.min() - radius, y.max() + radius + resolution, resolution):
+            if ((gx - x)**2 + (gy - y)**2 <= radius * radius).any():
+                covered += 1
+    return covered * resolution * resolution
+
+def test_covered_area_matches_the_loop():
+    # Steps no longer than the resolution add nothing to their endpoints' discs
+    x, y = np.cumsum(np.random.default_rng(0).uniform(-1.4, 1.4, size=(2, 300)), axis=1)
+    assert coverage_report(x, y, 4)['coveredArea'] == loop_coverage_area(x, y, 4)
+
+    # Longer segments are sprayed along their length
+    planner = PathPlanner(field_size=(60, 40))
+    planner.add_obstacle(30, 20, 5)
+    for pattern in ('zigzag', 'spiral', 'custom'):
+        path = planner.optimize_spraying_pattern((5, 5), 4, pattern, smooth_path=False)
+        assert coverage_report(path.x, path.y, 4)['coveredArea'] > loop_coverage_area(path.x, path.y, 4)
+
+def test_segments_are_covered_between_their_endpoints():
+    planner = PathPlanner(field_size=(200, 100))
+    endpoints = planner.optimize_spraying_pattern((2, 2), 5, 'zigzag', smooth_path=False)
+    dense = planner.optimize_spraying_pattern((2, 2), 5, 'zigzag', smooth_path=False, resample_spacing=2.5)
+    assert len(endpoints) < len(dense) / 10
+    reports = [coverage_report(path.x, path.y, 5, field_mask=planner.valid_mask,
+                               field_bounds=planner.field_bounds()) for path in (endpoints, dense)]
+    assert reports[0] == reports[1]
+    assert reports[0]['coveragePercent'] > 95
+
+    # Separate paths are not joined: nothing is sprayed between two far apart points
+    report = coverage_report([0, 0, 100, 100], [0, 10, 0, 10], 2, resolution=1, breaks=[2])
+    assert report['coveredArea'] == 2 * coverage_report([0, 0], [0, 10], 2, resolution=1)['coveredArea']
+
+def test_report_counts_overlap_and_missed_field():
+    # Two passes 4 apart with radius 3 overlap in a band, and miss the top of the field
+    x = np.concatenate([np.arange(0, 21.0), np.arange(20, -1.0, -1)])
+    y = np.concatenate([np.full(21, 3.0), np.full(21, 7.0)])
+    report = coverage_report(x, y, 3, resolution=0.5,
+                             field_mask=lambda gx, gy: (gx >= 0) & (gx <= 20) & (gy >= 0) & (gy <= 20),
+                             field_bounds=(0, 0, 20, 20))
+    assert report['fieldArea'] == 41 * 41 * 0.25
+    assert 0 < report['overlapArea'] < report['coveredArea']
+    # Rows y = 0 to y = 10 are reached along both passes
+    covered_cells = 41 * 21
+    assert report['missedArea'] == report['fieldArea'] - covered_cells * 0.25
+    assert report['coveragePercent'] == 100 * covered_cells / (41 * 41)
@@ -0,0 +1,52 @@
+import json
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+from crop_predictor import FEATURE_COLUMNS, parse_samples, samples_to_array, predict_top_k
+
+CSV_BODY = (
+    "N,P,K,temperature,humidity,ph,rainfall\n"
+    "90,42,43,20.8,82.0,6.5,202.9\n"
+    "85,abc,41,21.7,80.0,6.7,226.7\n"
+    "60,55,,23.0,75.0,6.8,242.9\n"
+)
+
+def _fit_model():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.uniform(0, 100, size=(60, len(FEATURE_COLUMNS))), columns=FEATURE_COLUMNS)
+    y = np.where(X['N'] > 50, 'rice', 'maize')
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=10, random_state=42).fit(scaler.transform(X), y)
+    return model, scaler
+
+def test_parse_and_validate_csv():
+    samples = parse_samples(CSV_BODY.encode(), 'text/csv')
+    X, row_errors = samples_to_array(samples)
+
+    assert X.shape == (3, len(FEATURE_COLUMNS))
+    assert row_errors == {
+        1: 'Invalid value for P. Must be a number.',
+        2: 'Missing required field: K',
+    }
+
+def test_parse_ndjson_and_json_agree():
+    rows = [dict(zip(FEATURE_COLUMNS, [90, 42, 43, 20.8, 82.0, 6.5, 202.9]))]
+    ndjson = "\n".join(json.dumps(row) for row in rows)
+
+    X_json, _ = samples_to_array(parse_samples(json.dumps({'samples': rows}), 'application/json'))
+    X_ndjson, _ = samples_to_array(parse_samples(ndjson, 'application/x-ndjson'))
+
+    assert np.array_equal(X_json, X_ndjson)
+
+def test_predict_top_k_matches_model():
+    model, scaler = _fit_model()
+    X = np.array([[90, 42, 43, 20.8, 82.0, 6.5, 202.9], [10, 42, 43, 20.8, 82.0, 6.5, 202.9]])
+
+    results = predict_top_k(model, scaler, X, top_k=5)
+    expected = model.predict(scaler.transform(pd.DataFrame(X, columns=FEATURE_COLUMNS)))
+
+    # top_k is capped at the number of classes and the first entry is the model's prediction
+    assert [len(crops) for crops in results] == [2, 2]
+    assert [crops[0]['name'] for crops in results] == list(expected)
+    assert all(abs(sum(c['confidence'] for c in crops) - 1.0) < 1e-9 for crops in results)
@@ -0,0 +1,47 @@
+import os
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from dataset import FEATURE_COLUMNS, load_dataset
+
+def _write_csv(path, n_rows=200, seed=0):
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame(rng.uniform(0, 100, size=(n_rows, len(FEATURE_COLUMNS))).round(2), columns=FEATURE_COLUMNS)
+    data['label'] = rng.choice(['rice', 'maize', 'chickpea'], n_rows)
+    data.to_csv(path, index=False)
+    return data
+
+def test_conversion_round_trips_and_is_reused(tmp_path):
+    csv_path = str(tmp_path / 'crop_data.csv')
+    data = _write_csv(csv_path)
+    cache_dir = str(tmp_path / 'cache')
+
+    # Small chunks make later chunks see label categories in a different order
+    dataset = load_dataset(csv_path, cache_dir=cache_dir, chunksize=7)
+    assert isinstance(dataset.X, np.memmap)
+    assert dataset.X.dtype == np.float32
+    assert np.array_equal(dataset.X, data[FEATURE_COLUMNS].to_numpy(np.float32))
+    assert list(dataset.y) == list(data['label'])
+
+    meta = os.path.join(cache_dir, dataset.source_hash, 'meta.json')
+    mtime = os.path.getmtime(meta)
+    assert load_dataset(csv_path, cache_dir=cache_dir).source_hash == dataset.source_hash
+    assert os.path.getmtime(meta) == mtime
+
+    # Editing the CSV changes its hash, so a stale conversion is never used
+    _write_csv(csv_path, seed=1)
+    assert load_dataset(csv_path, cache_dir=cache_dir).source_hash != dataset.source_hash
+
+def test_split_matches_train_test_split(tmp_path):
+    csv_path = str(tmp_path / 'crop_data.csv')
+    data = _write_csv(csv_path)
+
+    X_train, X_test, y_train, y_test, scaler = load_dataset(csv_path).train_test_scaled()
+    _, _, expected_train, expected_test = train_test_split(
+        data[FEATURE_COLUMNS], data['label'], test_size=0.2, random_state=42)
+
+    assert list(y_train) == list(expected_train)
+    assert list(y_test) == list(expected_test)
+    assert np.allclose(scaler.mean_, data.loc[expected_train.index, FEATURE_COLUMNS].mean().to_numpy(), rtol=1e-5)
+    # Without a cache_dir the conversion lands next to the CSV
+    assert os.path.isdir(str(tmp_path / '.cache'))
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from field_geometry import points_in_ring, ring_crossings, pair_crossings, scanline_segments, resample_segment
+from path_planner import PathPlanner
+
+SQUARE = np.array([(0, 0), (10, 0), (10, 10), (0, 10)], dtype=float)
+
+def test_points_in_ring():
+    inside = points_in_ring([5, 11, 0.5, 5], [5, 5, 9.5, -1], SQUARE)
+    assert inside.tolist() == [True, False, True, False]
+
+def test_scanlines_clip_holes_polygons_and_circles():
+    ys = np.array([2.0, 5.0, 8.0])
+    hole = np.array([(4, 4), (6, 4), (6, 6), (4, 6)], dtype=float)
+    rows, xs = zip(ring_crossings(SQUARE, ys), ring_crossings(hole, ys))
+    inside = pair_crossings(np.concatenate(rows), np.concatenate(xs))
+
+    triangle = np.array([(1, 7), (3, 7), (2, 9)], dtype=float)
+    circles = np.array([[8.0, 2.0, 1.0]])
+    segments = scanline_segments(ys, inside, [triangle], circles)
+
+    assert segments[0] == [(0.0, 7.0), (9.0, 10.0)]
+    assert segments[1] == [(0.0, 4.0), (6.0, 10.0)]
+    assert np.allclose(segments[2], [(0.0, 1.5), (2.5, 10.0)])
+
+def test_resample_segment_keeps_both_ends():
+    assert resample_segment(0.0, 10.0, 3.0).tolist() == [0.0, 2.5, 5.0, 7.5, 10.0]
+    assert resample_segment(10.0, 0.0, 20.0).tolist() == [10.0, 0.0]
+    for spacing in (0, -1.0):
+        with pytest.raises(ValueError):
+            resample_segment(0.0, 10.0, spacing)
+
+def test_patterns_reject_spacings_that_are_not_positive_or_too_fine():
+    planner = PathPlanner(field_size=(100, 60))
+    for spacing in (0, -1, 1e-6, float('nan'), float('inf'), '2'):
+        for pattern, mode in (('zigzag', 'archimedean'), ('spiral', 'archimedean'), ('spiral', 'rectangular')):
+            with pytest.raises(ValueError):
+                planner.optimize_spraying_pattern((2, 2), 5, pattern, resample_spacing=spacing, spiral_mode=mode)
+    with pytest.raises(ValueError):
+        next(planner._spiral_chunks((2, 2), 5, -1.0, 'rectangular'))
+
+def test_polygon_zigzag_returns_alternating_segment_endpoints():
+    planner = PathPlanner(field_size=(120, 100))
+    planner.set_boundary([(0, 0), (100, 0), (120, 80), (10, 100)], holes=[[(40, 40), (60, 40), (60, 60), (40, 60)]])
+    planner.add_polygon_obstacle([(70, 10), (90, 10), (80, 30)])
+    planner.add_obstacle(20, 70, 5)
+
+    path = planner.optimize_spraying_pattern((20, 20), 5, 'zigzag', smooth_path=False)
+    xy = np.array([(point['x'], point['y']) for point in path])
+    starts, ends = xy[0::2], xy[1::2]
+
+    # Every sprayed segment is horizontal and lies in free space
+    assert np.array_equal(starts[:, 1], ends[:, 1])
+    middles = (starts + ends) / 2
+    assert planner.valid_mask(middles[:, 0], middles[:, 1]).all()
+    # Consecutive sweep lines run in opposite directions
+    first_per_row = {y: np.sign(end - start) for (start, y), (end, _) in zip(starts, ends)}
+    directions = [first_per_row[y] for y in sorted(first_per_row)]
+    assert all(a != b for a, b in zip(directions, directions[1:]))
+
+    resampled = planner.optimize_spraying_pattern((20, 20), 5, 'zigzag', smooth_path=False, resample_spacing=1.0)
+    assert len(resampled) > 10 * len(path)
+    # Resampling keeps every segment endpoint and only adds points between them
+    resampled_xy = {(point['x'], point['y']) for point in resampled}
+    assert {(point['x'], point['y']) for point in path} <= resampled_xy
+
+def test_spiral_points_are_evenly_spaced_and_valid():
+    planner = PathPlanner(field_size=(100, 60))
+    planner.add_obstacle(70, 30, 6)
+    for mode in ('archimedean', 'rectangular'):
+        path = planner._spiral_pattern((50, 30), 5, mode=mode).xy
+        assert planner.valid_mask(path[:, 0], path[:, 1]).all()
+        steps = np.hypot(*np.diff(path, axis=0).T)
+        assert 2.25 <= np.median(steps) <= 2.5 + 1e-9
+
+    # The rectangular spiral starts in the corner closest to the start point
+    path = planner._spiral_pattern((90, 50), 5, mode='rectangular')
+    assert path.xy[0].tolist() == [99.0, 59.0]
@@ -0,0 +1,32 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from compiled_forest import CompiledForest
+from dataset import FEATURE_COLUMNS
+from forest_compaction import compact
+from model_trainer import train_model
+
+def test_compact_reports_variants_and_saves_the_smallest_accurate_one(tmp_path):
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(rng.uniform(0, 100, size=(1000, len(FEATURE_COLUMNS))).round(2), columns=FEATURE_COLUMNS)
+    data['label'] = np.where(data['N'] > 50, 'rice', 'maize')
+    data_file = str(tmp_path / 'crop_data.csv')
+    data.to_csv(data_file, index=False)
+    model_file = str(tmp_path / 'models' / 'crop_model.joblib')
+    train_model(data_file, model_file, params={'n_estimators': 20})
+
+    reports, selected = compact(data_file, model_file, tree_counts=(5,), depths=(4,), tolerance=0.02,
+                                distill_trees=3, distill_depth=4)
+
+    assert [report['name'] for report in reports] == ['full', 'top5', 'depth4', 'top5-depth4', 'distill3-depth4']
+    full = reports[0]
+    assert selected['diskMB'] < full['diskMB']
+    assert selected['validAccuracy'] >= full['validAccuracy'] - 0.02
+    for report in reports:
+        assert report['singleP99Ms'] >= report['singleP50Ms'] > 0
+
+    compact_file = model_file.replace('.joblib', '_compact.joblib')
+    assert CompiledForest.load(compact_file).n_trees == selected['trees']
+    with open(compact_file.replace('.joblib', '_report.json')) as f:
+        assert json.load(f)['selected'] == selected['name']
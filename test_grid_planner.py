@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from grid_planner import GridPlanner
+from path_planner import PathPlanner
+
+def random_planner(seed):
+    rng = np.random.default_rng(seed)
+    width, height = (int(v) for v in rng.integers(15, 50, size=2))
+    planner = PathPlanner(field_size=(width, height))
+    for _ in range(int(rng.integers(3, 20))):
+        planner.add_obstacle(float(rng.uniform(0, width)), float(rng.uniform(0, height)), float(rng.uniform(1, 6)))
+    free = np.argwhere(~planner.occupancy_grid())
+    start, end = (tuple(int(v) for v in free[i]) for i in rng.integers(len(free), size=2))
+    return planner, start, end
+
+def test_four_connected_paths_match_networkx():
+    for seed in range(10):
+        planner, start, end = random_planner(seed)
+        planner.grid_to_graph()
+        assert set(planner.graph.nodes) == set(map(tuple, np.argwhere(~planner.occupancy_grid()).tolist()))
+        expected = planner.plan_path(start, end)
+        path = planner.plan_path_with_graph(start, end)
+        assert (path is None) == (expected is None)
+        if path is not None:
+            assert len(path) == len(expected) and path[0] == start and path[-1] == end
+
+def test_jump_point_search_matches_astar():
+    for seed in range(10):
+        planner, start, end = random_planner(seed)
+        grid = GridPlanner.from_planner(planner)
+        astar, jps = grid.plan(start, end, 'astar'), grid.plan(start, end, 'jps')
+        assert (astar is None) == (jps is None)
+        if astar is None:
+            continue
+        assert grid.path_length(jps) == pytest.approx(grid.path_length(astar))
+        cells = np.asarray(jps).astype(int)
+        assert not planner.occupancy_grid()[cells[:, 0], cells[:, 1]].any()
+        assert (np.abs(np.diff(cells, axis=0)).max(axis=1) == 1).all()
+
+def test_resolution_and_blocked_ends():
+    blocked = np.zeros((10, 5), dtype=bool)
+    blocked[4, :4] = True
+    grid = GridPlanner(blocked, resolution=0.5)
+    path = grid.plan((0.0, 0.0), (4.5, 0.0), 'jps')
+    assert path[0] == (0.0, 0.0) and path[-1] == (4.5, 0.0)
+    assert grid.plan((0.0, 0.0), (2.0, 0.0)) is None
+    with pytest.raises(ValueError):
+        GridPlanner(blocked, connectivity=4).plan((0, 0), (1, 1), 'jps')
+
+def test_prepared_state_is_reused_until_the_field_changes():
+    planner = PathPlanner(field_size=(60, 40))
+    planner.add_obstacle(30, 20, 5)
+    grid = planner.grid_planner()
+    assert planner.grid_planner() is grid and planner.occupancy_grid() is planner.occupancy_grid()
+    planner.optimize_spraying_pattern((5, 5), 4, 'zigzag', smooth_path=False)
+    assert planner.nbytes > grid.nbytes
+
+    planner.add_obstacle(10, 10, 3)
+    assert planner.grid_planner() is not grid
+    assert planner.occupancy_grid()[10, 10]
+
+def test_prepared_state_is_bounded_and_built_once_under_concurrency():
+    import pickle
+    from concurrent.futures import ThreadPoolExecutor
+    from path_planner import MAX_PREPARED
+
+    planner = PathPlanner(field_size=(60, 40))
+    planner.add_obstacle(30, 20, 5)
+    with ThreadPoolExecutor(8) as executor:
+        grids = list(executor.map(lambda _: planner.occupancy_grid(0.5), range(16)))
+    assert all(grid is grids[0] for grid in grids)
+
+    for resolution in range(1, MAX_PREPARED + 4):
+        planner.occupancy_grid(resolution / 4)
+    assert len(planner._prepared) == MAX_PREPARED
+    assert planner.occupancy_grid(0.5) is not grids[0]
+    assert pickle.loads(pickle.dumps(planner)).occupancy_grid(2).shape == planner.occupancy_grid(2).shape
@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from micro_batcher import MicroBatcher
+
+def test_concurrent_requests_are_coalesced():
+    calls = []
+
+    def predict_fn(X):
+        calls.append(len(X))
+        return [float(row.sum()) for row in X]
+
+    batcher = MicroBatcher(predict_fn, max_batch_size=16, max_wait_ms=20)
+    with ThreadPoolExecutor(16) as executor:
+        results = list(executor.map(lambda i: batcher.submit([i, i]), range(64)))
+
+    # Every caller gets its own row back, and rows were scored in shared batches
+    assert results == [float(2 * i) for i in range(64)]
+    assert sum(calls) == 64
+    assert len(calls) < 64
+    stats = batcher.stats()
+    assert stats['items'] == 64
+    assert stats['maxBatchSize'] <= 16
+    assert stats['queueDepth'] == 0
+
+def test_errors_reach_every_caller():
+    def predict_fn(X):
+        raise RuntimeError('model failed')
+
+    batcher = MicroBatcher(predict_fn, max_wait_ms=1)
+    with pytest.raises(RuntimeError):
+        batcher.submit([1.0, 2.0])
+    assert batcher.stats()['errors'] == 1
+
+def test_a_malformed_request_fails_its_batch_but_not_the_worker():
+    batcher = MicroBatcher(lambda X: [float(row.sum()) for row in X], max_wait_ms=50)
+    with ThreadPoolExecutor(2) as executor:
+        futures = [executor.submit(batcher.submit, features, 5) for features in ([1.0, 2.0], [1.0, 2.0, 3.0])]
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result()
+    assert batcher.submit([1.0, 2.0], timeout=5) == 3.0
+    assert batcher.stats()['errors'] == 1
@@ -0,0 +1,77 @@
+import os
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+from crop_predictor import FEATURE_COLUMNS
+from model_registry import ModelRegistry
+
+def _save_model(directory, seed):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.uniform(0, 100, size=(80, len(FEATURE_COLUMNS))), columns=FEATURE_COLUMNS)
+    y = np.where(X['N'] > 50, 'rice', 'maize')
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=5, random_state=seed).fit(scaler.transform(X), y)
+
+    os.makedirs(directory, exist_ok=True)
+    model_file = os.path.join(directory, 'crop_model.joblib')
+    scaler_file = os.path.join(directory, 'crop_model_scaler.joblib')
+    joblib.dump(model, model_file)
+    joblib.dump(scaler, scaler_file)
+    return model_file, scaler_file
+
+def test_publish_activate_and_hot_swap(tmp_path):
+    root = str(tmp_path / 'registry')
+    registry = ModelRegistry(root, watch_interval=None)
+    v1 = registry.publish(*_save_model(str(tmp_path / 'v1'), seed=1))
+    v2 = registry.publish(*_save_model(str(tmp_path / 'v2'), seed=2))
+
+    assert v1 != v2
+    assert registry.publish(*_save_model(str(tmp_path / 'v1'), seed=1)) == v1
+    assert set(registry.versions()) == {v1, v2}
+
+    old = registry.activate(v1)
+    swapped = []
+    registry.on_activate(lambda bundle: swapped.append(bundle.version))
+    registry.activate(v2)
+
+    # A request holding the old bundle keeps a working model after the swap
+    assert old.version == v1
+    assert old.model.predict(np.full((1, len(FEATURE_COLUMNS)), 60.0))[0] in ('rice', 'maize')
+    assert registry.active().version == v2
+    assert swapped == [v2]
+
+    # Compiled arrays are memory-mapped so workers share them
+    assert isinstance(registry.active().model.threshold, np.memmap)
+
+def test_other_workers_follow_the_active_file(tmp_path):
+    root = str(tmp_path / 'registry')
+    worker_a = ModelRegistry(root, watch_interval=None)
+    worker_b = ModelRegistry(root, watch_interval=0)
+    v1 = worker_a.publish(*_save_model(str(tmp_path / 'v1'), seed=1))
+    v2 = worker_a.publish(*_save_model(str(tmp_path / 'v2'), seed=2))
+
+    worker_a.activate(v1)
+    assert worker_b.active().version == v1
+    worker_a.activate(v2)
+    assert worker_b.active().version == v2
+
+def test_unknown_versions_are_rejected(tmp_path):
+    registry = ModelRegistry(str(tmp_path / 'registry'), watch_interval=None)
+    with pytest.raises(ValueError):
+        registry.activate('../models')
+
+def test_compiled_only_versions_are_served(tmp_path):
+    from compiled_forest import CompiledForest
+    model_file, scaler_file = _save_model(str(tmp_path / 'v1'), seed=1)
+    compact_file = str(tmp_path / 'compact.joblib')
+    CompiledForest.from_sklearn(joblib.load(model_file), joblib.load(scaler_file)).prune(trees=[0, 1]).save(compact_file)
+
+    registry = ModelRegistry(str(tmp_path / 'registry'), use_compiled=False, watch_interval=None)
+    version = registry.publish_compiled(compact_file)
+    bundle = registry.activate(version)
+
+    assert bundle.scaler is None
+    assert bundle.model.n_trees == 2
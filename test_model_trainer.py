@@ -0,0 +1,31 @@
+import json
+import numpy as np
+import pandas as pd
+from compiled_forest import CompiledForest
+from model_trainer import FEATURE_COLUMNS, train_model_streaming, compiled_model_path
+
+def test_streaming_training_writes_model_and_report(tmp_path):
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(rng.uniform(0, 100, size=(3000, len(FEATURE_COLUMNS))).round(2), columns=FEATURE_COLUMNS)
+    data['label'] = np.where(data['N'] > 50, 'rice', 'maize')
+    data_file = str(tmp_path / 'crop_data.csv')
+    data.to_csv(data_file, index=False)
+    model_file = str(tmp_path / 'models' / 'crop_model.joblib')
+
+    # Small chunks force several partial_fit calls and warm_start batches
+    model, scaler = train_model_streaming(data_file, model_file, chunksize=500, n_estimators=12,
+                                          trees_per_batch=5, n_jobs=2)
+
+    assert len(model.estimators_) == 12
+    assert set(model.classes_) == {'rice', 'maize'}
+    assert np.all(scaler.n_samples_seen_ > 2000)
+    assert np.allclose(scaler.mean_, data[FEATURE_COLUMNS].mean().to_numpy(), rtol=0.05)
+
+    with open(model_file.replace('.joblib', '_training_report.json')) as f:
+        report = json.load(f)
+    assert [phase['name'] for phase in report['phases']] == ['load_dataset', 'split_scale', 'fit_forest', 'evaluate', 'save']
+    assert report['rows']['train'] + report['rows']['test'] == 3000
+    assert report['testAccuracy'] > 0.9
+
+    compiled = CompiledForest.load(compiled_model_path(model_file))
+    assert compiled.predict(np.array([[90, 50, 50, 25, 80, 6.5, 200]]))[0] == 'rice'
@@ -0,0 +1,51 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from dataset import FEATURE_COLUMNS, load_dataset
+from model_tuning import prepare_folds, tune
+
+def _write_csv(path, n_rows=400, seed=0):
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame(rng.uniform(0, 100, size=(n_rows, len(FEATURE_COLUMNS))).round(2), columns=FEATURE_COLUMNS)
+    data['label'] = np.where(data['N'] > 50, 'rice', 'maize')
+    data.to_csv(path, index=False)
+
+def test_folds_are_prepared_once(tmp_path):
+    csv_path = str(tmp_path / 'crop_data.csv')
+    _write_csv(csv_path)
+    dataset = load_dataset(csv_path)
+
+    folds_dir = prepare_folds(dataset, n_folds=4)
+    fold_of_row = np.load(os.path.join(folds_dir, 'folds.npy'))
+    assert np.bincount(fold_of_row).tolist() == [100, 100, 100, 100]
+
+    # Each fold is scaled with statistics of its own training rows
+    scaled = np.load(os.path.join(folds_dir, 'scaled_1.npy'), mmap_mode='r')
+    assert np.allclose(scaled[fold_of_row != 1].mean(axis=0), 0, atol=1e-4)
+
+    mtime = os.path.getmtime(os.path.join(folds_dir, 'folds.npy'))
+    assert prepare_folds(dataset, n_folds=4) == folds_dir
+    assert os.path.getmtime(os.path.join(folds_dir, 'folds.npy')) == mtime
+
+def test_tune_writes_leaderboard_and_selects_within_tolerance(tmp_path):
+    csv_path = str(tmp_path / 'crop_data.csv')
+    _write_csv(csv_path)
+    output = str(tmp_path / 'leaderboard.json')
+    grid = {'n_estimators': [3, 8], 'max_depth': [1, None]}
+
+    leaderboard, selected = tune(csv_path, output, param_grid=grid, n_folds=3, n_jobs=2,
+                                 tolerance=0.02, latency_repeat=20)
+
+    assert len(leaderboard) == 4
+    accuracies = [entry['meanAccuracy'] for entry in leaderboard]
+    assert accuracies == sorted(accuracies, reverse=True)
+    assert selected['meanAccuracy'] >= accuracies[0] - 0.02
+    for entry in leaderboard:
+        assert len(entry['foldAccuracies']) == 3
+        assert entry['singleP50Ms'] > 0 and entry['batchP50Ms'] > 0
+
+    with open(output) as f:
+        report = json.load(f)
+    assert report['selected'] == selected['rank']
+    assert report['leaderboard'][0]['params'] == leaderboard[0]['params']
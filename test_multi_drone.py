@@ -0,0 +1,38 @@
+import numpy as np
+from coverage import coverage_report
+from multi_drone import balanced_groups, partition_field, plan_fleet, fleet_statistics
+from path_planner import PathPlanner
+from spray_path import SprayPath
+
+def test_balanced_groups_minimize_the_largest_group():
+    weights = np.array([5.0, 1, 1, 1, 1, 1, 5, 0, 0])
+    starts = balanced_groups(weights, 3)
+    sums = np.add.reduceat(weights, starts)
+    assert len(starts) <= 3 and sums.max() == 5.0
+    assert balanced_groups(np.ones(2), 4) == [0, 1]
+
+def test_regions_split_the_field_and_are_planned_in_parallel():
+    planner = PathPlanner(field_size=(120, 90))
+    planner.add_obstacle(40, 30, 8)
+    planner.add_polygon_obstacle([(70, 50), (100, 50), (90, 80)])
+    regions = partition_field(planner, 4, 3)
+    assert len(regions) == 3
+    assert all(a[3] == b[1] for a, b in zip(regions, regions[1:]))
+
+    for pattern, mode in (('zigzag', 'archimedean'), ('spiral', 'rectangular'), ('custom', 'archimedean')):
+        regions, paths = plan_fleet(planner, (2, 2), 4, 3, workers=2, pattern=pattern, spiral_mode=mode,
+                                    smooth_path=False, resample_spacing=2)
+        for region, path in zip(regions, paths):
+            # Zigzag segment ends lie on obstacle edges, so check the region bounds rather than valid_mask
+            assert len(path) and region[1] <= path.y.min() and path.y.max() <= region[3]
+        combined = SprayPath.concatenate(paths)
+        coverage = coverage_report(combined.x, combined.y, 4, field_mask=planner.valid_mask,
+                                   field_bounds=planner.field_bounds())
+        assert coverage['coveragePercent'] > 99
+
+        drones, fleet = fleet_statistics((2, 2), paths)
+        assert fleet['makespan'] == max(drone['estimatedTime'] for drone in drones)
+        assert drones[0]['transitDistance'] < drones[-1]['transitDistance']
+        single = planner.optimize_spraying_pattern((2, 2), 4, pattern, smooth_path=False, resample_spacing=2,
+                                                   spiral_mode=mode)
+        assert fleet['makespan'] < single.estimated_time() / 2
@@ -0,0 +1,42 @@
+import numpy as np
+import obstacle_index
+from obstacle_index import ObstacleIndex
+from path_planner import PathPlanner
+
+def _brute_force(x, y, ox, oy, radius):
+    return np.array([bool(np.any(np.sqrt((px - ox)**2 + (py - oy)**2) < radius)) for px, py in zip(x, y)])
+
+def test_blocked_matches_brute_force(monkeypatch):
+    rng = np.random.default_rng(0)
+    ox, oy = rng.uniform(0, 500, 300), rng.uniform(0, 500, 300)
+    radius = rng.uniform(0.5, 40, 300)
+    x, y = rng.uniform(-20, 520, 5000), rng.uniform(-20, 520, 5000)
+    expected = _brute_force(x, y, ox, oy, radius)
+
+    assert np.array_equal(ObstacleIndex(ox, oy, radius).blocked(x, y), expected)
+    assert np.array_equal(ObstacleIndex(ox, oy, radius, cell_size=3).blocked(x, y), expected)
+
+    # Tiny blocks exercise the pair-splitting loop
+    monkeypatch.setattr(obstacle_index, 'BLOCK_PAIRS', 5)
+    assert np.array_equal(ObstacleIndex(ox, oy, radius).blocked(x, y), expected)
+
+def test_boundary_points_are_not_blocked():
+    index = ObstacleIndex([10.0], [10.0], [5.0])
+    assert index.blocked([15.0, 14.99, 10.0], [10.0, 10.0, 4.0]).tolist() == [False, True, False]
+    assert ObstacleIndex([], [], []).blocked([1.0], [1.0]).tolist() == [False]
+
+def test_planner_mask_agrees_with_single_point_checks():
+    planner = PathPlanner(field_size=(100, 80))
+    planner.add_obstacle(50, 40, 10)
+    planner.add_obstacle(20, 20, 5)
+    grid_x, grid_y = np.meshgrid(np.arange(0, 101, 2.5), np.arange(0, 81, 2.5), indexing='ij')
+
+    mask = planner.valid_mask(grid_x, grid_y)
+    assert mask.shape == grid_x.shape
+    expected = [[planner.is_valid_point(x, y) for x, y in zip(xs, ys)] for xs, ys in zip(grid_x, grid_y)]
+    assert mask.tolist() == expected
+    assert not planner.is_valid_point(50, 40) and not planner.is_valid_point(0, 0)
+
+    # Obstacles added later are picked up by the index
+    planner.add_obstacle(80, 60, 3)
+    assert not planner.valid_mask([80.0], [60.0])[0]
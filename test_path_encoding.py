@@ -0,0 +1,94 @@
+import gzip
+import json
+import zlib
+import numpy as np
+import pytest
+from path_encoding import (encode_polyline, decode_polyline, negotiate_format, encode_path, decode_path,
+                           compress, MIN_COMPRESS_BYTES, encode_stream, decode_stream, compress_stream,
+                           polyline_precision, query_floats)
+from spray_path import SprayPath
+
+def test_polyline_matches_the_reference_encoding_and_round_trips():
+    # The worked example of the polyline algorithm, at 5 decimal places
+    assert encode_polyline([38.5, 40.7, 43.252], [-120.2, -120.95, -126.453], 5) == '_p~iF~ps|U_ulLnnqC_mqNvxq`@'
+
+    rng = np.random.default_rng(0)
+    x, y = rng.uniform(-1e5, 1e5, 1000), rng.uniform(-1e5, 1e5, 1000)
+    decoded_x, decoded_y = decode_polyline(encode_polyline(x, y, 2), 2)
+    assert np.abs(decoded_x - x).max() <= 0.005 and np.abs(decoded_y - y).max() <= 0.005
+
+    assert polyline_precision('10') == 10 and polyline_precision(0) == 0
+    for precision in (40, -1, 'abc', '2.5', None, True):
+        with pytest.raises(ValueError, match='precision must be'):
+            polyline_precision(precision)
+    with pytest.raises(ValueError):
+        encode_polyline(x, y, 40)
+
+def test_negotiation_and_compression():
+    assert negotiate_format(None, 'text/html, */*') == 'json'
+    assert negotiate_format(None, 'application/octet-stream') == 'float32'
+    assert negotiate_format('polyline', 'application/octet-stream') == 'polyline'
+    with pytest.raises(ValueError):
+        negotiate_format('xml')
+
+    body = b'{"x": 1.0}' * MIN_COMPRESS_BYTES
+    compressed, encoding = compress(body, 'deflate, gzip;q=0.8')
+    assert encoding == 'gzip' and gzip.decompress(compressed) == body
+    assert compress(body, 'gzip;q=0') == (body, None)
+    assert compress(b'{}', 'gzip') == (b'{}', None)
+
+def test_encoded_paths_decode_back():
+    path = SprayPath([1.25, 2.5, 7.75], [3.0, 3.0, 4.5], rate=2.0)
+    statistics = {'totalDistance': path.total_distance}
+
+    body, mimetype, headers = encode_path(path, statistics, 'float32')
+    assert mimetype == 'application/octet-stream' and len(body) == 3 * 3 * 4
+    assert json.loads(headers['X-Path-Statistics']) == statistics
+    decoded = decode_path(body=body, content_type=mimetype)
+    assert decoded.xy.tolist() == path.xy.tolist() and decoded.rate.tolist() == [2.0] * 3
+
+    data = json.loads(encode_path(path, statistics, 'polyline')[0])
+    assert data['sprayingRate'] == 2.0 and data['statistics'] == statistics
+    assert decode_path(data).xy.tolist() == path.xy.tolist()
+
+    data = json.loads(encode_path(path, statistics, 'json')[0])
+    assert decode_path(data).xy.tolist() == path.xy.tolist()
+
+def test_msgpack_round_trip():
+    msgpack = pytest.importorskip('msgpack')
+    path = SprayPath([0.5, 1.5], [2.5, 3.5])
+    body, mimetype, _ = encode_path(path, {'numberOfPoints': 2}, 'msgpack')
+    assert decode_path(msgpack.unpackb(body)).xy.tolist() == path.xy.tolist()
+
+def test_streams_decode_back_and_report_failures():
+    chunks = [SprayPath([0.5, 1.5], [2.0, 2.0], 3.0), SprayPath([1.5, 0.5, 0.25], [4.0, 4.0, 6.0], 3.0)]
+    statistics = {'numberOfPoints': 5}
+    for fmt in ('json', 'float32'):
+        pieces = list(encode_stream(iter(chunks), lambda: statistics, fmt))
+        assert len(pieces) == 3
+        path, trailer = decode_stream(b''.join(pieces), fmt)
+        assert path.xy.tolist() == SprayPath.concatenate(chunks).xy.tolist() and (path.rate == 3.0).all()
+        assert trailer == (statistics if fmt == 'float32' else {'statistics': statistics})
+
+    # Every compressed piece is flushed, so it decompresses without the rest of the stream
+    pieces = list(compress_stream(encode_stream(iter(chunks), lambda: statistics), 'gzip'))
+    first = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(pieces[0])
+    assert json.loads(first) == {'path': chunks[0].to_dicts()}
+    assert decode_stream(gzip.decompress(b''.join(pieces)))[1] == {'statistics': statistics}
+
+    def failing():
+        yield chunks[0]
+        raise ValueError('planner failed')
+    path, trailer = decode_stream(b''.join(encode_stream(failing(), lambda: statistics)))
+    assert len(path) == 2 and trailer == {'error': 'planner failed'}
+
+def test_malformed_paths_raise_value_errors():
+    for text in ('!!!', '_p~i', '_p~iF~ps|U_', 42):
+        with pytest.raises(ValueError, match='polyline'):
+            decode_polyline(text, 2)
+    with pytest.raises(ValueError, match='12 bytes'):
+        decode_path({}, b'\0' * 13, 'application/octet-stream')
+    assert query_floats({'fieldWidth': '10', 'other': 'x'}, ['fieldWidth', 'fieldHeight']) == {'fieldWidth': 10.0}
+    for value in ('abc', 'nan', 'inf'):
+        with pytest.raises(ValueError, match='fieldWidth must be a number'):
+            query_floats({'fieldWidth': value}, ['fieldWidth'])
@@ -0,0 +1,47 @@
+import gzip
+import os
+import time
+from path_encoding import MIN_COMPRESS_BYTES
+from plan_cache import PlanCache, plan_key, etag_matches
+
+REQUEST = {'fieldWidth': 100, 'fieldHeight': 50, 'coverageRadius': 5, 'startX': 0, 'startY': 0, 'pattern': 'zigzag'}
+
+def test_equivalent_requests_share_a_key():
+    key = plan_key(REQUEST)
+    same = {'pattern': 'zigzag', 'startY': 0.0, 'startX': 0, 'coverageRadius': 5.0, 'fieldHeight': 50,
+            'fieldWidth': 100.0, 'smoothPath': True, 'obstacles': [], 'spiralMode': None, 'token': 'ignored'}
+    assert plan_key(same) == key
+    assert plan_key({**REQUEST, 'smoothPath': False}) != key
+    assert plan_key({**REQUEST, 'obstacles': [{'x': 10, 'y': 10, 'radius': 2}]}) != key
+    assert plan_key(REQUEST, 'polyline', 2) != plan_key(REQUEST, 'polyline', 3)
+    assert plan_key(REQUEST, 'json', 2) == plan_key(REQUEST, 'json', 3)
+
+def test_etags_and_conditional_matches():
+    cache = PlanCache(maxsize=4)
+    body = b'{"path": []}' * MIN_COMPRESS_BYTES
+    entry = cache.put('k', body, 'application/json')
+    assert cache.get('k') is entry
+    assert entry.etag() != entry.etag('gzip')
+    assert gzip.decompress(cache.payload('k', entry, 'gzip')) == body
+    assert cache.stats()['bytes'] == entry.nbytes > len(body)
+
+    assert etag_matches(entry.etag(), entry.etag())
+    assert etag_matches(f'"other", W/{entry.etag()}', entry.etag())
+    assert etag_matches('*', entry.etag())
+    assert not etag_matches(entry.etag('gzip'), entry.etag())
+    assert not etag_matches(None, entry.etag())
+
+def test_disk_tier_is_shared_and_expires(tmp_path):
+    writer = PlanCache(maxsize=4, ttl=60, directory=str(tmp_path))
+    written = writer.put('k', b'body', 'application/octet-stream', {'X-Path-Columns': 'x,y,spraying_rate'})
+
+    # Another worker process sees the response through the shared directory
+    reader = PlanCache(maxsize=4, ttl=60, directory=str(tmp_path))
+    entry = reader.get('k')
+    assert (entry.body, entry.headers, entry.etag()) == (b'body', written.headers, written.etag())
+    assert reader.stats()['diskHits'] == 1
+
+    stale = time.time() - 120
+    os.utime(tmp_path / 'k.plan', (stale, stale))
+    assert PlanCache(ttl=60, directory=str(tmp_path)).get('k') is None
+    assert not os.path.exists(tmp_path / 'k.plan')
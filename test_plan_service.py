@@ -0,0 +1,15 @@
+from plan_service import validate_plan_request
+
+REQUEST = {'fieldWidth': 100, 'fieldHeight': 60, 'coverageRadius': 5, 'startX': 2, 'startY': 2, 'pattern': 'zigzag'}
+
+def test_resample_spacing_must_be_a_reasonable_positive_number():
+    assert validate_plan_request(dict(REQUEST, resampleSpacing=2.5), 8) is None
+    for spacing in (0, -1, 1e-6, 'x', True, float('nan')):
+        assert 'Resample spacing' in validate_plan_request(dict(REQUEST, resampleSpacing=spacing), 8)
+
+def test_tour_time_limit_must_be_a_non_negative_number():
+    custom = dict(REQUEST, pattern='custom')
+    for limit in (None, 0, 0.5):
+        assert validate_plan_request(dict(custom, tourTimeLimit=limit), 8) is None
+    for limit in ('x', -1, True, float('nan'), [1]):
+        assert validate_plan_request(dict(custom, tourTimeLimit=limit), 8).startswith('tourTimeLimit')
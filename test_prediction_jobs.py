@@ -0,0 +1,154 @@
+import io
+import json
+import os
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from compiled_forest import CompiledForest
+from crop_predictor import FEATURE_COLUMNS
+from model_registry import ModelBundle
+from prediction_jobs import PredictionJobs
+
+def _bundle():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, size=(200, len(FEATURE_COLUMNS)))
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, np.where(X[:, 0] > 50, 'rice', 'maize'))
+    return ModelBundle('v1', CompiledForest.from_sklearn(model), None)
+
+def _csv(n_rows=250):
+    rng = np.random.default_rng(1)
+    data = pd.DataFrame(rng.uniform(0, 100, size=(n_rows, len(FEATURE_COLUMNS))).round(2), columns=FEATURE_COLUMNS)
+    data = data.astype(object)
+    data.loc[7, 'ph'] = 'acid'
+    return data.to_csv(index=False).encode('utf-8')
+
+def _run(jobs, stream, **kwargs):
+    job = jobs.submit(io.BytesIO(stream), **kwargs)
+    jobs.shutdown()
+    return job['id']
+
+def test_job_writes_results_in_chunks(tmp_path):
+    bundle = _bundle()
+    jobs = PredictionJobs(str(tmp_path), lambda version: bundle, chunk_size=100)
+    job_id = _run(jobs, _csv(), top_k=2)
+
+    state = jobs.status(job_id)
+    assert state['status'] == 'completed'
+    assert (state['rowsDone'], state['chunksDone'], state['errors'], state['totalRows']) == (250, 3, 1, 250)
+    assert state['progress'] == 1.0
+
+    with open(jobs.result_path(job_id)) as f:
+        records = [json.loads(line) for line in f]
+    assert [record['index'] for record in records] == list(range(250))
+    assert records[7]['error'] == 'Invalid value for ph. Must be a number.'
+    assert len(records[0]['recommendations']) == 2
+
+def test_csv_output(tmp_path):
+    bundle = _bundle()
+    jobs = PredictionJobs(str(tmp_path), lambda version: bundle, chunk_size=100)
+    job_id = _run(jobs, _csv(), output_format='csv', top_k=1)
+
+    results = pd.read_csv(jobs.result_path(job_id))
+    assert list(results.columns) == ['index', 'crop_1', 'confidence_1', 'error']
+    assert len(results) == 250
+    assert results.loc[7, 'error'].startswith('Invalid value for ph')
+
+def test_interrupted_job_resumes_from_the_last_chunk(tmp_path):
+    bundle = _bundle()
+
+    class CrashingModel:
+        calls = 0
+        def predict_proba(self, X):
+            CrashingModel.calls += 1
+            if CrashingModel.calls == 3:
+                raise RuntimeError('worker died')
+            return bundle.model.predict_proba(X)
+        classes_ = bundle.model.classes_
+
+    crashing = PredictionJobs(str(tmp_path / 'jobs'), lambda version: ModelBundle('v1', CrashingModel(), None),
+                              chunk_size=100)
+    job_id = _run(crashing, _csv())
+    state_file = os.path.join(str(tmp_path / 'jobs'), job_id, 'job.json')
+    with open(state_file) as f:
+        state = json.load(f)
+    assert state['rowsDone'] == 200
+
+    # Pretend the process died mid-chunk: still "running", with a partial line after the recorded offset
+    state['status'] = 'running'
+    with open(state_file, 'w') as f:
+        json.dump(state, f)
+    with open(crashing.result_path(job_id), 'ab') as f:
+        f.write(b'{"index": 200, "recomm')
+
+    resumed = PredictionJobs(str(tmp_path / 'jobs'), lambda version: bundle, chunk_size=100)
+    assert resumed.resume() == [job_id]
+    resumed.shutdown()
+
+    clean = PredictionJobs(str(tmp_path / 'clean'), lambda version: bundle, chunk_size=100)
+    clean_id = _run(clean, _csv())
+    with open(resumed.result_path(job_id), 'rb') as a, open(clean.result_path(clean_id), 'rb') as b:
+        assert a.read() == b.read()
+    assert resumed.status(job_id)['status'] == 'completed'
+
+def test_quoted_newlines_and_blank_lines_keep_rows_aligned(tmp_path):
+    bundle = _bundle()
+    data = pd.read_csv(io.BytesIO(_csv(30)), dtype=str)
+    plain = data.to_csv(index=False).encode('utf-8')
+    data['note'] = ['line one\nline two' if row % 4 == 0 else '' for row in range(30)]
+    lines = data.to_csv(index=False).encode('utf-8').split(b'\n')
+    noisy = b'\n'.join(lines[:9] + [b''] + lines[9:])
+
+    jobs = PredictionJobs(str(tmp_path / 'noisy'), lambda version: bundle, chunk_size=7)
+    job_id = _run(jobs, noisy)
+    state = jobs.status(job_id)
+    assert (state['totalRows'], state['rowsDone'], state['chunksDone']) == (30, 30, 5)
+    assert state['inputOffset'] == len(noisy)
+
+    clean = PredictionJobs(str(tmp_path / 'plain'), lambda version: bundle, chunk_size=7)
+    clean_id = _run(clean, plain)
+    with open(jobs.result_path(job_id), 'rb') as a, open(clean.result_path(clean_id), 'rb') as b:
+        assert a.read() == b.read()
+
+def test_a_job_locked_by_another_process_is_skipped(tmp_path):
+    from prediction_jobs import _lock_job
+    bundle = _bundle()
+    jobs = PredictionJobs(str(tmp_path), lambda version: bundle, chunk_size=100)
+    job_id = _run(jobs, _csv())
+    state_file = os.path.join(str(tmp_path), job_id, 'job.json')
+    with open(state_file) as f:
+        state = json.load(f)
+    state.update(status='queued', rowsDone=0, inputOffset=0, chunksDone=0, errors=0, outputBytes=0)
+    with open(state_file, 'w') as f:
+        json.dump(state, f)
+
+    lock = _lock_job(os.path.join(str(tmp_path), job_id))
+    other = PredictionJobs(str(tmp_path), lambda version: bundle, chunk_size=100)
+    assert other.resume() == [job_id]
+    other.shutdown()
+    assert other.status(job_id)['status'] == 'queued'
+
+    lock.close()
+    other = PredictionJobs(str(tmp_path), lambda version: bundle, chunk_size=100)
+    other.resume()
+    other.shutdown()
+    assert other.status(job_id)['rowsDone'] == 250
+
+def test_top_k_is_checked_and_limited_to_the_crops(tmp_path):
+    import pytest
+    bundle = _bundle()
+    jobs = PredictionJobs(str(tmp_path), lambda version: bundle, chunk_size=100)
+    for top_k in (0, -2):
+        with pytest.raises(ValueError):
+            jobs.submit(io.BytesIO(_csv()), 'csv', top_k)
+
+    job_id = _run(jobs, _csv(), output_format='csv', top_k=5)
+    assert jobs.status(job_id)['topK'] == 2
+    results = pd.read_csv(jobs.result_path(job_id))
+    assert list(results.columns) == ['index', 'crop_1', 'confidence_1', 'crop_2', 'confidence_2', 'error']
+    assert results.loc[0, 'crop_2'] in ('rice', 'maize')
+
+def test_a_job_fails_when_no_model_is_loaded_in_time(tmp_path):
+    jobs = PredictionJobs(str(tmp_path), lambda version: None, model_wait=0.01, model_timeout=0.05)
+    job_id = _run(jobs, _csv())
+    state = jobs.status(job_id)
+    assert state['status'] == 'failed' and 'No model' in state['error']
@@ -0,0 +1,17 @@
+import os
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+from process_pool import shared_pool, submit
+
+def test_pool_is_shared_and_runs_in_other_processes():
+    pool = shared_pool(2)
+    assert shared_pool(2) is pool and shared_pool(1) is not pool
+    pids = {pool.submit(os.getpid).result() for _ in range(4)}
+    assert os.getpid() not in pids
+
+def test_a_broken_pool_is_replaced():
+    pool = shared_pool(1)
+    with pytest.raises(BrokenProcessPool):
+        submit(1, os._exit, 1).result()
+    assert shared_pool(1) is not pool
+    assert submit(1, os.getpid).result() != os.getpid()
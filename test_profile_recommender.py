@@ -0,0 +1,43 @@
+import numpy as np
+from profile_recommender import ProfileIndex, ProfileRecommender
+
+PROFILES = {
+    'rice': [80, 40, 40, 24, 82, 6.4, 230],
+    'maize': [78, 48, 20, 22, 65, 6.2, 85],
+    'chickpea': [40, 68, 80, 18, 17, 7.3, 80],
+}
+
+def test_query_returns_nearest_profiles_with_distances():
+    index = ProfileIndex(list(PROFILES), list(PROFILES.values()))
+    results = index.query(np.array([[79, 42, 40, 23, 80, 6.5, 220], [41, 67, 79, 18, 18, 7.2, 81]]), k=2)
+
+    assert [crop['name'] for crop in results[0]] == ['rice', 'maize']
+    assert results[1][0]['name'] == 'chickpea'
+    assert results[0][0]['distance'] < results[0][1]['distance']
+    assert results[0][0]['confidence'] == 1 / (1 + results[0][0]['distance'])
+    assert results[0][0]['gaps']['rainfall'] == -10
+
+    # k is capped at the number of profiles
+    assert len(index.query([80, 40, 40, 24, 82, 6.4, 230], k=10)[0]) == 3
+
+def test_index_is_rebuilt_only_when_the_table_changes():
+    table = dict(PROFILES)
+    recommender = ProfileRecommender(lambda: (list(table), list(table.values())),
+                                     signature=lambda: len(table), check_interval=0)
+
+    assert recommender.recommend([[80, 40, 40, 24, 82, 6.4, 230]])[0][0]['name'] == 'rice'
+    recommender.recommend([[40, 68, 80, 18, 17, 7.3, 80]])
+    assert recommender.rebuilds == 1
+
+    # Another process adds a crop: the signature check notices
+    table['cotton'] = [118, 46, 20, 24, 80, 6.9, 80]
+    assert recommender.recommend([[118, 46, 20, 24, 80, 6.9, 80]])[0][0]['name'] == 'cotton'
+    assert recommender.rebuilds == 2
+
+    recommender.invalidate()
+    recommender.index()
+    assert recommender.rebuilds == 3
+
+def test_empty_table_has_no_index():
+    recommender = ProfileRecommender(lambda: ([], []))
+    assert recommender.recommend([[0] * 7]) is None
@@ -0,0 +1,56 @@
+import numpy as np
+from coverage import CoverageGrid
+from spray_path import SprayPath, PathTotals
+from path_planner import PathPlanner
+
+def test_statistics_and_legacy_access():
+    path = SprayPath([0, 3, 3], [0, 4, 10], rate=[1.0, 2.0, 5.0])
+    assert path.distance.tolist() == [0.0, 5.0, 11.0]
+    assert path.total_distance == 11.0
+    # Each segment is weighted by the rate at its start: (5 * 1 + 6 * 2) / 10
+    assert path.estimated_time() == 1.7
+    assert path.bounds() == (0.0, 0.0, 3.0, 10.0)
+
+    assert len(path) == 3
+    assert path[1] == {'x': 3.0, 'y': 4.0, 'spraying_rate': 2.0}
+    assert path[-1]['y'] == 10.0
+    assert [point['x'] for point in path] == [0.0, 3.0, 3.0]
+    assert path[1:].total_distance == 6.0
+    assert SprayPath.from_points(path.to_dicts()).distance.tolist() == path.distance.tolist()
+
+def test_planner_returns_spray_paths_with_the_requested_rate():
+    planner = PathPlanner(field_size=(60, 40))
+    planner.add_obstacle(30, 20, 5)
+    for pattern in ('zigzag', 'spiral', 'custom'):
+        path = planner.optimize_spraying_pattern((5, 5), 4, pattern, spraying_rate=2.5)
+        assert isinstance(path, SprayPath)
+        assert (path.rate == 2.5).all()
+        assert np.isclose(path.total_distance, np.hypot(*np.diff(path.xy, axis=0).T).sum())
+
+    visualization = planner.visualize_path(path.to_dicts(), 4)
+    assert visualization == planner.visualize_path(path, 4)
+    assert visualization.split('\n', 1)[1].count('S') == 1
+
+def test_streamed_chunks_join_into_the_planned_path():
+    planner = PathPlanner(field_size=(80, 60))
+    planner.add_obstacle(40, 30, 6)
+    for pattern, mode in (('zigzag', 'archimedean'), ('spiral', 'archimedean'), ('spiral', 'rectangular')):
+        whole = planner.optimize_spraying_pattern((5, 5), 4, pattern, 2.0, smooth_path=False, spiral_mode=mode)
+        chunks = list(planner.stream_spraying_pattern((5, 5), 4, pattern, 2.0, smooth_path=False, spiral_mode=mode))
+        assert len(chunks) > 1
+        assert SprayPath.concatenate(chunks).xy.tolist() == whole.xy.tolist()
+
+        # Totals and coverage tallied chunk by chunk match the whole path's
+        totals = PathTotals()
+        grid = CoverageGrid.for_field(planner.field_bounds(), 4)
+        for chunk in chunks:
+            grid.add(chunk.x, chunk.y, totals.add(chunk))
+        assert len(totals) == len(whole) and totals.bounds() == whole.bounds()
+        assert np.isclose(totals.total_distance, whole.total_distance)
+        assert np.isclose(totals.estimated_time(), whole.estimated_time())
+        at_once = CoverageGrid.for_field(planner.field_bounds(), 4)
+        at_once.add(whole.x, whole.y, whole.distance)
+        assert np.allclose(grid.first, at_once.first) and np.allclose(grid.last, at_once.last)
+
+    smoothed = list(planner.stream_spraying_pattern((5, 5), 4, 'zigzag'))
+    assert all(planner.valid_mask(chunk.x, chunk.y).all() for chunk in smoothed)
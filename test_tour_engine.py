@@ -0,0 +1,56 @@
+import numpy as np
+from path_planner import PathPlanner
+from tour_engine import greedy_tour, improve_tour, tour_length
+
+def test_greedy_tour_visits_every_point_once_nearest_first():
+    points = np.random.default_rng(0).uniform(0, 100, size=(2000, 2))
+    order = greedy_tour(points, (0, 0))
+    assert sorted(order.tolist()) == list(range(len(points)))
+    assert order[0] == np.argmin(np.hypot(points[:, 0], points[:, 1]))
+
+    # Each step goes to the closest point not visited yet
+    remaining = np.ones(len(points), dtype=bool)
+    current = np.zeros(2)
+    for index in order[:50]:
+        distances = np.hypot(*(points[remaining] - current).T)
+        assert np.isclose(np.hypot(*(points[index] - current)), distances.min())
+        remaining[index] = False
+        current = points[index]
+
+def test_improve_tour_shortens_without_moving_the_first_point():
+    points = np.random.default_rng(1).uniform(0, 100, size=(3000, 2))
+    order = greedy_tour(points, (0, 0))
+    improved = improve_tour(points, order, time_limit=2.0)
+    assert sorted(improved.tolist()) == list(range(len(points)))
+    assert improved[0] == order[0]
+    assert tour_length(points, improved, (0, 0)) < tour_length(points, order, (0, 0))
+
+def test_custom_pattern_covers_the_valid_grid():
+    planner = PathPlanner(field_size=(100, 100))
+    planner.add_obstacle(50, 50, 10)
+    path = planner.optimize_spraying_pattern((2, 2), coverage_radius=10, pattern='custom',
+                                             smooth_path=False, tour_time_limit=0.5)
+    grid = np.arange(0, 100, 5.0)
+    grid_x, grid_y = np.meshgrid(grid, grid, indexing='ij')
+    assert len(path) == 1 + planner.valid_mask(grid_x, grid_y).sum()
+    assert (path[0]['x'], path[0]['y']) == (2.0, 2.0)
+    assert all(planner.is_valid_point(point['x'], point['y']) for point in path[1:])
+
+def test_custom_pattern_starting_on_a_grid_point_can_be_smoothed():
+    planner = PathPlanner(field_size=(100, 60))
+    path = planner.optimize_spraying_pattern((10, 10), coverage_radius=5, pattern='custom')
+    assert len(path) > 0
+    raw = planner.optimize_spraying_pattern((10, 10), coverage_radius=5, pattern='custom', smooth_path=False)
+    assert (raw[0]['x'], raw[0]['y']) == (10.0, 10.0)
+    assert len(raw) == planner.valid_mask(*np.meshgrid(np.arange(0, 100, 2.5), np.arange(0, 60, 2.5))).sum()
+
+def test_greedy_tour_from_a_start_far_outside_the_points():
+    points = np.column_stack([np.full(50, 3900.0), np.linspace(0, 98, 50)])
+    order = greedy_tour(points, (1.2, 50))
+    assert sorted(order.tolist()) == list(range(50))
+    assert order[0] == 25
+
+    planner = PathPlanner(field_size=(4000, 100))
+    planner.add_polygon_obstacle([[1.5, -1], [3900, -1], [3900, 101], [1.5, 101]])
+    path = planner.optimize_spraying_pattern((1.2, 50), coverage_radius=5, pattern='custom', smooth_path=False)
+    assert len(path) > 1
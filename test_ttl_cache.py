@@ -0,0 +1,42 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from ttl_cache import TTLCache
+
+def test_lru_eviction_and_counters():
+    cache = TTLCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1          # 'a' becomes most recently used
+    cache.put('c', 3)                   # evicts 'b'
+
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['size']) == (2, 1, 1, 2)
+
+def test_entries_expire():
+    cache = TTLCache(maxsize=10, ttl=0.01)
+    cache.put('a', 1)
+    time.sleep(0.02)
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+
+def test_bounded_under_concurrent_writers():
+    cache = TTLCache(maxsize=50)
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda i: cache.put(i, i), range(1000)))
+    assert len(cache) == 50
+    assert cache.stats()['evictions'] == 950
+
+def test_memory_bound_evicts_least_recently_used():
+    cache = TTLCache(maxsize=10, maxbytes=100, sizeof=len)
+    cache.put('a', 'x' * 40)
+    cache.put('b', 'x' * 40)
+    cache.get('a')
+    cache.put('c', 'x' * 40)            # 120 bytes: evicts 'b'
+    assert cache.get('b') is None and cache.get('a') is not None
+    cache.put('a', 'x' * 10)            # re-putting re-measures the entry
+    assert cache.stats()['bytes'] == 50
+
+    cache.put('d', 'x' * 500)           # too big on its own, but kept alone
+    assert len(cache) == 1 and cache.stats()['evictions'] == 3
@@ -0,0 +1,158 @@
+import math
+import time
+import numpy as np
+
+# Neighbours per point considered by the improvement moves
+NEIGHBOURS = 8
+# Smallest length reduction accepted as an improvement
+MIN_GAIN = 1e-9
+
+def tour_length(points, order=None, start=None):
+    """Length of the open path through points (in order), optionally from start."""
+    points = np.asarray(points, dtype=np.float64)
+    if order is not None:
+        points = points[np.asarray(order)]
+    if start is not None and len(points):
+        points = np.vstack([np.asarray(start, dtype=np.float64), points])
+    if len(points) < 2:
+        return 0.0
+    return float(np.hypot(*np.diff(points, axis=0).T).sum())
+
+def greedy_tour(points, start=None):
+    """Nearest-neighbour tour over points, beginning closest to start.
+
+    Points are bucketed into a uniform grid with about one point per cell.
+    Each step searches rings of cells around the current position and
+    stops once the ring is farther than the best candidate found, and
+    visited points are deleted from their cell, so a step costs about the
+    same whether 10 or 100k points remain.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    n = len(points)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+
+    low = points.min(axis=0)
+    span = points.max(axis=0) - low
+    area = span[0] * span[1]
+    cell = math.sqrt(area / n) if area > 0 else max(float(span.max()) / n, 1e-9)
+    cell = max(cell, 1e-9)
+    cols = ((points[:, 0] - low[0]) // cell).astype(np.int64)
+    rows = ((points[:, 1] - low[1]) // cell).astype(np.int64)
+    max_col, max_row = int(cols.max()), int(rows.max())
+
+    buckets = {}
+    for index, key in enumerate(zip(cols.tolist(), rows.tolist())):
+        buckets.setdefault(key, []).append(index)
+
+    xs, ys = points[:, 0].tolist(), points[:, 1].tolist()
+    x, y = (xs[0], ys[0]) if start is None else (float(start[0]), float(start[1]))
+    x0, y0 = float(low[0]), float(low[1])
+    order = []
+    for _ in range(n):
+        col, row = int((x - x0) // cell), int((y - y0) // cell)
+        # Rings reach every cell from here, even from a start far outside the points
+        max_ring = max(abs(col), abs(row), abs(max_col - col), abs(max_row - row)) + 1
+        best, best_distance = -1, math.inf
+        ring = 0
+        while ring <= max_ring:
+            if ring == 0:
+                keys = [(col, row)]
+            else:
+                keys = [(col + d, row - ring) for d in range(-ring, ring + 1)]
+                keys += [(col + d, row + ring) for d in range(-ring, ring + 1)]
+                keys += [(col - ring, row + d) for d in range(-ring + 1, ring)]
+                keys += [(col + ring, row + d) for d in range(-ring + 1, ring)]
+            for key in keys:
+                bucket = buckets.get(key)
+                if bucket:
+                    for index in bucket:
+                        distance = (xs[index] - x) ** 2 + (ys[index] - y) ** 2
+                        if distance < best_distance:
+                            best, best_distance = index, distance
+            # Every point beyond this ring is at least ring * cell away
+            if best >= 0 and (ring * cell) ** 2 >= best_distance:
+                break
+            ring += 1
+
+        order.append(best)
+        key = (int(cols[best]), int(rows[best]))
+        buckets[key].remove(best)
+        if not buckets[key]:
+            del buckets[key]
+        x, y = xs[best], ys[best]
+    return np.array(order, dtype=np.int64)
+
+def improve_tour(points, order, time_limit=1.0):
+    """Shorten an open tour with 2-opt and Or-opt moves until time_limit seconds pass.
+
+    Moves are only tried between each point and its NEIGHBOURS nearest
+    points, which keeps a pass near-linear. The first point stays first,
+    since it is the one closest to the start position. Returns the new order.
+    """
+    from scipy.spatial import cKDTree
+
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    n = len(order)
+    if n < 4 or not time_limit or time_limit <= 0:
+        return np.asarray(order, dtype=np.int64)
+
+    deadline = time.perf_counter() + time_limit
+    _, neighbours = cKDTree(points).query(points, k=min(NEIGHBOURS + 1, len(points)))
+    neighbours = neighbours[:, 1:].tolist()
+    xs, ys = points[:, 0].tolist(), points[:, 1].tolist()
+    tour = [int(node) for node in order]
+    position = [0] * len(points)
+    for index, node in enumerate(tour):
+        position[node] = index
+
+    def distance(a, b):
+        return math.hypot(xs[a] - xs[b], ys[a] - ys[b])
+
+    def reverse(i, j):
+        tour[i:j + 1] = tour[i:j + 1][::-1]
+        for index in range(i, j + 1):
+            position[tour[index]] = index
+
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for i in range(n - 1):
+            if i % 256 == 0 and time.perf_counter() >= deadline:
+                break
+            a, b = tour[i], tour[i + 1]
+            removed = distance(a, b)
+            for c in neighbours[a]:
+                j = position[c]
+                if j <= i + 1:
+                    continue
+                # 2-opt: replace a-b and c-d with a-c and b-d by reversing b..c
+                d = tour[j + 1] if j + 1 < n else None
+                gain = removed - distance(a, c)
+                if d is not None:
+                    gain += distance(c, d) - distance(b, d)
+                if gain > MIN_GAIN:
+                    reverse(i + 1, j)
+                    improved = True
+                    break
+            else:
+                # Or-opt: move b between c and its successor if that is shorter
+                if i + 2 >= n:
+                    continue
+                after = tour[i + 2]
+                saved = removed + distance(b, after) - distance(a, after)
+                for c in neighbours[b]:
+                    j = position[c]
+                    if j in (i, i + 1) or j + 1 >= n or tour[j + 1] == b:
+                        continue
+                    e = tour[j + 1]
+                    if saved - (distance(c, b) + distance(b, e) - distance(c, e)) > MIN_GAIN:
+                        del tour[i + 1]
+                        insert_at = j + 1 if j < i + 1 else j
+                        tour.insert(insert_at, b)
+                        low, high = min(i + 1, insert_at), max(i + 1, insert_at)
+                        for index in range(low, high + 1):
+                            position[tour[index]] = index
+                        improved = True
+                        break
+    return np.array(tour, dtype=np.int64)